@@ -11,7 +11,7 @@ from gsy_framework.forward_markets.forward_profile import (
     StandardProfileParser,
     gsy_framework_path,
 )
-from gsy_framework.forward_markets.utils import create_market_slots
+from gsy_framework.forward_markets.utils import get_market_slots
 
 RESOURCES_PATH = Path(gsy_framework_path) / "resources"
 
@@ -66,7 +66,7 @@ class QuarterHourAggregatedSSPProfile(AggregatedSSPProfileBase):
         assert end_time - start_time >= duration(
             minutes=15
         ), "Time period should be >= 15 minutes."
-        return create_market_slots(
+        return get_market_slots(
             start_time=start_time.set(minute=(start_time.minute // 15) * 15),
             end_time=end_time.set(minute=(end_time.minute // 15) * 15) - duration(minutes=15),
             slot_length=duration(minutes=15),
@@ -86,9 +86,9 @@ class HourlyAggregatedSSPProfile(AggregatedSSPProfileBase):
 
     SSP_AGGREGATED_AGGREGATED_PROFILE_PATH = RESOURCES_PATH / "aggregated_ssp/hourly.csv"
 
-    def _get_timeslots(self, start_time: DateTime, end_time: DateTime) -> list:
+    def _get_timeslots(self, start_time: DateTime, end_time: DateTime) -> Iterable:
         assert end_time - start_time >= duration(hours=1), "Time period should be >= 1 hour."
-        return create_market_slots(
+        return get_market_slots(
             start_time=start_time.start_of("hour"),
             end_time=end_time.start_of("hour") - duration(minutes=1),
             slot_length=duration(hours=1),
@@ -105,7 +105,7 @@ class WeeklyAggregatedSSPProfile(AggregatedSSPProfileBase):
 
     def _get_timeslots(self, start_time: DateTime, end_time: DateTime) -> Iterable:
         assert end_time - start_time >= duration(weeks=1), "Time period should be >= 1 week."
-        return create_market_slots(
+        return get_market_slots(
             start_time=start_time.start_of("week"),
             end_time=end_time.start_of("week") - duration(weeks=1),
             slot_length=duration(weeks=1),
@@ -115,7 +115,7 @@ class WeeklyAggregatedSSPProfile(AggregatedSSPProfileBase):
         return sum(
             [
                 float(self._SSP_AGGREGATED_PROFILE[str(t.month)])
-                for t in create_market_slots(timeslot, timeslot.add(days=6), duration(days=1))
+                for t in get_market_slots(timeslot, timeslot.add(days=6), duration(days=1))
             ]
         )
 
@@ -128,7 +128,7 @@ class MonthlyAggregatedSSPProfile(AggregatedSSPProfileBase):
 
     def _get_timeslots(self, start_time: DateTime, end_time: DateTime) -> Iterable:
         assert end_time - start_time >= duration(months=1), "Time period should be >= 1 month."
-        return create_market_slots(
+        return get_market_slots(
             start_time=start_time.start_of("month"),
             end_time=end_time.start_of("month") - duration(days=1),
             slot_length=duration(months=1),
@@ -148,7 +148,7 @@ class YearlyAggregatedSSPProfile(AggregatedSSPProfileBase):
 
     def _get_timeslots(self, start_time: DateTime, end_time: DateTime) -> Iterable:
         assert end_time - start_time >= duration(years=1), "Time period should be >= 1 year."
-        return create_market_slots(
+        return get_market_slots(
             start_time=start_time.start_of("year"),
             end_time=end_time.start_of("year") - duration(days=1),
             slot_length=duration(years=1),
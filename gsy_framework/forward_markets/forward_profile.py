@@ -9,7 +9,7 @@ import pendulum
 
 import gsy_framework
 from gsy_framework.enums import AvailableMarketTypes
-from gsy_framework.forward_markets.utils import create_market_slots
+from gsy_framework.forward_markets.utils import get_market_slots
 
 gsy_framework_path = os.path.dirname(inspect.getsourcefile(gsy_framework))
 
@@ -21,6 +21,13 @@ ALLOWED_MARKET_TYPES = [
     AvailableMarketTypes.MONTH_FORWARD,
     AvailableMarketTypes.YEAR_FORWARD,
 ]
+# Period of time that the trade profile of each product type spans
+PRODUCT_TYPE_PERIODS = {
+    AvailableMarketTypes.YEAR_FORWARD: "year",
+    AvailableMarketTypes.MONTH_FORWARD: "month",
+    AvailableMarketTypes.WEEK_FORWARD: "week",
+    AvailableMarketTypes.DAY_FORWARD: "day",
+}
 
 
 class StandardProfileException(Exception):
@@ -112,16 +119,9 @@ class ForwardTradeProfileGenerator:
         """
         assert product_type in ALLOWED_MARKET_TYPES
 
-        period_string_mapping = {
-            AvailableMarketTypes.YEAR_FORWARD: "year",
-            AvailableMarketTypes.MONTH_FORWARD: "month",
-            AvailableMarketTypes.WEEK_FORWARD: "week",
-            AvailableMarketTypes.DAY_FORWARD: "day",
-        }
-
-        time_slots = create_market_slots(
-            start_time=market_slot.start_of(period_string_mapping[product_type]),
-            end_time=market_slot.end_of(period_string_mapping[product_type]),
+        time_slots = get_market_slots(
+            start_time=market_slot.start_of(PRODUCT_TYPE_PERIODS[product_type]),
+            end_time=market_slot.end_of(PRODUCT_TYPE_PERIODS[product_type]),
             slot_length=pendulum.duration(minutes=15),
         )
         assert time_slots
@@ -1,12 +1,176 @@
-from pendulum import DateTime, Duration
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple, Union
 
+from pendulum import UTC, DateTime, Duration, FixedTimezone
 
-def create_market_slots(start_time: DateTime, end_time: DateTime, slot_length: Duration) -> list:
-    """Return a list of DateTimes respecting the start, end and slot length."""
+# Total number of market slots that are memoized, across all (start time, end time, slot length)
+# combinations. Enough for two leap years of 15-minute market slots.
+MARKET_SLOTS_CACHE_MAX_SLOTS = 2 * 366 * 96
 
-    timestamps = []
-    current = start_time
-    while current <= end_time:
-        timestamps.append(current)
-        current = current + slot_length
-    return timestamps
+
+def has_fixed_utc_offset(time_slot: DateTime) -> bool:
+    """Return True if the time zone of the time slot has no daylight saving time transitions."""
+    tzinfo = time_slot.tzinfo
+    return tzinfo is None or tzinfo is UTC or isinstance(tzinfo, (FixedTimezone, timezone))
+
+
+def _is_calendar_duration(duration: timedelta) -> bool:
+    """Return True if the duration contains months or years, that have no fixed length."""
+    return bool(getattr(duration, "years", 0) or getattr(duration, "months", 0))
+
+
+def add_duration(time_slot: DateTime, duration: timedelta, count: int = 1) -> DateTime:
+    """Return the time slot that is count durations after time_slot.
+
+    Equivalent to adding the duration count times: days and weeks are added on the wall clock,
+    hours, minutes and seconds on the absolute time. Multiplying a pendulum Duration would turn
+    its days into seconds instead, shifting day and week steps by the daylight saving time.
+    """
+    if isinstance(duration, Duration):
+        signature = duration._signature  # pylint: disable=protected-access
+        return time_slot.add(**{unit: value * count for unit, value in signature.items()})
+    return time_slot + duration * count
+
+
+class MarketSlotRange(Sequence):
+    """Market slots from start_time to end_time (inclusive), with slot_length between them.
+
+    Lightweight alternative to a list of the market slots: the market slot with index i is
+    calculated on access by adding slot_length i times to start_time (see add_duration).
+    Calendar slot lengths (months, years) follow the calendar from start_time, e.g. monthly slots
+    starting on January 31st continue on the last days of the following months.
+    """
+
+    def __init__(self, start_time: DateTime, end_time: DateTime, slot_length: Duration):
+        if slot_length <= timedelta(0) and not _is_calendar_duration(slot_length):
+            raise ValueError(f"The slot length should be positive ({slot_length}).")
+        self.start_time = start_time
+        self.end_time = end_time
+        self.slot_length = slot_length
+        self._step: Optional[timedelta] = None
+        if not _is_calendar_duration(slot_length) and has_fixed_utc_offset(start_time):
+            # Slots of fixed length are calculated with the (much faster) arithmetic of datetime
+            self._step = timedelta(days=slot_length.days, seconds=slot_length.seconds,
+                                   microseconds=slot_length.microseconds)
+        self._length = self._calculate_length()
+
+    def _get_market_slot(self, index: int) -> DateTime:
+        if self._step is not None:
+            # datetime.__add__ returns an object of the type of start_time (e.g. pendulum DateTime)
+            return datetime.__add__(self.start_time, self._step * index)
+        return add_duration(self.start_time, self.slot_length, index)
+
+    def _calculate_length(self) -> int:
+        if self.end_time < self.start_time:
+            return 0
+        if self._step is not None:
+            return datetime.__sub__(self.end_time, self.start_time) // self._step + 1
+        length = 0
+        while self._get_market_slot(length) <= self.end_time:
+            length += 1
+        return length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[DateTime, List[DateTime]]:
+        if isinstance(index, slice):
+            return [self._get_market_slot(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("Market slot index out of range.")
+        return self._get_market_slot(index)
+
+    def __iter__(self) -> Iterator[DateTime]:
+        for index in range(self._length):
+            yield self._get_market_slot(index)
+
+    def __contains__(self, time_slot) -> bool:
+        if self._step is None or not isinstance(time_slot, datetime):
+            return super().__contains__(time_slot)
+        if not self._length or not self.start_time <= time_slot <= self.end_time:
+            return False
+        return datetime.__sub__(time_slot, self.start_time) % self._step == timedelta(0)
+
+    def __repr__(self) -> str:
+        return (f"MarketSlotRange(start_time={self.start_time}, end_time={self.end_time}, "
+                f"slot_length={self.slot_length})")
+
+
+class _MarketSlotsCache:
+    """Least recently used cache of market slots, bounded by the total number of market slots.
+
+    Market slots of ranges that exceed the bound on their own are not memoized.
+    """
+
+    def __init__(self, max_slots: int):
+        self.max_slots = max_slots
+        self._slot_count = 0
+        self._market_slots: Dict[Hashable, Tuple[DateTime, ...]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Tuple[DateTime, ...]]:
+        """Return the memoized market slots of the key, or None if they are not memoized."""
+        market_slots = self._market_slots.get(key)
+        if market_slots is not None:
+            self._market_slots.move_to_end(key)
+        return market_slots
+
+    def add(self, key: Hashable, market_slots: Tuple[DateTime, ...]):
+        """Memoize the market slots, evicting the least recently used ones to stay in bounds."""
+        if len(market_slots) > self.max_slots or key in self._market_slots:
+            return
+        while self._slot_count + len(market_slots) > self.max_slots:
+            _, evicted_market_slots = self._market_slots.popitem(last=False)
+            self._slot_count -= len(evicted_market_slots)
+        self._market_slots[key] = market_slots
+        self._slot_count += len(market_slots)
+
+    def clear(self):
+        """Discard all memoized market slots."""
+        self._market_slots.clear()
+        self._slot_count = 0
+
+    @property
+    def slot_count(self) -> int:
+        """Return the total number of memoized market slots."""
+        return self._slot_count
+
+
+_market_slots_cache = _MarketSlotsCache(MARKET_SLOTS_CACHE_MAX_SLOTS)
+
+
+def get_market_slots(
+        start_time: DateTime, end_time: DateTime, slot_length: Duration
+) -> Tuple[DateTime, ...]:
+    """Return a tuple of DateTimes respecting the start, end and slot length.
+
+    The market slots are memoized for the most recent arguments, and the memoized tuple is
+    returned without copying it. Preferable over create_market_slots for callers that only
+    iterate over the market slots.
+    """
+    # DateTimes of different time zones and calendar/fixed durations (e.g. 1 month and 30 days)
+    # compare equal, therefore they are distinguished explicitly in the key of the cache
+    cache_key = (start_time, end_time, slot_length, start_time.tzinfo, end_time.tzinfo,
+                 getattr(slot_length, "years", 0), getattr(slot_length, "months", 0))
+    market_slots = _market_slots_cache.get(cache_key)
+    if market_slots is None:
+        market_slots = tuple(MarketSlotRange(start_time, end_time, slot_length))
+        _market_slots_cache.add(cache_key, market_slots)
+    return market_slots
+
+
+def create_market_slots(
+        start_time: DateTime, end_time: DateTime, slot_length: Duration,
+        as_range: bool = False) -> Union[List[DateTime], MarketSlotRange]:
+    """Return a list of DateTimes respecting the start, end and slot length.
+
+    If as_range is True, a MarketSlotRange is returned instead of a list, that calculates the
+    market slots on access. Callers that only iterate over the market slots should use
+    get_market_slots, that avoids copying the memoized market slots into a new list.
+    """
+    if as_range:
+        return MarketSlotRange(start_time, end_time, slot_length)
+    return list(get_market_slots(start_time, end_time, slot_length))
@@ -30,6 +30,9 @@ class DisabledKafkaConnection:
     def publish(self, results, job_id):
         pass
 
+    def publish_results_delta(self, results_handler, job_id):
+        pass
+
     @staticmethod
     def is_enabled():
         return False
@@ -70,6 +73,13 @@ class KafkaConnection(DisabledKafkaConnection):
             add_callback(self._on_send_success).add_errback(self._on_send_error)
         self.producer.flush()
 
+    def publish_results_delta(self, results_handler, job_id):
+        """Publish the DB results of the ResultsHandler that changed since the previous call.
+
+        Consumers rebuild the full results with ResultsDeltaDecoder.
+        """
+        self.publish(results_handler.get_db_results_delta(), job_id)
+
     @staticmethod
     def is_enabled():
         return True
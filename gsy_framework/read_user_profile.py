@@ -38,6 +38,7 @@ from gsy_framework.exceptions import GSyReadProfileException
 from gsy_framework.utils import (
     convert_kW_to_kWh,
     get_from_profile_same_weekday_and_time,
+    ProfileWeekdayTimeIndex,
     generate_market_slot_list,
     return_ordered_dict,
     convert_kWh_to_W,
@@ -105,7 +106,9 @@ class UserProfileReader:
         return {
             time_slot: val
             for time_slot in generate_market_slot_list(
-                start_timestamp=current_timestamp, profile_length_days=self._profile_length_days
+                start_timestamp=current_timestamp,
+                profile_length_days=self._profile_length_days,
+                as_range=True,
             )
         }
 
@@ -254,10 +257,13 @@ class UserProfileReader:
             )
             return input_profile
 
+        profile_index = None
         for time in out_profile.keys():
             if time not in input_profile:
+                if profile_index is None:
+                    profile_index = ProfileWeekdayTimeIndex(input_profile)
                 temp_val = get_from_profile_same_weekday_and_time(
-                    input_profile, time, ignore_not_found=True
+                    input_profile, time, ignore_not_found=True, profile_index=profile_index
                 )
                 if temp_val is not None:
                     current_val = temp_val
@@ -347,7 +353,9 @@ class UserProfileReader:
             (self._hour_time_str(time.hour, time.minute), time) for time in in_profile.keys()
         )
         out_profile = {}
-        for slot_time in generate_market_slot_list(start_timestamp=current_timestamp):
+        for slot_time in generate_market_slot_list(
+            start_timestamp=current_timestamp, as_range=True
+        ):
             if slot_time not in out_profile:
                 time_key = self._hour_time_str(slot_time.hour, slot_time.minute)
                 if time_key in daytime_dict:
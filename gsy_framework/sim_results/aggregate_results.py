@@ -47,17 +47,48 @@ def merge_last_market_results_to_global(
     global_results: Dict,
     slot_list_ui_format: List = None,
     requested_fields: List = None,
+    sparse: bool = False,
 ):
     """Global results are the accumulated statistics from the beginning of the simulation.
     This function updates the global results using the market results which are results of
     the current market slot.
+
+    If sparse is True, only the traded slots are stored in the global results, instead of
+    filling all slots of slot_list_ui_format with zeros, and empty global results are replaced
+    by the compact containers of the result classes. The sparse global results should be
+    converted with densify_global_results before being exported.
     """
 
     if requested_fields is None:
         requested_fields = REQUESTED_FIELDS_LIST
     for field in requested_fields:
+        if sparse and global_results[field] == {}:
+            global_results[field] = REQUESTED_FIELDS_CLASS_MAP[
+                field].create_sparse_global_results()
         global_results[field] = REQUESTED_FIELDS_CLASS_MAP[field].merge_results_to_global(
-            market_results[field], global_results[field], slot_list_ui_format
+            market_results[field], global_results[field],
+            None if sparse else slot_list_ui_format
         )
 
     return global_results
+
+
+def densify_global_results(
+    global_results: Dict,
+    slot_list_ui_format: List,
+    requested_fields: List = None,
+):
+    """Return the global results that were merged with sparse=True, with the slots that were
+    not traded filled in, in the same format as if they were merged with sparse=False.
+    """
+    if requested_fields is None:
+        requested_fields = REQUESTED_FIELDS_LIST
+    return {
+        **global_results,
+        **{
+            field: REQUESTED_FIELDS_CLASS_MAP[field].densify_global_results(
+                global_results[field], slot_list_ui_format
+            )
+            for field in requested_fields
+        },
+    }
@@ -1,8 +1,9 @@
 import logging
 import traceback
 from time import time
-from typing import Dict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
+from gsy_framework.sim_results.area_index import AreaTopologyCache
 from gsy_framework.sim_results.area_throughput_stats import AreaThroughputStats
 from gsy_framework.sim_results.bills import CumulativeBills, MarketEnergyBills
 from gsy_framework.sim_results.cumulative_grid_trades import CumulativeGridTrades
@@ -14,33 +15,80 @@ from gsy_framework.sim_results.market_price_energy_day import MarketPriceEnergyD
 from gsy_framework.sim_results.market_summary_info import MarketSummaryInfo
 from gsy_framework.sim_results.scm.results import SCMResults
 from gsy_framework.sim_results.simulation_assets_info import SimulationAssetsInfo
+from gsy_framework.sim_results.trade_index import TradeIndex
 from gsy_framework.sim_results.imported_exported_energy import ImportedExportedEnergyHandler
+from gsy_framework.sim_results.results_abc import ResultsBaseClass
+from gsy_framework.sim_results.results_checkpoint import (
+    decode_results_checkpoint, encode_results_checkpoint)
+from gsy_framework.sim_results.results_delta import (
+    DEFAULT_KEYFRAME_INTERVAL, ResultsDeltaEncoder)
+
+# Factories of all result objects, called with the should_export_plots flag.
+RESULT_FACTORIES: Dict[str, Callable[[bool], ResultsBaseClass]] = {
+    "kpi": lambda _: KPI(),
+    "cumulative_net_energy_flow": lambda _: CumulativeNetEnergyFlow(),
+    "price_energy_day": MarketPriceEnergyDay,
+    "cumulative_bills": lambda _: CumulativeBills(),
+    "cumulative_grid_trades": lambda _: CumulativeGridTrades(),
+    "device_statistics": DeviceStatistics,
+    "trade_profile": EnergyTradeProfile,
+    "area_throughput": lambda _: AreaThroughputStats(),
+    "assets_info": lambda _: SimulationAssetsInfo(),
+    "imported_exported_energy": ImportedExportedEnergyHandler,
+    "bills": MarketEnergyBills,
+    "market_summary": MarketSummaryInfo,
+}
+
+
+def resolve_result_keys(requested_results: Optional[Iterable[str]] = None) -> List[str]:
+    """Return the requested result keys, in the order of RESULT_FACTORIES.
+
+    All result keys are returned if requested_results is None.
+    """
+    if requested_results is None:
+        return list(RESULT_FACTORIES.keys())
+    requested_results = set(requested_results)
+    for result_key in requested_results:
+        if result_key not in RESULT_FACTORIES:
+            raise ValueError(f"Result {result_key} is not supported.")
+    return [result_key for result_key in RESULT_FACTORIES if result_key in requested_results]
 
 
 class ResultsHandler:
     """Calculate all results for each market slot."""
 
-    def __init__(self, should_export_plots: bool = False):
+    def __init__(
+        self,
+        should_export_plots: bool = False,
+        requested_results: Optional[Iterable[str]] = None,
+        delta_keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+    ):
         self.forward_market_enabled = False
         self.should_export_plots = should_export_plots
         self.bids_offers_trades = {}
+        # Only the requested result objects are instantiated and updated. All result objects
+        # are used if requested_results is None.
         self.results_mapping = {
-            "kpi": KPI(),
-            "cumulative_net_energy_flow": CumulativeNetEnergyFlow(),
-            "price_energy_day": MarketPriceEnergyDay(should_export_plots),
-            "cumulative_bills": CumulativeBills(),
-            "cumulative_grid_trades": CumulativeGridTrades(),
-            "device_statistics": DeviceStatistics(should_export_plots),
-            "trade_profile": EnergyTradeProfile(should_export_plots),
-            "area_throughput": AreaThroughputStats(),
-            "assets_info": SimulationAssetsInfo(),
-            "imported_exported_energy": ImportedExportedEnergyHandler(should_export_plots),
-            "bills": MarketEnergyBills(should_export_plots),
-            "market_summary": MarketSummaryInfo(should_export_plots),
+            result_key: RESULT_FACTORIES[result_key](should_export_plots)
+            for result_key in resolve_result_keys(requested_results)
         }
 
+        # The area index is reused between market slots for as long as the topology is the same
+        self._area_topology_cache = AreaTopologyCache()
+        # Tracks the DB results that were already published, see get_db_results_delta
+        self._db_results_delta_encoder = ResultsDeltaEncoder(delta_keyframe_interval)
+        # Paths of the DB results that were changed by the ResultsHandler itself since the
+        # previous delta. The result objects track their own changes.
+        self._changed_db_results_paths: Set[Tuple[str, ...]] = set()
         self._total_memory_utilization_kb = 0.0
 
+    def invalidate_topology(self):
+        """Discard the cached index of the area tree.
+
+        Should be called after live events that add or remove areas.
+        """
+        self._area_topology_cache.invalidate()
+
     def _update_memory_utilization(self):
         start_time = time()
         self._total_memory_utilization_kb = sum(
@@ -59,16 +107,32 @@ class ResultsHandler:
             self.bids_offers_trades[area_uuid] = {
                 k: area_result.get(k, []) for k in ("offers", "bids", "trades")
             }
+            self._changed_db_results_paths.add(("bids_offers_trades", area_uuid))
+        # The area tree and the trades are indexed once per market slot and shared by all
+        # result objects. The index of the area tree is reused if the topology has not changed.
+        area_index = self._area_topology_cache.get_area_index(area_dict) if area_dict else None
+        trade_index = TradeIndex(core_stats) if core_stats else None
         for result_object in self.results_mapping.values():
-            try:
-                result_object.update(area_dict, core_stats, current_market_slot)
-            except Exception as ex:  # pylint: disable=broad-except
-                logging.error(
-                    "Result calculation failed on market slot %s with error %s, %s",
-                    current_market_slot,
-                    str(ex),
-                    traceback.format_exc(),
-                )
+            result_object.set_area_index(area_index)
+            result_object.set_trade_index(trade_index)
+        try:
+            # The result objects are updated sequentially. Their updates are pure Python and hold
+            # the GIL, therefore a thread pool does not speed them up, and the shared indexes are
+            # built lazily and are not thread-safe.
+            for result_object in self.results_mapping.values():
+                try:
+                    result_object.update(area_dict, core_stats, current_market_slot)
+                except Exception as ex:  # pylint: disable=broad-except
+                    logging.error(
+                        "Result calculation failed on market slot %s with error %s, %s",
+                        current_market_slot,
+                        str(ex),
+                        traceback.format_exc(),
+                    )
+        finally:
+            for result_object in self.results_mapping.values():
+                result_object.set_area_index(None)
+                result_object.set_trade_index(None)
 
         self._update_memory_utilization()
 
@@ -83,9 +147,11 @@ class ResultsHandler:
         self, config_tree, area_results_map, cumulative_grid_fees=None, assets_info=None
     ):
         """Restore all area results from the state persisted to the DB."""
-        if cumulative_grid_fees is not None:
+        # The restored results are not tracked as changes, therefore they are published in full
+        self.request_db_results_keyframe()
+        if cumulative_grid_fees is not None and "bills" in self.results_mapping:
             self.results_mapping["bills"].restore_cumulative_fees_whole_sim(cumulative_grid_fees)
-        if assets_info is not None:
+        if assets_info is not None and "assets_info" in self.results_mapping:
             self.results_mapping["assets_info"].restore_assets_info(assets_info)
         if area_results_map.get(config_tree["uuid"], {}):
             area_results = area_results_map[config_tree["uuid"]]
@@ -97,6 +163,29 @@ class ResultsHandler:
         for child in config_tree["children"]:
             self.restore_area_results_state(child, area_results_map)
 
+    def create_checkpoint(self) -> bytes:
+        """Snapshot the internal state of all result objects into a binary checkpoint."""
+        return encode_results_checkpoint({
+            "bids_offers_trades": self.bids_offers_trades,
+            "results": {
+                result_key: result_object.get_checkpoint_state()
+                for result_key, result_object in self.results_mapping.items()
+            },
+        })
+
+    def restore_from_checkpoint(self, checkpoint: bytes):
+        """Restore the state of all result objects from a checkpoint created by create_checkpoint.
+
+        Faster alternative to restore_area_results_state, that restores the complete state of the
+        result objects at once, instead of rebuilding it from the area results of the DB.
+        """
+        state = decode_results_checkpoint(checkpoint)
+        self.bids_offers_trades = state["bids_offers_trades"]
+        for result_key, result_state in state["results"].items():
+            if result_key in self.results_mapping:
+                self.results_mapping[result_key].restore_checkpoint_state(result_state)
+        self.request_db_results_keyframe()
+
     @property
     def all_raw_results(self) -> Dict:
         """Get all results in raw format."""
@@ -112,11 +201,43 @@ class ResultsHandler:
         """Get dict with all the results in format that can be saved to the DB."""
         results = {k: v.ui_formatted_results for k, v in self.results_mapping.items()}
         results["bids_offers_trades"] = self.bids_offers_trades
-        results["cumulative_market_fees"] = self.results_mapping[
-            "bills"
-        ].cumulative_fee_all_markets_whole_sim
+        if "bills" in self.results_mapping:
+            results["cumulative_market_fees"] = self.results_mapping[
+                "bills"
+            ].cumulative_fee_all_markets_whole_sim
         return results
 
+    def get_db_results_delta(self) -> Dict:
+        """Get the changes of the DB results since the previous call, as a delta message.
+
+        Alternative to publishing all_db_results after every market slot, that includes only
+        the changed results and periodically the full results as a keyframe. The result objects
+        that track their changes contribute only the keys that their updates changed, the other
+        result objects are included as a whole. The full results can be rebuilt from the
+        messages with ResultsDeltaDecoder.
+        """
+        results = self.all_db_results
+        changed_paths = [
+            path for path in self._pop_changed_db_results_paths() if path[0] in results]
+        return self._db_results_delta_encoder.encode(results, changed_paths)
+
+    def _pop_changed_db_results_paths(self) -> Set[Tuple[str, ...]]:
+        changed_paths = self._changed_db_results_paths
+        self._changed_db_results_paths = set()
+        for result_key, result_object in self.results_mapping.items():
+            result_paths = result_object.pop_changed_results_paths()
+            if result_paths is None:
+                changed_paths.add((result_key,))
+            else:
+                changed_paths.update((result_key, *path) for path in result_paths)
+        if "bills" in self.results_mapping:
+            changed_paths.add(("cumulative_market_fees",))
+        return changed_paths
+
+    def request_db_results_keyframe(self):
+        """Include the full DB results in the next message of get_db_results_delta."""
+        self._db_results_delta_encoder.request_keyframe()
+
     @property
     def trade_profile_plot_results(self):
         """Get plot results for the trade profile."""
@@ -132,7 +253,7 @@ class SCMResultsHandler(ResultsHandler):
     """Calculate all results for each market slot for SCM simulations"""
 
     def __init__(self):
-        super().__init__()
+        super().__init__(requested_results=())
         self.results_mapping = {
             "results": SCMResults(),
         }
@@ -0,0 +1,196 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of Grid Singularity Exchange.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from uuid import uuid4
+
+from gsy_framework.sim_results import get_unified_area_type
+
+
+@dataclass
+class AreaNode:
+    """Node of the area tree, together with the information that is derived from its children."""
+
+    area_dict: Dict
+    uuid: str
+    name: str
+    parent_uuid: Optional[str]
+    child_uuids: List[str] = field(default_factory=list)
+    child_names: FrozenSet[str] = frozenset()
+    child_name_uuid_mapping: Dict[str, str] = field(default_factory=dict)
+    # Positions of the node in the pre-order and post-order traversals of the tree
+    traversal_position: int = 0
+    bottom_up_position: int = 0
+    subtree_size: int = 1
+
+    @cached_property
+    def unified_type(self) -> str:
+        """Return the string that identifies the type of the area."""
+        return get_unified_area_type(self.area_dict)
+
+    @property
+    def is_leaf(self) -> bool:
+        """Return True if the node has no children."""
+        return not self.child_uuids
+
+
+class AreaIndex:
+    """Index of the area tree, built once per market slot and shared by all result objects.
+
+    Replaces the recursive walks of the area tree that each result object used to perform, by
+    providing constant-time access to the nodes, their parents and children, and precomputed
+    traversal orders.
+    """
+
+    def __init__(self, area_dict: Dict):
+        self.root_uuid = area_dict["uuid"]
+        # Unique for each built index, also across processes (e.g. for result objects restored
+        # from a checkpoint). Since an index is reused only for as long as the topology stays the
+        # same, results that depend only on the topology can be cached per version.
+        self.topology_version = uuid4().hex
+        self._nodes: Dict[str, AreaNode] = {}
+        self.traversal_order: List[AreaNode] = []
+        self.bottom_up_order: List[AreaNode] = []
+        self._build(area_dict)
+
+    def _build(self, root_area_dict: Dict):
+        stack = [(root_area_dict, None)]
+        while stack:
+            area_dict, parent_uuid = stack.pop()
+            children = area_dict.get("children") or []
+            node = AreaNode(
+                area_dict=area_dict,
+                uuid=area_dict["uuid"],
+                name=area_dict["name"],
+                parent_uuid=parent_uuid,
+                child_uuids=[child["uuid"] for child in children],
+                child_names=frozenset(child["name"] for child in children),
+                child_name_uuid_mapping={child["name"]: child["uuid"] for child in children},
+                traversal_position=len(self.traversal_order),
+            )
+            self._nodes[node.uuid] = node
+            self.traversal_order.append(node)
+            stack.extend((child, node.uuid) for child in reversed(children))
+
+        bottom_up_stack = [(self._nodes[self.root_uuid], False)]
+        while bottom_up_stack:
+            node, children_visited = bottom_up_stack.pop()
+            if children_visited:
+                node.bottom_up_position = len(self.bottom_up_order)
+                node.subtree_size += sum(
+                    self._nodes[child_uuid].subtree_size for child_uuid in node.child_uuids
+                )
+                self.bottom_up_order.append(node)
+                continue
+            bottom_up_stack.append((node, True))
+            bottom_up_stack.extend(
+                (self._nodes[child_uuid], False) for child_uuid in reversed(node.child_uuids)
+            )
+
+    def __contains__(self, area_uuid: str) -> bool:
+        return area_uuid in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def node(self, area_uuid: str) -> AreaNode:
+        """Return the node of the area with the given uuid."""
+        return self._nodes[area_uuid]
+
+    def parent(self, area_uuid: str) -> Optional[AreaNode]:
+        """Return the node of the parent of the area, or None for the root area."""
+        parent_uuid = self._nodes[area_uuid].parent_uuid
+        return self._nodes[parent_uuid] if parent_uuid is not None else None
+
+    def children(self, area_uuid: str) -> List[AreaNode]:
+        """Return the nodes of the children of the area."""
+        return [self._nodes[child_uuid] for child_uuid in self._nodes[area_uuid].child_uuids]
+
+    def subtree(self, area_uuid: str) -> List[AreaNode]:
+        """Return the area and all its descendants in pre-order (parents before children)."""
+        node = self._nodes[area_uuid]
+        return self.traversal_order[
+            node.traversal_position:node.traversal_position + node.subtree_size
+        ]
+
+    def subtree_bottom_up(self, area_uuid: str) -> List[AreaNode]:
+        """Return the area and all its descendants in post-order (children before parents)."""
+        node = self._nodes[area_uuid]
+        return self.bottom_up_order[
+            node.bottom_up_position + 1 - node.subtree_size:node.bottom_up_position + 1
+        ]
+
+    @cached_property
+    def uuid_name_mapping(self) -> Dict[str, str]:
+        """Return the mapping between the uuids and the names of all areas."""
+        return {area_uuid: node.name for area_uuid, node in self._nodes.items()}
+
+    def rebind_area_dicts(self, area_dicts: List[Dict]):
+        """Point the nodes to the area dicts of a tree with the same topology.
+
+        The area dicts should be provided in pre-order, as returned by get_topology_key.
+        """
+        for node, area_dict in zip(self.traversal_order, area_dicts):
+            node.area_dict = area_dict
+
+
+def get_topology_key(area_dict: Dict) -> Tuple[Tuple, List[Dict]]:
+    """Return the structural key of the area tree, together with its area dicts in pre-order.
+
+    Two area trees have the same key only if their areas have the same uuids, names and types,
+    and are connected in the same way.
+    """
+    key = []
+    area_dicts = []
+    stack = [area_dict]
+    while stack:
+        area = stack.pop()
+        children = area.get("children") or []
+        key.append((area["uuid"], area["name"], area.get("type"), len(children)))
+        area_dicts.append(area)
+        stack.extend(reversed(children))
+    return tuple(key), area_dicts
+
+
+class AreaTopologyCache:
+    """Cache of the area index, reused for as long as the topology of the area tree is the same.
+
+    The grid topology rarely changes during a simulation, therefore the area index is rebuilt only
+    when the structural key of the area tree changes, or after invalidate() is called (e.g. after
+    a live event that adds or removes areas).
+    """
+
+    def __init__(self):
+        self._topology_key: Optional[Tuple] = None
+        self._area_index: Optional[AreaIndex] = None
+
+    def get_area_index(self, area_dict: Dict) -> AreaIndex:
+        """Return the index of the area tree, reused from the cache if the topology is the same."""
+        topology_key, area_dicts = get_topology_key(area_dict)
+        if self._area_index is not None and topology_key == self._topology_key:
+            self._area_index.rebind_area_dicts(area_dicts)
+        else:
+            self._area_index = AreaIndex(area_dict)
+            self._topology_key = topology_key
+        return self._area_index
+
+    def invalidate(self):
+        """Discard the cached area index. Should be called when areas are added or removed."""
+        self._topology_key = None
+        self._area_index = None
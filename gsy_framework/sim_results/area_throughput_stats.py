@@ -15,84 +15,206 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-from typing import Dict
-from gsy_framework.utils import round_floats_for_ui, create_subdict_or_update
+from math import isnan, nan
+from typing import Dict, List, Optional, Tuple
+
+from gsy_framework.sim_results.columnar_history import ColumnarHistory
+from gsy_framework.utils import round_floats_for_ui
 from gsy_framework.sim_results.results_abc import ResultsBaseClass
 
+# Figures of the throughput of an area in one time slot. Optional figures that are not reported
+# are stored as NaN.
+THROUGHPUT_COLUMNS = (
+    "import_peak_energy_trade_kWh", "import_peak_energy_net_kWh", "import_peak_percentage",
+    "import_baseline_peak_energy_kWh", "import_capacity_kWh",
+    "export_peak_energy_trade_kWh", "export_peak_energy_net_kWh", "export_peak_percentage",
+    "export_baseline_peak_energy_kWh", "export_capacity_kWh",
+    "net_energy_flow_peak_energy_kWh",
+)
+
+
+def _calculate_throughput_figures(area_throughput: Dict) -> Tuple[float, ...]:
+    imported_peak = round_floats_for_ui(area_throughput.get('imported_energy_kWh', 0.))
+    exported_peak = round_floats_for_ui(area_throughput.get('exported_energy_kWh', 0.))
+    net_peak = round_floats_for_ui(imported_peak - exported_peak)
+    import_peak_energy_net_kWh = net_peak if net_peak > 0 else 0.
+    export_peak_energy_net_kWh = abs(net_peak) if net_peak < 0 else 0.
+
+    import_percentage = import_baseline = export_percentage = export_baseline = nan
+    baseline_import = area_throughput.get('baseline_peak_energy_import_kWh', None)
+    baseline_export = area_throughput.get('baseline_peak_energy_export_kWh', None)
+    if baseline_import is not None and baseline_import > 0:
+        import_percentage = round_floats_for_ui(
+            import_peak_energy_net_kWh / baseline_import * 100)
+        import_baseline = round_floats_for_ui(baseline_import)
+    if baseline_export is not None and baseline_export > 0:
+        export_percentage = round_floats_for_ui(
+            export_peak_energy_net_kWh / baseline_export * 100)
+        export_baseline = round_floats_for_ui(baseline_export)
+
+    import_capacity = area_throughput.get('import_capacity_kWh', None)
+    export_capacity = area_throughput.get('export_capacity_kWh', None)
+    return (
+        imported_peak, import_peak_energy_net_kWh, import_percentage, import_baseline,
+        round_floats_for_ui(import_capacity)
+        if import_capacity is not None and import_capacity > 0 else nan,
+        exported_peak, export_peak_energy_net_kWh, export_percentage, export_baseline,
+        round_floats_for_ui(export_capacity)
+        if export_capacity is not None and export_capacity > 0 else nan,
+        net_peak,
+    )
+
+
+def _direction_results(peak_energy_trade_kWh: float, peak_energy_net_kWh: float,
+                       peak_percentage: float, baseline_peak_energy_kWh: float,
+                       capacity_kWh: float) -> Dict:
+    results = {'peak_energy_trade_kWh': peak_energy_trade_kWh,
+               "peak_energy_net_kWh": peak_energy_net_kWh}
+    if not isnan(peak_percentage):
+        results.update({'peak_percentage': peak_percentage,
+                        'baseline_peak_energy_kWh': baseline_peak_energy_kWh})
+    if not isnan(capacity_kWh):
+        results['capacity_kWh'] = capacity_kWh
+    return results
+
+
+def throughput_figures_to_results(figures: Tuple[float, ...]) -> Dict:
+    """Convert the throughput figures of an area for one time slot to the results dict."""
+    return {
+        "import": _direction_results(*figures[0:5]),
+        "export": _direction_results(*figures[5:10]),
+        "net_energy_flow": {'peak_energy_kWh': figures[10]},
+    }
+
+
+def throughput_results_to_figures(area_results: Dict) -> Tuple[float, ...]:
+    """Convert the throughput results dict of an area for one time slot to the figures."""
+    return tuple(
+        area_results[direction].get(figure, nan)
+        for direction in ("import", "export")
+        for figure in ('peak_energy_trade_kWh', "peak_energy_net_kWh", 'peak_percentage',
+                       'baseline_peak_energy_kWh', 'capacity_kWh')
+    ) + (area_results["net_energy_flow"]['peak_energy_kWh'],)
+
+
+class ThroughputHistory(ColumnarHistory):
+    """Columnar throughput history of areas, that can be used as global throughput results.
+
+    Used as the sparse global results of AreaThroughputStats.merge_results_to_global, in order
+    to store a few floats per area and time slot instead of nested dicts.
+    """
+
+    def __init__(self):
+        super().__init__(THROUGHPUT_COLUMNS)
+
+    def add_results(self, area_key: str, time_slot: str, area_results: Dict):
+        """Store the throughput results dict of the area for the time slot."""
+        self.set_row(area_key, time_slot, throughput_results_to_figures(area_results))
+
+    def to_dict(self) -> Dict:
+        """Return the history in the format of the dict global throughput results."""
+        return {
+            area_key: {
+                time_slot: throughput_figures_to_results(figures)
+                for time_slot, figures in self.area_rows(area_key)
+            }
+            for area_key in self.area_keys
+        }
+
 
 class AreaThroughputStats(ResultsBaseClass):
     def __init__(self):
-        self.results = {}
-        self.results_redis = {}
         self.exported_energy = {}
         self.imported_energy = {}
+        self._current_market_slot: Optional[str] = None
+        # Throughput figures of the areas in the current market slot, keyed by area uuid
+        self._area_figures: Dict[str, Tuple[float, ...]] = {}
+        self._area_names: Dict[str, str] = {}
+        self._area_results: Optional[Dict[str, Dict]] = None
+        # Views of the current market slot, created on the first access after the update
+        self._results: Optional[Dict] = None
+        self._results_redis: Optional[Dict] = None
 
     def update(self, area_result_dict=None, core_stats=None, current_market_slot=None):
         if not self._has_update_parameters(
                 area_result_dict, core_stats, current_market_slot):
             return
-        self.results = {}
-        self.results_redis = {}
+        self._current_market_slot = current_market_slot
+        self._area_figures = {}
+        self._area_names = {}
         self.update_results(area_result_dict, core_stats, current_market_slot)
 
     def update_results(self, area_dict, core_stats, current_market_time_slot_str):
-        area_throughput = core_stats.get(area_dict['uuid'], {}).get('area_throughput', {})
-        imported_peak = round_floats_for_ui(area_throughput.get('imported_energy_kWh', 0.))
-        exported_peak = round_floats_for_ui(area_throughput.get('exported_energy_kWh', 0.))
-        net_peak = round_floats_for_ui(imported_peak - exported_peak)
-        import_peak_energy_net_kWh = net_peak if net_peak > 0 else 0.
-        export_peak_energy_net_kWh = abs(net_peak) if net_peak < 0 else 0.
-        area_results = {
-            "import": {'peak_energy_trade_kWh': imported_peak,
-                       "peak_energy_net_kWh": import_peak_energy_net_kWh},
-            "export": {'peak_energy_trade_kWh': exported_peak,
-                       "peak_energy_net_kWh": export_peak_energy_net_kWh},
-            "net_energy_flow": {'peak_energy_kWh': net_peak}
-        }
+        """Calculate the throughput figures of the area and of all its child areas."""
+        self._current_market_slot = current_market_time_slot_str
+        self._area_results = None
+        self._results = None
+        self._results_redis = None
+        area_index = self._get_area_index(area_dict)
+        nodes = [area_index.node(area_dict["uuid"])]
+        while nodes:
+            node = nodes.pop()
+            self._area_figures[node.uuid] = _calculate_throughput_figures(
+                core_stats.get(node.uuid, {}).get('area_throughput', {}))
+            self._area_names[node.uuid] = node.name
+            nodes.extend(
+                child for child in reversed(area_index.children(node.uuid))
+                if child.area_dict['type'] == "Area")
+
+    def _get_area_results(self) -> Dict[str, Dict]:
+        # The results dicts are created once per market slot, and shared by both views
+        if self._area_results is None:
+            self._area_results = {
+                area_uuid: throughput_figures_to_results(figures)
+                for area_uuid, figures in self._area_figures.items()
+            }
+        return self._area_results
+
+    @property
+    def results(self) -> Dict:
+        """Return the throughput results of the current market slot, keyed by area name."""
+        if self._results is None:
+            self._results = {
+                self._area_names[area_uuid]: {self._current_market_slot: area_results}
+                for area_uuid, area_results in self._get_area_results().items()
+            }
+        return self._results
+
+    @results.setter
+    def results(self, results: Dict):
+        self._results = results
+
+    @property
+    def results_redis(self) -> Dict:
+        """Return the throughput results of the current market slot, keyed by area uuid."""
+        if self._results_redis is None:
+            self._results_redis = {
+                area_uuid: {self._current_market_slot: area_results}
+                for area_uuid, area_results in self._get_area_results().items()
+            }
+        return self._results_redis
+
+    @results_redis.setter
+    def results_redis(self, results_redis: Dict):
+        self._results_redis = results_redis
 
-        baseline_import = area_throughput.get('baseline_peak_energy_import_kWh', None)
-        baseline_export = area_throughput.get('baseline_peak_energy_export_kWh', None)
-        if (baseline_import is not None and baseline_import > 0) or \
-                (baseline_export is not None and baseline_export > 0):
-            if baseline_import is not None and baseline_import > 0:
-                peak_percentage = round_floats_for_ui(
-                    area_results['import']['peak_energy_net_kWh'] / baseline_import * 100
-                )
-                area_results["import"].update(
-                    {'peak_percentage': peak_percentage,
-                     'baseline_peak_energy_kWh': round_floats_for_ui(baseline_import)}
-                )
-            if baseline_export is not None and baseline_export > 0:
-                peak_percentage = round_floats_for_ui(
-                    area_results['export']['peak_energy_net_kWh'] / baseline_export * 100
-                )
-                area_results["export"].update(
-                    {'peak_percentage': peak_percentage,
-                     'baseline_peak_energy_kWh': round_floats_for_ui(baseline_export)}
-                )
-
-        import_capacity = area_throughput.get('import_capacity_kWh', None)
-        export_capacity = area_throughput.get('export_capacity_kWh', None)
-        if import_capacity is not None and import_capacity > 0:
-            area_results["import"].update(
-                {'capacity_kWh': round_floats_for_ui(import_capacity)}
-            )
-        if export_capacity is not None and export_capacity > 0:
-            area_results["export"].update(
-                {'capacity_kWh': round_floats_for_ui(export_capacity)}
-            )
-        area_throughput_profile = {}
-        area_throughput_profile[current_market_time_slot_str] = area_results
-
-        create_subdict_or_update(self.results, area_dict['name'], area_throughput_profile)
-        create_subdict_or_update(self.results_redis, area_dict['uuid'], area_throughput_profile)
-
-        for child in area_dict['children']:
-            if child['type'] == "Area":
-                self.update_results(child, core_stats, current_market_time_slot_str)
+    @staticmethod
+    def create_sparse_global_results() -> ThroughputHistory:
+        return ThroughputHistory()
+
+    @staticmethod
+    def densify_global_results(global_results, slot_list: List) -> Dict:
+        if isinstance(global_results, ThroughputHistory):
+            return global_results.to_dict()
+        return global_results
 
     @staticmethod
     def merge_results_to_global(market_trade: Dict, global_trade: Dict, *_):
+        if isinstance(global_trade, ThroughputHistory):
+            for area_uuid, area_profile in market_trade.items():
+                for time_slot, area_results in area_profile.items():
+                    global_trade.add_results(area_uuid, time_slot, area_results)
+            return global_trade
         if not global_trade:
             global_trade = market_trade
             return global_trade
@@ -116,5 +238,5 @@ class AreaThroughputStats(ResultsBaseClass):
 
     def memory_allocation_size_kb(self):
         return self._calculate_memory_allocated_by_objects([
-            self.results, self.results_redis, self.imported_energy, self.exported_energy
+            self._area_figures, self._area_names, self.imported_energy, self.exported_energy
         ])
@@ -15,16 +15,17 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-from copy import copy, deepcopy
-from typing import Dict
+from copy import copy
+from typing import Dict, Set, Tuple
 
 from gsy_framework.constants_limits import ConstSettings
 from gsy_framework.sim_results import (
     get_unified_area_type, is_load_node_type, is_pv_node_type)
+from gsy_framework.sim_results.area_index import AreaIndex
 from gsy_framework.sim_results.results_abc import ResultsBaseClass
+from gsy_framework.sim_results.trade_index import TradeIndex
 from gsy_framework.utils import (
-    area_name_from_area_or_ma_name, get_area_uuid_name_mapping, key_in_dict_and_not_none,
-    round_floats_for_ui)
+    area_name_from_area_or_ma_name, key_in_dict_and_not_none, round_floats_for_ui)
 
 
 # pylint: disable=arguments-renamed
@@ -79,10 +80,12 @@ class CumulativeBills(ResultsBaseClass):
         if not self._has_update_parameters(
                 area_dict, core_stats, current_market_slot):
             return
-        if area_dict.get("children"):
-            for child in area_dict["children"]:
-                self.update(child, core_stats, current_market_slot)
+        trade_index = self._get_trade_index(core_stats)
+        # Children are visited before their parents, whose bills are the sum of their children
+        for node in self._get_area_index(area_dict).subtree_bottom_up(area_dict["uuid"]):
+            self._update_area_bills(node.area_dict, core_stats, trade_index)
 
+    def _update_area_bills(self, area_dict, core_stats, trade_index: TradeIndex):
         if area_dict["uuid"] not in self.cumulative_bills_results:
             self.cumulative_bills_results[area_dict["uuid"]] = {
                 "name": area_dict["name"],
@@ -107,15 +110,14 @@ class CumulativeBills(ResultsBaseClass):
                 "total": sum(c["total"] for c in all_child_results),
             }
         else:
-            parent_area_stats = core_stats.get(area_dict["parent_uuid"], {})
-            trades = parent_area_stats.get("trades", [])
-
-            spent_total = sum(trade["price"]
-                              for trade in trades
-                              if trade["buyer"]["name"] == area_dict["name"]) / 100.0
-            earned = sum(trade["price"] - trade["fee_price"]
-                         for trade in trades
-                         if trade["seller"]["name"] == area_dict["name"]) / 100.0
+            spent_total = sum(
+                trade["price"]
+                for trade in trade_index.bought_by(area_dict["parent_uuid"], area_dict["name"])
+            ) / 100.0
+            earned = sum(
+                trade["price"] - trade["fee_price"]
+                for trade in trade_index.sold_by(area_dict["parent_uuid"], area_dict["name"])
+            ) / 100.0
             penalty_energy = self._calculate_device_penalties(
                 area_dict, core_stats.get(area_dict["uuid"], {})
             )
@@ -153,6 +155,10 @@ class CumulativeBills(ResultsBaseClass):
 class MarketEnergyBills(ResultsBaseClass):
     """Class to compute the energy bills of a market."""
 
+    # The rounded bills cache is keyed by object ids, that are not valid after a restore
+    _checkpoint_excluded_attributes = (
+        *ResultsBaseClass._checkpoint_excluded_attributes, "_rounded_bills_cache")
+
     def __init__(self, should_export_plots=False):
         self._should_export_plots = should_export_plots
         self.current_raw_bills = {}
@@ -161,6 +167,10 @@ class MarketEnergyBills(ResultsBaseClass):
         self.market_fees = {}
         self._cumulative_fee_all_markets_whole_sim = 0.
         self.external_trades = {}
+        # Rounded copies of the bills of the last market slot, keyed by the id of the
+        # unrounded bills. Bills that were not modified in the current market slot are shared
+        # with the previous slot, therefore their rounded copies can be reused.
+        self._rounded_bills_cache: Dict[int, Tuple[Dict, Dict]] = {}
 
     def memory_allocation_size_kb(self):
         return self._calculate_memory_allocated_by_objects([
@@ -209,7 +219,7 @@ class MarketEnergyBills(ResultsBaseClass):
 
     @classmethod
     def _default_area_dict(cls, area_dict):
-        area_type = get_unified_area_type(deepcopy(area_dict))
+        area_type = get_unified_area_type(area_dict)
         return dict(bought=0.0, sold=0.0,
                     spent=0.0, earned=0.0,
                     total_energy=0.0, total_cost=0.0,
@@ -236,15 +246,31 @@ class MarketEnergyBills(ResultsBaseClass):
 
         return self.current_raw_bills[area_dict["uuid"]]
 
-    def _energy_bills(self, area_dict, area_core_stats):
+    @staticmethod
+    def _writable_bill(area_bills: Dict, child_uuid: str, copied_child_uuids: Set[str]) -> Dict:
+        """
+        Return the bill of the child, copied on its first modification in the market slot.
+        The bill of the previous market slot is shared with the results that were already
+        reported, therefore it should not be modified in place.
+        """
+        if child_uuid not in copied_child_uuids:
+            area_bills[child_uuid] = copy(area_bills[child_uuid])
+            copied_child_uuids.add(child_uuid)
+        return area_bills[child_uuid]
+
+    def _energy_bills(self, area_dict, area_index: AreaIndex, trade_index: TradeIndex) -> Dict:
         """
-        Return a bill for each of area's children with total energy bought
-        and sold (in kWh) and total money earned and spent (in cents).
-        Compute bills recursively for children of children etc.
+        Return a flat mapping from area uuid to bill, for each of the areas in area_dict,
+        with total energy bought and sold (in kWh) and total money earned and spent (in cents).
         """
-        if area_dict["children"] == []:
-            return None
+        flattened = {}
+        for node in area_index.subtree(area_dict["uuid"]):
+            if not node.is_leaf:
+                flattened.update(self._area_energy_bills(node.area_dict, area_index, trade_index))
+        return flattened
 
+    def _area_energy_bills(self, area_dict, area_index: AreaIndex, trade_index: TradeIndex):
+        """Return the bills of each of the area's children, keyed by the child uuid."""
         if area_dict["uuid"] not in self.external_trades:
             self.external_trades[area_dict["uuid"]] = dict(
                 bought=0.0, sold=0.0, spent=0.0, earned=0.0,
@@ -252,40 +278,38 @@ class MarketEnergyBills(ResultsBaseClass):
             )
 
         result = self._get_child_data(area_dict)
-        child_name_uuid_map = {c["name"]: c["uuid"] for c in area_dict["children"]}
+        child_name_uuid_map = area_index.node(area_dict["uuid"]).child_name_uuid_mapping
 
-        for trade in area_core_stats[area_dict["uuid"]].get("trades", []):
-            buyer = area_name_from_area_or_ma_name(trade["buyer"]["name"])
-            seller = area_name_from_area_or_ma_name(trade["seller"]["name"])
+        area_name = area_name_from_area_or_ma_name(area_dict["name"])
+        copied_child_uuids = set()
+        market_trades = trade_index.market(area_dict["uuid"])
+        for seller, buyer, trade in market_trades.trades_with_area_names:
             if buyer in child_name_uuid_map:
-                self._store_bought_trade(result[child_name_uuid_map[buyer]], trade)
+                self._store_bought_trade(
+                    self._writable_bill(result, child_name_uuid_map[buyer], copied_child_uuids),
+                    trade)
             if seller in child_name_uuid_map:
-                self._store_sold_trade(result[child_name_uuid_map[seller]], trade)
+                self._store_sold_trade(
+                    self._writable_bill(result, child_name_uuid_map[seller], copied_child_uuids),
+                    trade)
             # Outgoing external trades
-            if buyer == area_name_from_area_or_ma_name(area_dict["name"]) \
-                    and seller in child_name_uuid_map:
+            if buyer == area_name and seller in child_name_uuid_map:
                 self._store_outgoing_external_trade(trade, area_dict)
             # Incoming external trades
-            if seller == area_name_from_area_or_ma_name(area_dict["name"]) \
-                    and buyer in child_name_uuid_map:
+            if seller == area_name and buyer in child_name_uuid_map:
                 self._store_incoming_external_trade(trade, area_dict)
-        for child in area_dict["children"]:
-            child_result = self._energy_bills(child, area_core_stats)
-            if child_result is not None:
-                result[child["uuid"]]["children"] = child_result
-        return result
-
-    def _accumulate_market_fees(self, area_dict, area_core_stats):
-        if area_dict["uuid"] not in self.market_fees:
-            self.market_fees[area_dict["uuid"]] = 0.0
-        market_fee_eur = area_core_stats[area_dict["uuid"]].get("market_fee", 0.) / 100.0
-        self.market_fees[area_dict["uuid"]] += market_fee_eur
+        return {child["uuid"]: result[child["uuid"]] for child in area_dict["children"]}
+
+    def _accumulate_market_fees(self, area_uuid, area_core_stats):
+        if area_uuid not in self.market_fees:
+            self.market_fees[area_uuid] = 0.0
+        market_fee_eur = area_core_stats[area_uuid].get("market_fee", 0.) / 100.0
+        self.market_fees[area_uuid] += market_fee_eur
         self._cumulative_fee_all_markets_whole_sim += market_fee_eur
-        for child in area_dict["children"]:
-            self._accumulate_market_fees(child, area_core_stats)
 
-    def _update_market_fees(self, area_dict, area_core_stats):
-        self._accumulate_market_fees(area_dict, area_core_stats)
+    def _update_market_fees(self, area_dict, area_core_stats, area_index: AreaIndex):
+        for node in area_index.subtree(area_dict["uuid"]):
+            self._accumulate_market_fees(node.uuid, area_core_stats)
 
     def update(self, area_dict, area_core_stats, current_market_slot):
         if not self._has_update_parameters(
@@ -294,14 +318,13 @@ class MarketEnergyBills(ResultsBaseClass):
         # Updates the self.market_fees dict which keeps track of the accumulated market fees for
         # each area. Also calculates the cumulative_fee_all_markets_whole_sim, which
         # is the sum of the grid fees for all markets for the whole simulation duration.
-        self._update_market_fees(area_dict, area_core_stats)
-        # Generate tree of energy bills, following the area_dict structure. Uses uuids
-        bills = self._energy_bills(area_dict, area_core_stats)
-        flattened = {}
-        # Flatten the energy bill tree.
+        area_index = self._get_area_index(area_dict)
+        self._update_market_fees(area_dict, area_core_stats, area_index)
+        # Generate the energy bills of all areas. Uses uuids.
         # The flattened dict contains only area_uuid -> energy_bills_dict, no children
         # or aggregated data like Totals, External Trades etc.
-        self._flatten_energy_bills(bills, flattened)
+        flattened = self._energy_bills(
+            area_dict, area_index, self._get_trade_index(area_core_stats))
         # Adds children to the flattened dict by iterating over the area_dict, finding out the
         # children of each area, and copying the children bills under their respective parent. Only
         # 1 level child hierarchy.
@@ -311,7 +334,11 @@ class MarketEnergyBills(ResultsBaseClass):
         bills = self._accumulate_by_children(area_dict, flattened, {})
         # Keep the state of the unformatted bills in order to be reused by _energy_bills method.
         # We need this in order to read past results when calculating the new energy bills.
-        self.current_raw_bills = deepcopy(bills)
+        # The bills of the individual children are shared with the reported results, and are
+        # copied by _energy_bills only when they are modified.
+        self.current_raw_bills = {
+            area_uuid: copy(area_bills) for area_uuid, area_bills in bills.items()
+        }
         # Converts the children of the bills from uuids to names, because the UI uses these
         # as headers in the table where these data are reported.
         bills = self._swap_children_uuids_to_names(area_dict, bills)
@@ -321,7 +348,7 @@ class MarketEnergyBills(ResultsBaseClass):
             self.bills_results = self._bills_local_format(area_dict, bills)
         # Rounds the precision of the results to 3 decimal points, in order for the UI to report
         # them correctly.
-        self.bills_redis_results = self._round_results_for_ui(deepcopy(bills))
+        self.bills_redis_results = self._round_results_for_ui(bills)
 
     def restore_area_results_state(self, area_dict: Dict, last_known_state_data: Dict):
         self.bills_redis_results[area_dict["uuid"]] = last_known_state_data
@@ -349,14 +376,6 @@ class MarketEnergyBills(ResultsBaseClass):
         """Replace the existing cumulative fees with the fees provided as argument."""
         self._cumulative_fee_all_markets_whole_sim = cumulative_fees
 
-    @classmethod
-    def _flatten_energy_bills(cls, energy_bills, flat_results):
-        for area_uuid, bills in energy_bills.items():
-            if "children" in bills:
-                cls._flatten_energy_bills(bills["children"], flat_results)
-            flat_results[area_uuid] = copy(bills)
-            flat_results[area_uuid].pop("children", None)
-
     def _accumulate_by_children(self, area_dict, flattened, results):
         if not area_dict["children"]:
             # This is a device
@@ -447,9 +466,8 @@ class MarketEnergyBills(ResultsBaseClass):
                 bills_results[child["name"]] = bills_results_uuids[child["uuid"]]
         return bills_results
 
-    @classmethod
-    def _swap_children_uuids_to_names(cls, area_dict, bills_results):
-        area_uuid_name_mapping = get_area_uuid_name_mapping(area_dict, {})
+    def _swap_children_uuids_to_names(self, area_dict, bills_results):
+        area_uuid_name_mapping = self._get_area_index(area_dict).uuid_name_mapping
         final_result = {}
         for k, children in bills_results.items():
             children_result = {}
@@ -487,27 +505,34 @@ class MarketEnergyBills(ResultsBaseClass):
 
     @classmethod
     def _round_child_bill_results(cls, results):
-        results["bought"] = round_floats_for_ui(results["bought"])
-        results["sold"] = round_floats_for_ui(results["sold"])
-        results["spent"] = round_floats_for_ui(results["spent"])
-        results["earned"] = round_floats_for_ui(results["earned"])
-        results["total_energy"] = round_floats_for_ui(results["total_energy"])
-        results["total_cost"] = round_floats_for_ui(results["total_cost"])
-        if "market_fee" in results:
-            results["market_fee"] = round_floats_for_ui(results["market_fee"])
-        return results
+        rounded_results = copy(results)
+        for key in ("bought", "sold", "spent", "earned", "total_energy", "total_cost",
+                    "market_fee"):
+            if key in results:
+                rounded_results[key] = round_floats_for_ui(results[key])
+        return rounded_results
+
+    def _round_results_for_ui(self, results):
+        """Return a rounded copy of the results, reusing the rounded bills of the last slot."""
+        rounded_bills_cache = {}
+
+        def _round_bill(bill):
+            cached_bill, rounded_bill = self._rounded_bills_cache.get(id(bill), (None, None))
+            if cached_bill is not bill:
+                rounded_bill = self._round_child_bill_results(bill)
+            rounded_bills_cache[id(bill)] = (bill, rounded_bill)
+            return rounded_bill
 
-    @classmethod
-    def _round_results_for_ui(cls, results):
         rounded_results = {}
         for uuid, area_results in results.items():
             if "bought" in area_results:
-                rounded_results[uuid] = cls._round_child_bill_results(area_results)
+                rounded_results[uuid] = _round_bill(area_results)
             else:
                 rounded_results[uuid] = {
-                    c_name: cls._round_child_bill_results(child_results)
+                    c_name: _round_bill(child_results)
                     for c_name, child_results in area_results.items()
                 }
+        self._rounded_bills_cache = rounded_bills_cache
         return rounded_results
 
     # pylint: disable=arguments-differ
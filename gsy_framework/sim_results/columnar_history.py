@@ -0,0 +1,116 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of Grid Singularity Exchange.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from array import array
+from typing import Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+# Number of time slots that the columns of an area are initially allocated for
+INITIAL_CAPACITY = 96
+
+
+class _AreaColumns:
+    """Preallocated float columns of one area, indexed by the time slot index."""
+
+    __slots__ = ("columns", "present")
+
+    def __init__(self, column_count: int, capacity: int):
+        self.columns = [array("d", bytes(8 * capacity)) for _ in range(column_count)]
+        self.present = bytearray(capacity)
+
+    def reserve(self, time_slot_index: int):
+        """Grow the columns, so that they can store the time slot with the given index."""
+        capacity = len(self.present)
+        if time_slot_index < capacity:
+            return
+        new_capacity = max(2 * capacity, time_slot_index + 1)
+        for column in self.columns:
+            column.extend(array("d", bytes(8 * (new_capacity - capacity))))
+        self.present.extend(bytes(new_capacity - capacity))
+
+
+class ColumnarHistory:
+    """Append-only history of float figures of areas for consecutive time slots.
+
+    Each figure of an area is stored in its own preallocated column of floats, indexed by the
+    position of the time slot on the time axis of the history. Compared to nested dicts per area
+    and time slot, a row of the history costs only a few floats. Dict representations of the
+    history are derived on demand.
+    """
+
+    def __init__(self, columns: Sequence[str], initial_capacity: int = INITIAL_CAPACITY):
+        self.columns = tuple(columns)
+        self.time_slots: List[Hashable] = []
+        self._time_slot_indices: Dict[Hashable, int] = {}
+        self._initial_capacity = initial_capacity
+        self._areas: Dict[str, _AreaColumns] = {}
+
+    def __len__(self) -> int:
+        return len(self._areas)
+
+    def __contains__(self, area_key: str) -> bool:
+        return area_key in self._areas
+
+    @property
+    def area_keys(self) -> List[str]:
+        """Return the keys of all areas of the history, in the order that they were added."""
+        return list(self._areas.keys())
+
+    def _get_time_slot_index(self, time_slot: Hashable) -> int:
+        if time_slot not in self._time_slot_indices:
+            self._time_slot_indices[time_slot] = len(self.time_slots)
+            self.time_slots.append(time_slot)
+        return self._time_slot_indices[time_slot]
+
+    def set_row(self, area_key: str, time_slot: Hashable, values: Sequence[float]):
+        """Store the figures of the area for the time slot, replacing any previous figures."""
+        time_slot_index = self._get_time_slot_index(time_slot)
+        if area_key not in self._areas:
+            self._areas[area_key] = _AreaColumns(
+                len(self.columns), max(self._initial_capacity, time_slot_index + 1))
+        area_columns = self._areas[area_key]
+        area_columns.reserve(time_slot_index)
+        for column, value in zip(area_columns.columns, values):
+            column[time_slot_index] = value
+        area_columns.present[time_slot_index] = 1
+
+    def get_row(self, area_key: str, time_slot: Hashable) -> Optional[Tuple[float, ...]]:
+        """Return the figures of the area for the time slot, or None if they were not stored."""
+        area_columns = self._areas.get(area_key)
+        time_slot_index = self._time_slot_indices.get(time_slot)
+        if (area_columns is None or time_slot_index is None or
+                time_slot_index >= len(area_columns.present) or
+                not area_columns.present[time_slot_index]):
+            return None
+        return tuple(column[time_slot_index] for column in area_columns.columns)
+
+    def area_rows(self, area_key: str) -> Iterator[Tuple[Hashable, Tuple[float, ...]]]:
+        """Iterate over the time slots and the figures that were stored for the area."""
+        area_columns = self._areas[area_key]
+        for time_slot_index, time_slot in enumerate(self.time_slots):
+            if (time_slot_index < len(area_columns.present) and
+                    area_columns.present[time_slot_index]):
+                yield time_slot, tuple(column[time_slot_index] for column in area_columns.columns)
+
+    def column(self, area_key: str, column_name: str) -> array:
+        """Return the column of the area with the values of all time slots of the time axis.
+
+        Time slots without stored figures have the value 0.
+        """
+        column = self._areas[area_key].columns[self.columns.index(column_name)]
+        values = column[:len(self.time_slots)]
+        values.extend(array("d", bytes(8 * (len(self.time_slots) - len(values)))))
+        return values
@@ -26,10 +26,9 @@ from gsy_framework.sim_results import (
     is_prosumer_node_type,
     is_infinite_bus_node_type,
     is_heatpump_node_type,
-    area_sells_to_child,
-    child_buys_from_area,
 )
 from gsy_framework.sim_results.results_abc import ResultsBaseClass
+from gsy_framework.sim_results.trade_index import TradeIndex
 from gsy_framework.utils import (
     add_or_create_key,
     area_name_from_area_or_ma_name,
@@ -73,19 +72,22 @@ class CumulativeGridTrades(ResultsBaseClass):
     def _export_cumulative_grid_trades(
         self, area_dict, flattened_area_core_stats_dict, accumulated_trades_redis
     ):
+        # The trades of each market are grouped by seller and buyer once per market slot, so
+        # that the areas and devices do not need to scan all trades of their markets.
         self.accumulated_trades = self._accumulate_grid_trades_all_devices(
-            area_dict, flattened_area_core_stats_dict, accumulated_trades_redis
+            area_dict, self._get_trade_index(flattened_area_core_stats_dict),
+            accumulated_trades_redis
         )
 
     def _accumulate_grid_trades_all_devices(
-        self, area_dict, flattened_area_core_stats_dict, accumulated_trades
+        self, area_dict, trade_index: TradeIndex, accumulated_trades
     ):
         for child_dict in area_dict["children"]:
             if is_load_node_type(child_dict):
                 accumulated_trades = self._accumulate_load_trades(
                     child_dict,
                     area_dict,
-                    flattened_area_core_stats_dict,
+                    trade_index,
                     accumulated_trades,
                     is_heatpump=False,
                 )
@@ -93,37 +95,37 @@ class CumulativeGridTrades(ResultsBaseClass):
                 accumulated_trades = self._accumulate_load_trades(
                     child_dict,
                     area_dict,
-                    flattened_area_core_stats_dict,
+                    trade_index,
                     accumulated_trades,
                     is_heatpump=True,
                 )
             if is_producer_node_type(child_dict):
                 accumulated_trades = self._accumulate_producer_trades(
-                    child_dict, area_dict, flattened_area_core_stats_dict, accumulated_trades
+                    child_dict, area_dict, trade_index, accumulated_trades
                 )
             elif is_prosumer_node_type(child_dict) or is_infinite_bus_node_type(child_dict):
                 accumulated_trades = self._accumulate_storage_trade(
-                    child_dict, area_dict, flattened_area_core_stats_dict, accumulated_trades
+                    child_dict, area_dict, trade_index, accumulated_trades
                 )
             elif not child_dict["children"]:
                 # Leaf node, no need for calculating cumulative trades, continue iteration
                 continue
             else:
                 accumulated_trades = self._accumulate_grid_trades_all_devices(
-                    child_dict, flattened_area_core_stats_dict, accumulated_trades
+                    child_dict, trade_index, accumulated_trades
                 )
                 accumulated_trades = self._accumulate_area_trades(
-                    child_dict, area_dict, flattened_area_core_stats_dict, accumulated_trades
+                    child_dict, area_dict, trade_index, accumulated_trades
                 )
         if area_dict["parent_uuid"] == "":
             accumulated_trades = self._accumulate_area_trades(
-                area_dict, {}, flattened_area_core_stats_dict, accumulated_trades
+                area_dict, {}, trade_index, accumulated_trades
             )
         return accumulated_trades
 
     @staticmethod
     def _accumulate_load_trades(
-        load, grid, flattened_area_core_stats_dict, accumulated_trades, is_heatpump=False
+        load, grid, trade_index: TradeIndex, accumulated_trades, is_heatpump=False
     ):
         if load["uuid"] not in accumulated_trades:
             accumulated_trades[load["uuid"]] = {
@@ -140,23 +142,21 @@ class CumulativeGridTrades(ResultsBaseClass):
                 ],
             }
 
-        area_trades = flattened_area_core_stats_dict.get(grid["uuid"], {}).get("trades", [])
-        for trade in area_trades:
-            if trade["buyer"]["name"] == load["name"]:
-                sell_id = area_name_from_area_or_ma_name(trade["seller"]["name"])
-                accumulated_trades[load["uuid"]]["consumedFrom"] = add_or_create_key(
-                    accumulated_trades[load["uuid"]]["consumedFrom"], sell_id, trade["energy"]
-                )
-                accumulated_trades[load["uuid"]]["spentTo"] = add_or_create_key(
-                    accumulated_trades[load["uuid"]]["spentTo"],
-                    sell_id,
-                    (trade["energy"] * trade["energy_rate"]),
-                )
+        for trade in trade_index.bought_by(grid["uuid"], load["name"]):
+            sell_id = area_name_from_area_or_ma_name(trade["seller"]["name"])
+            accumulated_trades[load["uuid"]]["consumedFrom"] = add_or_create_key(
+                accumulated_trades[load["uuid"]]["consumedFrom"], sell_id, trade["energy"]
+            )
+            accumulated_trades[load["uuid"]]["spentTo"] = add_or_create_key(
+                accumulated_trades[load["uuid"]]["spentTo"],
+                sell_id,
+                (trade["energy"] * trade["energy_rate"]),
+            )
         return accumulated_trades
 
     @staticmethod
     def _accumulate_producer_trades(
-        producer, grid, flattened_area_core_stats_dict, accumulated_trades
+        producer, grid, trade_index: TradeIndex, accumulated_trades
     ):
         if producer["uuid"] not in accumulated_trades:
             accumulated_trades[producer["uuid"]] = {
@@ -172,20 +172,19 @@ class CumulativeGridTrades(ResultsBaseClass):
                 ],
             }
 
-        area_trades = CumulativeGridTrades._get_trades_from_core_stats(
-            flattened_area_core_stats_dict, grid["uuid"]
+        area_trades = CumulativeGridTrades._get_indexed_trades_from_core_stats(
+            trade_index, grid["uuid"]
         )
-        for trade in area_trades:
-            if trade["seller"]["name"] == producer["name"]:
-                accumulated_trades[producer["uuid"]]["produced"] -= trade["energy"]
-                accumulated_trades[producer["uuid"]]["earned"] += (
-                    trade["energy_rate"] * trade["energy"]
-                )
+        for trade in area_trades.sold_by.get(producer["name"], []):
+            accumulated_trades[producer["uuid"]]["produced"] -= trade["energy"]
+            accumulated_trades[producer["uuid"]]["earned"] += (
+                trade["energy_rate"] * trade["energy"]
+            )
         return accumulated_trades
 
     @staticmethod
     def _accumulate_storage_trade(
-        storage, area, flattened_area_core_stats_dict, accumulated_trades
+        storage, area, trade_index: TradeIndex, accumulated_trades
     ):
         if storage["uuid"] not in accumulated_trades:
             accumulated_trades[storage["uuid"]] = {
@@ -202,25 +201,27 @@ class CumulativeGridTrades(ResultsBaseClass):
                 ],
             }
 
-        area_trades = CumulativeGridTrades._get_trades_from_core_stats(
-            flattened_area_core_stats_dict, area["uuid"]
+        area_trades = CumulativeGridTrades._get_indexed_trades_from_core_stats(
+            trade_index, area["uuid"]
         )
-        for trade in area_trades:
+        for trade in area_trades.bought_by.get(storage["name"], []):
+            sell_id = area_name_from_area_or_ma_name(trade["seller"]["name"])
+            accumulated_trades[storage["uuid"]]["consumedFrom"] = add_or_create_key(
+                accumulated_trades[storage["uuid"]]["consumedFrom"], sell_id, trade["energy"]
+            )
+            accumulated_trades[storage["uuid"]]["spentTo"] = add_or_create_key(
+                accumulated_trades[storage["uuid"]]["spentTo"],
+                sell_id,
+                (trade["energy_rate"] * trade["energy"]),
+            )
+        for trade in area_trades.sold_by.get(storage["name"], []):
             if trade["buyer"]["name"] == storage["name"]:
-                sell_id = area_name_from_area_or_ma_name(trade["seller"]["name"])
-                accumulated_trades[storage["uuid"]]["consumedFrom"] = add_or_create_key(
-                    accumulated_trades[storage["uuid"]]["consumedFrom"], sell_id, trade["energy"]
-                )
-                accumulated_trades[storage["uuid"]]["spentTo"] = add_or_create_key(
-                    accumulated_trades[storage["uuid"]]["spentTo"],
-                    sell_id,
-                    (trade["energy_rate"] * trade["energy"]),
-                )
-            elif trade["seller"]["name"] == storage["name"]:
-                accumulated_trades[storage["uuid"]]["produced"] -= trade["energy"]
-                accumulated_trades[storage["uuid"]]["earned"] += (
-                    trade["energy_rate"] * trade["energy"]
-                )
+                # Already accounted for as a bought trade
+                continue
+            accumulated_trades[storage["uuid"]]["produced"] -= trade["energy"]
+            accumulated_trades[storage["uuid"]]["earned"] += (
+                trade["energy_rate"] * trade["energy"]
+            )
         return accumulated_trades
 
     @staticmethod
@@ -263,7 +264,7 @@ class CumulativeGridTrades(ResultsBaseClass):
                     pass
 
     def _accumulate_area_trades(
-        self, area, parent, flattened_area_core_stats_dict, accumulated_trades
+        self, area, parent, trade_index: TradeIndex, accumulated_trades
     ):
         if area["uuid"] not in accumulated_trades:
             accumulated_trades[area["uuid"]] = {
@@ -286,72 +287,52 @@ class CumulativeGridTrades(ResultsBaseClass):
 
         self._update_area_children_in_accumulated_trades_dict(accumulated_trades, area)
 
-        child_names = [area_name_from_area_or_ma_name(c["name"]) for c in area["children"]]
-        area_trades = flattened_area_core_stats_dict.get(area["uuid"], {}).get("trades", [])
+        area_name = area["name"]
+        area_results = accumulated_trades[area["uuid"]]
+        child_names = {area_name_from_area_or_ma_name(c["name"]) for c in area["children"]}
 
-        for trade in area_trades:
-            if (
-                area_name_from_area_or_ma_name(trade["seller"]["name"]) in child_names
-                and area_name_from_area_or_ma_name(trade["buyer"]["name"]) in child_names
-            ):
+        for seller_name, buyer_name, trade in (
+                trade_index.market(area["uuid"]).trades_with_area_names):
+            if seller_name in child_names and buyer_name in child_names:
                 # House self-consumption trade
-                accumulated_trades[area["uuid"]]["produced"] -= trade["energy"]
-                accumulated_trades[area["uuid"]]["earned"] += trade["price"]
-                accumulated_trades[area["uuid"]]["consumedFrom"] = add_or_create_key(
-                    accumulated_trades[area["uuid"]]["consumedFrom"], area["name"], trade["energy"]
-                )
-                accumulated_trades[area["uuid"]]["spentTo"] = add_or_create_key(
-                    accumulated_trades[area["uuid"]]["spentTo"], area["name"], trade["price"]
-                )
-            elif trade["buyer"]["name"] == area["name"]:
-                accumulated_trades[area["uuid"]]["earned"] += trade["price"]
-                accumulated_trades[area["uuid"]]["produced"] -= trade["energy"]
-        # for market in area_markets:
-        for trade in area_trades:
-            if area_sells_to_child(trade, area["name"], child_names):
-                accumulated_trades[area["uuid"]]["consumedFromExternal"] = subtract_or_create_key(
-                    accumulated_trades[area["uuid"]]["consumedFromExternal"],
-                    area_name_from_area_or_ma_name(trade["buyer"]["name"]),
-                    trade["energy"],
-                )
-                accumulated_trades[area["uuid"]]["spentToExternal"] = add_or_create_key(
-                    accumulated_trades[area["uuid"]]["spentToExternal"],
-                    area_name_from_area_or_ma_name(trade["buyer"]["name"]),
-                    trade["price"],
-                )
-            elif child_buys_from_area(trade, area["name"], child_names):
-                accumulated_trades[area["uuid"]]["producedForExternal"] = add_or_create_key(
-                    accumulated_trades[area["uuid"]]["producedForExternal"],
-                    area_name_from_area_or_ma_name(trade["seller"]["name"]),
-                    trade["energy"],
-                )
-                accumulated_trades[area["uuid"]]["earnedFromExternal"] = add_or_create_key(
-                    accumulated_trades[area["uuid"]]["earnedFromExternal"],
-                    area_name_from_area_or_ma_name(trade["seller"]["name"]),
-                    trade["price"],
-                )
+                area_results["produced"] -= trade["energy"]
+                area_results["earned"] += trade["price"]
+                add_or_create_key(area_results["consumedFrom"], area_name, trade["energy"])
+                add_or_create_key(area_results["spentTo"], area_name, trade["price"])
+            elif trade["buyer"]["name"] == area_name:
+                area_results["earned"] += trade["price"]
+                area_results["produced"] -= trade["energy"]
+
+            if seller_name == area_name and buyer_name in child_names:
+                # Area sells to child
+                subtract_or_create_key(
+                    area_results["consumedFromExternal"], buyer_name, trade["energy"])
+                add_or_create_key(area_results["spentToExternal"], buyer_name, trade["price"])
+            elif buyer_name == area_name and seller_name in child_names:
+                # Child buys from area
+                add_or_create_key(
+                    area_results["producedForExternal"], seller_name, trade["energy"])
+                add_or_create_key(area_results["earnedFromExternal"], seller_name, trade["price"])
 
         accumulated_trades = self._area_trade_from_parent(
-            area, parent, flattened_area_core_stats_dict, accumulated_trades
+            area, parent, trade_index, accumulated_trades
         )
 
         return accumulated_trades
 
     @staticmethod
-    def _area_trade_from_parent(area, parent, flattened_area_core_stats_dict, accumulated_trades):
+    def _area_trade_from_parent(area, parent, trade_index: TradeIndex, accumulated_trades):
         if not parent:
             return accumulated_trades
-        parent_trades = flattened_area_core_stats_dict.get(parent["uuid"], {}).get("trades", [])
 
-        for trade in parent_trades:
-            if trade["buyer"]["name"] == area["name"]:
-                seller_id = area_name_from_area_or_ma_name(trade["seller"]["name"])
-                accumulated_trades[area["uuid"]]["consumedFrom"] = add_or_create_key(
-                    accumulated_trades[area["uuid"]]["consumedFrom"], seller_id, trade["energy"]
-                )
-                accumulated_trades[area["uuid"]]["spentTo"] = add_or_create_key(
-                    accumulated_trades[area["uuid"]]["spentTo"], seller_id, trade["price"]
-                )
+        for trade in trade_index.bought_by(parent["uuid"], area["name"]):
+            seller_id = area_name_from_area_or_ma_name(trade["seller"]["name"])
+            accumulated_trades[area["uuid"]]["consumedFrom"] = add_or_create_key(
+                accumulated_trades[area["uuid"]]["consumedFrom"], seller_id, trade["energy"]
+            )
+            accumulated_trades[area["uuid"]]["spentTo"] = add_or_create_key(
+                accumulated_trades[area["uuid"]]["spentTo"], seller_id, trade["price"]
+            )
 
         return accumulated_trades
 
@@ -16,12 +16,14 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 from typing import Dict
-from gsy_framework.utils import subtract_or_create_key, add_or_create_key, \
-    area_bought_from_child, area_sells_to_child
+from gsy_framework.sim_results.area_index import AreaNode
 from gsy_framework.sim_results.results_abc import ResultsBaseClass
+from gsy_framework.sim_results.trade_index import TradeIndex
 
 
 class CumulativeNetEnergyFlow(ResultsBaseClass):
+    tracks_changed_results = True
+
     def __init__(self):
         self.net_area_flow = {}
 
@@ -43,23 +45,32 @@ class CumulativeNetEnergyFlow(ResultsBaseClass):
             self.net_area_flow[area_uuid] = last_known_state_data
 
     def _update_results(self, area_dict, core_stats, current_market_time_slot_str):
-        self._accumulate_net_energy(area_dict, core_stats)
-        for child in area_dict['children']:
-            self._update_results(child, core_stats, current_market_time_slot_str)
-
-    def _accumulate_net_energy(self, area_dict, core_stats):
+        trade_index = self._get_trade_index(core_stats)
+        for node in self._get_area_index(area_dict).subtree(area_dict["uuid"]):
+            self._accumulate_net_energy(node, trade_index)
 
-        child_names = [c['name'] for c in area_dict['children']]
-        for trade in self._get_trades_from_core_stats(core_stats, area_dict["uuid"]):
-            if area_bought_from_child(trade, area_dict['name'], child_names):
-                add_or_create_key(
-                    self.net_area_flow, area_dict['uuid'], trade['energy']
-                )
+    def _accumulate_net_energy(self, node: AreaNode, trade_index: TradeIndex):
+        # The direction of each trade is classified in one pass, using the trader names that
+        # are stripped once per market slot and the set of child names of the area index
+        net_energy_flow = self.net_area_flow.get(node.uuid)
+        has_energy_flow = False
+        for seller_name, buyer_name, trade in self._get_indexed_trades_from_core_stats(
+                trade_index, node.uuid).trades_with_area_names:
+            # export
+            if buyer_name == node.name and seller_name in node.child_names:
+                has_energy_flow = True
+                net_energy_flow = (
+                    trade['energy'] if net_energy_flow is None
+                    else net_energy_flow + trade['energy'])
             # import
-            if area_sells_to_child(trade, area_dict['name'], child_names):
-                subtract_or_create_key(
-                    self.net_area_flow, area_dict['uuid'], trade['energy']
-                )
+            if seller_name == node.name and buyer_name in node.child_names:
+                has_energy_flow = True
+                net_energy_flow = (
+                    0 - trade['energy'] if net_energy_flow is None
+                    else net_energy_flow - trade['energy'])
+        if has_energy_flow:
+            self.net_area_flow[node.uuid] = net_energy_flow
+            self._mark_results_changed(node.uuid)
 
     @staticmethod
     def merge_results_to_global(market_device: Dict, global_device: Dict, *_):
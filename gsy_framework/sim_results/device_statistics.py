@@ -38,6 +38,8 @@ FILL_VALUE = None
 class DeviceStatistics(ResultsBaseClass):
     """Collect device statistics for spot markets."""
 
+    tracks_changed_results = True
+
     def __init__(self, should_export_plots):
         self.device_stats_dict = {}
         self.current_stats_dict = {}
@@ -207,9 +209,13 @@ class DeviceStatistics(ResultsBaseClass):
                 area_result_dict, self.device_stats_dict, {}, core_stats, current_market_slot
             )
         else:
+            updated_stats_dict = {}
             self._gather_device_statistics(
-                area_result_dict, {}, self.current_stats_dict, core_stats, current_market_slot
+                area_result_dict, {}, updated_stats_dict, core_stats, current_market_slot
             )
+            self.current_stats_dict.update(updated_stats_dict)
+            for area_uuid in updated_stats_dict:
+                self._mark_results_changed(area_uuid)
 
     @classmethod
     def _gather_device_statistics(
@@ -70,43 +70,42 @@ class ForwardDeviceStats:  # pylint: disable=too-many-instance-attributes
         self.trades: List[Dict] = []
 
     def __add__(self, other: "ForwardDeviceStats"):
+        forward_device_stats = ForwardDeviceStats(
+            **{f.name: getattr(self, f.name) for f in fields(self)})
+        forward_device_stats.open_bids = self.open_bids
+        forward_device_stats.open_offers = self.open_offers
+        forward_device_stats.trades.extend(self.trades)
+        forward_device_stats.merge(other)
+        return forward_device_stats
+
+    def merge(self, other: "ForwardDeviceStats") -> None:
+        """Accumulate the statistics of other into this object, in place.
+
+        Only the trades of other are copied, therefore accumulating the stats of a device over
+        many market slots takes linear time in the number of trades.
+        """
         assert self.time_slot == other.time_slot
         assert self.device_uuid == other.device_uuid
 
-        if self.current_time_slot > other.current_time_slot:
-            current_time_slot = self.current_time_slot
-            open_bids = self.open_bids
-            open_offers = self.open_offers
-        elif self.current_time_slot < other.current_time_slot:
-            current_time_slot = other.current_time_slot
-            open_bids = other.open_bids
-            open_offers = other.open_offers
-        else:
+        if self.current_time_slot < other.current_time_slot:
+            self.current_time_slot = other.current_time_slot
+            self.open_bids = other.open_bids
+            self.open_offers = other.open_offers
+        elif self.current_time_slot == other.current_time_slot:
             raise AssertionError(
                 "Adding objects with same `current_time_slot` is not possible.")
 
-        forward_device_stats = ForwardDeviceStats(
-            time_slot=self.time_slot,
-            device_uuid=self.device_uuid,
-            current_time_slot=current_time_slot,
-            total_energy_produced=self.total_energy_produced + other.total_energy_produced,
-            total_sell_trade_count=self.total_sell_trade_count + other.total_sell_trade_count,
-            total_energy_sold=self.total_energy_sold + other.total_energy_sold,
-            total_earned_eur=self.total_earned_eur + other.total_earned_eur,
-            total_energy_consumed=self.total_energy_consumed + other.total_energy_consumed,
-            total_buy_trade_count=self.total_buy_trade_count + other.total_buy_trade_count,
-            total_energy_bought=self.total_energy_bought + other.total_energy_bought,
-            total_spent_eur=self.total_spent_eur + other.total_spent_eur,
-            accumulated_buy_trade_rates=(self.accumulated_buy_trade_rates +
-                                         other.accumulated_buy_trade_rates),
-            accumulated_sell_trade_rates=(self.accumulated_sell_trade_rates +
-                                          other.accumulated_sell_trade_rates)
-        )
-        forward_device_stats.open_bids = open_bids
-        forward_device_stats.open_offers = open_offers
-        forward_device_stats.trades = self.trades + other.trades
-
-        return forward_device_stats
+        self.total_energy_produced += other.total_energy_produced
+        self.total_sell_trade_count += other.total_sell_trade_count
+        self.total_energy_sold += other.total_energy_sold
+        self.total_earned_eur += other.total_earned_eur
+        self.total_energy_consumed += other.total_energy_consumed
+        self.total_buy_trade_count += other.total_buy_trade_count
+        self.total_energy_bought += other.total_energy_bought
+        self.total_spent_eur += other.total_spent_eur
+        self.accumulated_buy_trade_rates += other.accumulated_buy_trade_rates
+        self.accumulated_sell_trade_rates += other.accumulated_sell_trade_rates
+        self.trades.extend(other.trades)
 
     def to_dict(self) -> Dict:
         """Generate a dictionary for saving the data into DB."""
@@ -128,9 +127,18 @@ class ForwardDeviceStats:  # pylint: disable=too-many-instance-attributes
             device_stats_dict["current_time_slot"] = str_to_pendulum_datetime(current_time_slot)
         return ForwardDeviceStats(**device_stats_dict)
 
-    def add_trade(self, trade: Dict) -> None:
-        """Add trade information to device stats."""
-        assert str_to_pendulum_datetime(trade["time_slot"]) == self.time_slot
+    def _validate_time_slot(self, order: Dict) -> None:
+        assert str_to_pendulum_datetime(order["time_slot"]) == self.time_slot, (
+            f"Order time slot {order['time_slot']} does not match {self.time_slot}.")
+
+    def add_trade(self, trade: Dict, validate_time_slot: bool = False) -> None:
+        """Add trade information to device stats.
+
+        The time slot of the trade is expected to be the time slot of the device stats. It is
+        parsed and compared only if validate_time_slot is True.
+        """
+        if validate_time_slot:
+            self._validate_time_slot(trade)
 
         if trade["seller"]["uuid"] == self.device_uuid:
             self.total_sell_trade_count += 1
@@ -147,15 +155,17 @@ class ForwardDeviceStats:  # pylint: disable=too-many-instance-attributes
         else:
             raise AssertionError("Device is not seller/buyer of the trade.")
 
-    def add_bid(self, bid: Dict) -> None:
+    def add_bid(self, bid: Dict, validate_time_slot: bool = False) -> None:
         """Add bid information to device stats."""
-        assert str_to_pendulum_datetime(bid["time_slot"]) == self.time_slot
+        if validate_time_slot:
+            self._validate_time_slot(bid)
         assert bid["buyer"]["uuid"] == self.device_uuid, "Device is not buyer of the bid."
         self.open_bids.append(bid)
 
-    def add_offer(self, offer: Dict) -> None:
+    def add_offer(self, offer: Dict, validate_time_slot: bool = False) -> None:
         """Add offer information to device stats."""
-        assert str_to_pendulum_datetime(offer["time_slot"]) == self.time_slot
+        if validate_time_slot:
+            self._validate_time_slot(offer)
         assert offer["seller"]["uuid"] == self.device_uuid, "Device is not seller of the offer."
         self.open_offers.append(offer)
 
@@ -174,9 +184,24 @@ class ForwardDeviceStats:  # pylint: disable=too-many-instance-attributes
         return self.accumulated_buy_trade_rates / self.total_buy_trade_count
 
 
+def _get_device_stats(
+        time_slot_results: Dict[str, ForwardDeviceStats], device_uuid: str, time_slot: DateTime,
+        current_time_slot: DateTime) -> ForwardDeviceStats:
+    if device_uuid not in time_slot_results:
+        time_slot_results[device_uuid] = ForwardDeviceStats(
+            time_slot=time_slot, device_uuid=device_uuid, current_time_slot=current_time_slot)
+    return time_slot_results[device_uuid]
+
+
 def handle_forward_results(
-        current_time_slot: DateTime, market_stats: Dict[str, Dict[str, List]]) -> Dict:
-    """Group trades by time_slot and device_uuid to accumulate orders for each device."""
+        current_time_slot: DateTime, market_stats: Dict[str, Dict[str, List]],
+        validate_time_slots: bool = False) -> Dict:
+    """Group trades by time_slot and device_uuid to accumulate orders for each device.
+
+    Each time slot string of market_stats is parsed once. The orders are assumed to belong to
+    the time slot that they are grouped under; if validate_time_slots is True, the time slot of
+    each order is parsed as well and compared with it.
+    """
     result = defaultdict(dict)
 
     if not market_stats:
@@ -184,34 +209,22 @@ def handle_forward_results(
 
     for time_slot_str, time_slot_stats in market_stats.items():
         time_slot = str_to_pendulum_datetime(time_slot_str)
-        for trade in time_slot_stats["trades"]:
-            buyer_id = trade["buyer"]["uuid"]
-            seller_id = trade["seller"]["uuid"]
-
-            if seller_id not in result[time_slot]:
-                result[time_slot][seller_id] = ForwardDeviceStats(
-                    time_slot=time_slot, device_uuid=seller_id,
-                    current_time_slot=current_time_slot)
-            result[time_slot][seller_id].add_trade(trade)
+        time_slot_results = result[time_slot]
 
-            if buyer_id not in result[time_slot]:
-                result[time_slot][buyer_id] = ForwardDeviceStats(
-                    time_slot=time_slot, device_uuid=buyer_id, current_time_slot=current_time_slot)
-            result[time_slot][buyer_id].add_trade(trade)
+        for trade in time_slot_stats["trades"]:
+            for device_uuid in (trade["seller"]["uuid"], trade["buyer"]["uuid"]):
+                _get_device_stats(
+                    time_slot_results, device_uuid, time_slot, current_time_slot
+                ).add_trade(trade, validate_time_slots)
 
         for bid in time_slot_stats["bids"]:
-            buyer_id = bid["buyer"]["uuid"]
-            if buyer_id not in result[time_slot]:
-                result[time_slot][buyer_id] = ForwardDeviceStats(
-                    time_slot=time_slot, device_uuid=buyer_id, current_time_slot=current_time_slot)
-            result[time_slot][buyer_id].add_bid(bid)
+            _get_device_stats(
+                time_slot_results, bid["buyer"]["uuid"], time_slot, current_time_slot
+            ).add_bid(bid, validate_time_slots)
 
         for offer in time_slot_stats["offers"]:
-            seller_id = offer["seller"]["uuid"]
-            if seller_id not in result[time_slot]:
-                result[time_slot][seller_id] = ForwardDeviceStats(
-                    time_slot=time_slot, device_uuid=seller_id,
-                    current_time_slot=current_time_slot)
-            result[time_slot][seller_id].add_offer(offer)
+            _get_device_stats(
+                time_slot_results, offer["seller"]["uuid"], time_slot, current_time_slot
+            ).add_offer(offer, validate_time_slots)
 
     return result
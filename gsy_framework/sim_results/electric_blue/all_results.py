@@ -1,5 +1,5 @@
 from collections import defaultdict
-from typing import Callable, Dict
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 from pendulum import DateTime
 
@@ -7,28 +7,44 @@ from gsy_framework.enums import AggregationResolution, AvailableMarketTypes
 from gsy_framework.sim_results.electric_blue.aggregate_results import (
     MARKET_RESOLUTIONS, ForwardDeviceStats, handle_forward_results)
 from gsy_framework.sim_results.electric_blue.time_series import (
-    ForwardDeviceTimeSeries)
+    ForwardDeviceTimeSeries, LazyForwardDeviceTimeSeries)
+from gsy_framework.sim_results.electric_blue.timeseries_base import (
+    DEFAULT_TIME_SERIES_CACHE_SIZE, AssetTimeSeriesCache)
 from gsy_framework.sim_results.electric_blue.volume_timeseries import (
-    AssetVolumeTimeSeries)
+    AssetVolumeTimeSeries, get_required_time_series_years)
 from gsy_framework.utils import str_to_pendulum_datetime
 
 
 class ForwardResultsHandler:  # pylint: disable=too-many-instance-attributes
     """Calculate all results for each market slot for forward markets."""
 
-    def __init__(self, get_asset_volume_time_series_db: Callable):
+    def __init__(self, get_asset_volume_time_series_db: Callable,
+                 get_asset_volume_time_series_db_batch: Optional[Callable] = None,
+                 time_series_cache_size: int = DEFAULT_TIME_SERIES_CACHE_SIZE):
         self.forward_market_enabled = True
         self.orders: Dict[
             str, Dict[int, Dict[DateTime, Dict]]] = defaultdict(lambda: defaultdict(dict))
         self.previous_asset_stats = {}
         self.current_asset_stats: Dict[
             int, Dict[DateTime, Dict[str, Dict]]] = defaultdict(lambda: defaultdict(dict))
-        self.asset_time_series: Dict[
+        self._asset_time_series: Dict[
             int, Dict[int, Dict[DateTime, Dict[str, Dict]]]] = defaultdict(
             lambda: defaultdict(lambda: defaultdict(dict)))
+        # Time series of the assets are generated lazily per resolution and added to
+        # asset_time_series, see get_asset_time_series
+        self._asset_time_series_views: Dict[
+            int, Dict[DateTime, Dict[str, LazyForwardDeviceTimeSeries]]] = defaultdict(
+            lambda: defaultdict(dict))
+        self._asset_time_series_resolutions: Set[AggregationResolution] = set()
+        self._generated_resolutions: Set[AggregationResolution] = set()
         self.asset_volume_time_series: Dict[
             str, Dict[AggregationResolution, AssetVolumeTimeSeries]] = {}
         self.get_asset_volume_time_series_db = get_asset_volume_time_series_db
+        # Optional callback that fetches the volume time series of multiple assets, years and
+        # resolutions in one call. Receives a list of (asset_uuid, year, resolution) triplets and
+        # returns a dict with the time series (or None if not stored) for each triplet.
+        self.get_asset_volume_time_series_db_batch = get_asset_volume_time_series_db_batch
+        self._time_series_cache = AssetTimeSeriesCache(time_series_cache_size)
         self._total_memory_utilization_kb = 0.0
 
     def update(self, area_dict: Dict, core_stats: Dict, current_market_slot: str) -> None:
@@ -45,12 +61,54 @@ class ForwardResultsHandler:  # pylint: disable=too-many-instance-attributes
             return
 
         current_market_dt = str_to_pendulum_datetime(current_market_slot)
-        for market_type_value, market_stats in forward_results["forward_market_stats"].items():
-            market_type = int(market_type_value)
-            current_results = handle_forward_results(current_market_dt, market_stats)
+        current_results_per_market_type = [
+            (int(market_type_value), handle_forward_results(current_market_dt, market_stats))
+            for market_type_value, market_stats in forward_results["forward_market_stats"].items()]
+        self._prefetch_asset_volume_time_series(current_results_per_market_type)
+        for market_type, current_results in current_results_per_market_type:
             self._update_stats_and_time_series(area_dict, current_results, market_type)
         self._update_memory_utilization()
 
+    def _prefetch_asset_volume_time_series(
+            self, current_results_per_market_type: List[Tuple[int, Dict]]):
+        """Fetch the volume time series that the current results update, all in one call.
+
+        Only used if the batch callback is available, otherwise the time series are fetched one
+        by one when they are updated. Only the (asset, year, resolution) time series that are
+        neither buffered by the time series objects nor fetched already are requested. The
+        fetched time series wait in a bounded LRU cache until the time series objects take them
+        over into their buffers.
+        """
+        if self.get_asset_volume_time_series_db_batch is None:
+            return
+        required_time_series: Set[Tuple[str, int, AggregationResolution]] = set()
+        for market_type_value, current_results in current_results_per_market_type:
+            market_type = AvailableMarketTypes(market_type_value)
+            for asset_results in current_results.values():
+                for asset_uuid, asset_stats in asset_results.items():
+                    asset_time_series = self.asset_volume_time_series.get(asset_uuid, {})
+                    for resolution in AggregationResolution:
+                        buffered_years = (
+                            asset_time_series[resolution].asset_time_series_buffer
+                            if resolution in asset_time_series else {})
+                        required_time_series.update(
+                            (asset_uuid, year, resolution)
+                            for year in get_required_time_series_years(
+                                asset_stats, market_type, resolution)
+                            if year not in buffered_years)
+
+        missing_time_series = [
+            key for key in sorted(required_time_series, key=lambda key: key[:2])
+            if key not in self._time_series_cache]
+        if missing_time_series:
+            fetched_time_series = self.get_asset_volume_time_series_db_batch(
+                missing_time_series)
+            for asset_uuid, year, resolution in missing_time_series:
+                self._time_series_cache.set(
+                    asset_uuid, year, resolution,
+                    fetched_time_series.get((asset_uuid, year, resolution)))
+        self._time_series_cache.evict(keep=frozenset(required_time_series))
+
     def update_from_repr(self, area_representation: Dict):
         """
         Updates the simulation results using area_representation data that arrive from the gsy-web.
@@ -70,6 +128,45 @@ class ForwardResultsHandler:  # pylint: disable=too-many-instance-attributes
                    "asset_volume_time_series": self.asset_volume_time_series}
         return results
 
+    def get_asset_time_series(
+            self, resolution: AggregationResolution) -> Dict[int, Dict[DateTime, Dict[str, Dict]]]:
+        """Return the time series of the assets for all market types in one resolution.
+
+        Only the time series of the requested resolution are generated, once per market slot.
+        """
+        if resolution not in self._generated_resolutions:
+            for market_type_value, time_slot_views in self._asset_time_series_views.items():
+                for time_slot, asset_views in time_slot_views.items():
+                    for asset_uuid, time_series_view in asset_views.items():
+                        if resolution in time_series_view.resolutions:
+                            self._asset_time_series.setdefault(
+                                market_type_value, {}).setdefault(
+                                resolution.value, {}).setdefault(
+                                time_slot, {})[asset_uuid] = time_series_view.get(resolution)
+            self._generated_resolutions.add(resolution)
+        return {
+            market_type_value: resolution_time_series[resolution.value]
+            for market_type_value, resolution_time_series in self._asset_time_series.items()
+            if resolution.value in resolution_time_series}
+
+    @property
+    def asset_time_series(self) -> Dict[int, Dict[int, Dict[DateTime, Dict[str, Dict]]]]:
+        """Return the time series of the assets for all market types and resolutions.
+
+        The resolutions that were not requested with get_asset_time_series yet are generated
+        on the first access in each market slot.
+        """
+        for resolution in self._asset_time_series_resolutions - self._generated_resolutions:
+            self.get_asset_time_series(resolution)
+        return self._asset_time_series
+
+    @asset_time_series.setter
+    def asset_time_series(
+            self, asset_time_series: Dict[int, Dict[int, Dict[DateTime, Dict[str, Dict]]]]):
+        self._asset_time_series = asset_time_series
+        # The time series of the current views are replaced by the assigned ones
+        self._generated_resolutions.update(self._asset_time_series_resolutions)
+
     @property
     def total_memory_utilization_kb(self):
         """Get the total memory allocated by the results."""
@@ -95,7 +192,10 @@ class ForwardResultsHandler:  # pylint: disable=too-many-instance-attributes
     def _clear_asset_stats(self) -> None:
         self.orders.clear()
         self.current_asset_stats = defaultdict(lambda: defaultdict(dict))
-        self.asset_time_series.clear()
+        self._asset_time_series.clear()
+        self._asset_time_series_views.clear()
+        self._asset_time_series_resolutions.clear()
+        self._generated_resolutions.clear()
 
     def _buffer_bids_offers_trades(self, market_type: int, forward_results: Dict[DateTime, Dict]):
         for time_slot, asset_results in forward_results.items():
@@ -122,7 +222,7 @@ class ForwardResultsHandler:  # pylint: disable=too-many-instance-attributes
                         market_type_value, {}).get(time_slot, {}).get(asset_uuid, {})
                 if previous_forward_stats:
                     previous_asset_stats = ForwardDeviceStats.from_dict(previous_forward_stats)
-                    current_asset_stats += previous_asset_stats
+                    current_asset_stats.merge(previous_asset_stats)
                 self.current_asset_stats[market_type_value][time_slot][asset_uuid] = \
                     current_asset_stats.to_dict()
                 self._generate_asset_time_series(market_type, market_type_value, time_slot,
@@ -132,13 +232,13 @@ class ForwardResultsHandler:  # pylint: disable=too-many-instance-attributes
             self, market_type: "AvailableMarketTypes",
             market_type_value: int, time_slot: DateTime, asset_uuid: str,
             current_asset_stats: "ForwardDeviceStats"):
-        for resolution in MARKET_RESOLUTIONS.get(market_type, []):
-            asset_time_series = ForwardDeviceTimeSeries(current_asset_stats, market_type)
-            all_time_series_generators = asset_time_series.generate(
-                resolution=resolution.duration())
-            all_time_series = {k: dict(v) for k, v in all_time_series_generators.items()}
-            self.asset_time_series[market_type_value][resolution.value][time_slot][
-                asset_uuid] = all_time_series
+        resolutions = MARKET_RESOLUTIONS.get(market_type, [])
+        self._asset_time_series_views[market_type_value][time_slot][asset_uuid] = (
+            LazyForwardDeviceTimeSeries(
+                ForwardDeviceTimeSeries(current_asset_stats, market_type), resolutions))
+        self._asset_time_series_resolutions.update(resolutions)
+        # The time series of the new view are added on the next request of its resolutions
+        self._generated_resolutions.difference_update(resolutions)
 
     def _generate_asset_volume_time_series(
             self, asset_info: Dict, market_type: "AvailableMarketTypes",
@@ -158,6 +258,7 @@ class ForwardResultsHandler:  # pylint: disable=too-many-instance-attributes
                     asset_peak_kWh=asset_peak_kwh,
                     resolution=resolution,
                     get_asset_volume_time_series_db=self.get_asset_volume_time_series_db,
+                    time_series_cache=self._time_series_cache,
                 ) for resolution in list(AggregationResolution)}
 
         for resolution, time_series in self.asset_volume_time_series[asset_uuid].items():
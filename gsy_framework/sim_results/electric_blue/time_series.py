@@ -1,40 +1,144 @@
-from typing import Callable, Dict
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
 
 from pendulum import DateTime, Duration
 
-from gsy_framework.enums import AvailableMarketTypes
+from gsy_framework.enums import AggregationResolution, AvailableMarketTypes
 from gsy_framework.forward_markets.forward_profile import (
     ForwardTradeProfileGenerator)
+from gsy_framework.forward_markets.utils import add_duration, has_fixed_utc_offset
 from gsy_framework.sim_results.electric_blue.aggregate_results import (
     ForwardDeviceStats)
 from gsy_framework.utils import format_datetime
 
 
+# Finer resolution that each resolution can be aggregated from, because every time slot of the
+# finer resolution lies within a single time slot of the coarser one
+FINER_RESOLUTIONS = {
+    AggregationResolution.RES_1_HOUR: AggregationResolution.RES_15_MINUTES,
+    AggregationResolution.RES_1_WEEK: AggregationResolution.RES_1_HOUR,
+    AggregationResolution.RES_1_MONTH: AggregationResolution.RES_1_HOUR,
+    AggregationResolution.RES_1_YEAR: AggregationResolution.RES_1_MONTH,
+}
+
+
+def _mean(values: Sequence[float]) -> float:
+    return sum(values) / len(values)
+
+
+def _last(values: Sequence[float]) -> float:
+    return values[-1]
+
+
+# Aggregator functions that can be selected by name in the resampling functions
+AGGREGATORS: Dict[str, Callable[[Sequence[float]], float]] = {
+    "sum": sum,
+    "mean": _mean,
+    "last": _last,
+}
+
+
+class ResampleIndex:
+    """Buckets of a sorted time axis for one resolution.
+
+    The k-th bucket of the resolution starts k resolutions after start_time (see add_duration),
+    so that calendar durations (months, years) follow the calendar and days keep their wall
+    clock time across daylight saving time. Each non-empty bucket is stored as the offset of its
+    first time slot on the time axis, therefore any number of value arrays that share the time
+    axis can be aggregated bucket by bucket, with one slice per bucket.
+    """
+
+    def __init__(self, time_slots: Sequence[DateTime], resolution: Duration):
+        # Time slot of the first value of each bucket
+        self.labels: List[DateTime] = []
+        # Offsets of the buckets on the time axis; bucket i spans offsets[i]:offsets[i + 1]
+        self.offsets: List[int] = [0]
+        if not time_slots:
+            return
+        self._start_time = time_slots[0]
+        self._resolution = resolution
+        self._step_seconds = resolution.total_seconds()
+        self._is_calendar_resolution = bool(resolution.years or resolution.months)
+        self._plain_start_time = None
+        if not self._is_calendar_resolution and has_fixed_utc_offset(self._start_time):
+            # Without daylight saving time, fixed length buckets are calculated with the (much
+            # faster) arithmetic of datetime
+            self._plain_start_time = datetime(
+                self._start_time.year, self._start_time.month, self._start_time.day,
+                self._start_time.hour, self._start_time.minute, self._start_time.second,
+                self._start_time.microsecond, tzinfo=self._start_time.tzinfo)
+            self._step = timedelta(seconds=self._step_seconds)
+        self._calculate_offsets(time_slots)
+
+    def _get_bucket_start(self, bucket_number: int) -> datetime:
+        if self._plain_start_time is not None:
+            return self._plain_start_time + self._step * bucket_number
+        return add_duration(self._start_time, self._resolution, bucket_number)
+
+    def _get_bucket_number(self, time_slot: DateTime, bucket_number: int) -> int:
+        """Return the number of the bucket of the time slot, that lies after bucket_number."""
+        first_bucket_number = bucket_number + 1
+        bucket_number = first_bucket_number
+        if not self._is_calendar_resolution:
+            # Estimate the bucket from the absolute time, then correct it for the buckets that
+            # daylight saving time made shorter or longer
+            bucket_number = max(bucket_number, int(
+                (time_slot.timestamp() - self._start_time.timestamp()) // self._step_seconds))
+            while (bucket_number > first_bucket_number and
+                   self._get_bucket_start(bucket_number) > time_slot):
+                bucket_number -= 1
+        while self._get_bucket_start(bucket_number + 1) <= time_slot:
+            bucket_number += 1
+        return bucket_number
+
+    def _calculate_offsets(self, time_slots: Sequence[DateTime]):
+        time_slot_count = len(time_slots)
+        bucket_start = 0
+        bucket_number = 0
+        while bucket_start < time_slot_count:
+            bucket_end_time = self._get_bucket_start(bucket_number + 1)
+            if time_slots[bucket_start] >= bucket_end_time:
+                # Skip the empty buckets of a gap in the time axis
+                bucket_number = self._get_bucket_number(time_slots[bucket_start], bucket_number)
+                continue
+            bucket_end = bisect_left(time_slots, bucket_end_time, bucket_start)
+            self.labels.append(time_slots[bucket_start])
+            self.offsets.append(bucket_end)
+            bucket_start = bucket_end
+            bucket_number += 1
+
+    def aggregate(self, values: Sequence[float],
+                  aggregator: Union[str, Callable] = "sum") -> List[float]:
+        """Aggregate the values of the time axis, returning one value per bucket."""
+        aggregator_fn = AGGREGATORS[aggregator] if isinstance(aggregator, str) else aggregator
+        offsets = self.offsets
+        return [aggregator_fn(values[offsets[index]:offsets[index + 1]])
+                for index in range(len(self.labels))]
+
+
 def resample_data(
         timeseries_data: Dict[DateTime, float],
-        resolution: Duration, aggregator_fn: Callable) -> Dict:
+        resolution: Duration, aggregator_fn: Union[str, Callable]) -> Dict:
     """Aggregate data using the specified resolution and aggregator function."""
+    for time_slot, value in resample_time_series(timeseries_data, resolution, aggregator_fn):
+        yield format_datetime(time_slot), value
 
-    sorted_time_slots = sorted(timeseries_data.keys())
-    start_time = sorted_time_slots[0]
-    next_time = start_time + resolution
 
-    time_slots_to_aggregate = []
-    for time_slot in sorted_time_slots:
-        if time_slot >= next_time:
-            time_slot_str = format_datetime(time_slots_to_aggregate[0])
-            yield time_slot_str, aggregator_fn(
-                [timeseries_data[t] for t in time_slots_to_aggregate])
-            time_slots_to_aggregate = [time_slot]
-            next_time += resolution
-        elif time_slot < next_time:
-            time_slots_to_aggregate.append(time_slot)
+def resample_time_series(
+        timeseries_data: Dict[DateTime, float],
+        resolution: Duration, aggregator_fn: Union[str, Callable]
+) -> Iterator[Tuple[DateTime, float]]:
+    """Aggregate data using the specified resolution and aggregator function.
 
-    if time_slots_to_aggregate:
-        # aggregate any remaining time_slots in the buffer
-        time_slot_str = format_datetime(time_slots_to_aggregate[0])
-        yield time_slot_str, aggregator_fn(
-            [timeseries_data[t] for t in time_slots_to_aggregate])
+    Same as resample_data, but the aggregated time slots are not converted to strings.
+    aggregator_fn is either a function that receives the values of a bucket, or the name of one
+    of the AGGREGATORS.
+    """
+    time_slots = sorted(timeseries_data.keys())
+    resample_index = ResampleIndex(time_slots, resolution)
+    values = [timeseries_data[time_slot] for time_slot in time_slots]
+    return zip(resample_index.labels, resample_index.aggregate(values, aggregator_fn))
 
 
 class ForwardDeviceTimeSeries:
@@ -44,76 +148,102 @@ class ForwardDeviceTimeSeries:
 
         self.device_stats = device_stats
         self.product_type = product_type
+        # Trade profiles of the product, memoized by their energy
+        self._profiles: Dict[float, Dict[DateTime, float]] = {}
 
     def generate(self, resolution: Duration):
         """Generate all time series."""
         return {
-            "matched_buy_orders_kWh": self._generate_matched_buy_orders_kWh(resolution),
-            "matched_sell_orders_kWh": self._generate_matched_sell_orders_kWh(resolution),
-            "open_sell_orders_kWh": self._generate_open_sell_orders_kWh(resolution),
-            "open_buy_orders_kWh": self._generate_open_buy_orders_kWh(resolution),
-            "all_buy_orders_KWh": self._generate_all_buy_orders_kWh(resolution),
-            "all_sell_orders_kWh": self._generate_all_sell_orders(resolution)
+            name: ((format_datetime(time_slot), value) for time_slot, value in series.items())
+            for name, series in self.generate_raw(resolution).items()
+        }
+
+    def generate_raw(self, resolution: Duration) -> Dict[str, Dict[DateTime, float]]:
+        """Generate all time series, keyed by the DateTimes of their time slots.
+
+        The trade profiles of all time series share the same time axis, therefore it is divided
+        into the buckets of the resolution only once.
+        """
+        resample_index = None
+        time_series = {}
+        for name, energy_kWh in self._get_time_series_energies().items():
+            if energy_kWh <= 0:
+                time_series[name] = {}
+                continue
+            profile = self._get_profile(energy_kWh)
+            if resample_index is None:
+                time_slots = sorted(profile.keys())
+                resample_index = ResampleIndex(time_slots, resolution)
+            time_series[name] = dict(zip(
+                resample_index.labels,
+                resample_index.aggregate([profile[time_slot] for time_slot in time_slots])))
+        return time_series
+
+    def _get_time_series_energies(self) -> Dict[str, float]:
+        """Return the total energy of each time series."""
+        total_offered_energy = sum(offer["energy"] for offer in self.device_stats.open_offers)
+        total_bade_energy = sum(bid["energy"] for bid in self.device_stats.open_bids)
+        return {
+            # buy trades
+            "matched_buy_orders_kWh": self.device_stats.total_energy_bought,
+            # sell trades
+            "matched_sell_orders_kWh": self.device_stats.total_energy_sold,
+            # offers
+            "open_sell_orders_kWh": total_offered_energy,
+            # bids
+            "open_buy_orders_kWh": total_bade_energy,
+            # bids + buy trades
+            "all_buy_orders_KWh": self.device_stats.total_energy_bought + total_bade_energy,
+            # offers + sell trades
+            "all_sell_orders_kWh": self.device_stats.total_energy_sold + total_offered_energy,
         }
 
-    def _generate_resampled_profile(self, energy_kWh: float, resolution: Duration) -> Dict:
-        """Generate profile and resample it afterwards."""
-        if energy_kWh <= 0:
-            return {}
-
-        profile = ForwardTradeProfileGenerator(
-            peak_kWh=energy_kWh
-        ).generate_trade_profile(
-            energy_kWh=energy_kWh,
-            market_slot=self.device_stats.time_slot,
-            product_type=self.product_type
-        )
-        return resample_data(profile, resolution=resolution, aggregator_fn=sum)
-
-    def _generate_matched_buy_orders_kWh(self, resolution: Duration) -> Dict:
-        """Generate time series for buy trades."""
-        return self._generate_resampled_profile(
-            self.device_stats.total_energy_bought,
-            resolution
-        )
-
-    def _generate_matched_sell_orders_kWh(self, resolution: Duration) -> Dict:
-        """Generate time series for sell trades."""
-        return self._generate_resampled_profile(
-            self.device_stats.total_energy_sold,
-            resolution
-        )
-
-    def _generate_open_sell_orders_kWh(self, resolution: Duration) -> Dict:
-        """Generate time series for all offers."""
-        total_offered_energy = sum([offer["energy"] for offer in self.device_stats.open_offers])
-        return self._generate_resampled_profile(
-            total_offered_energy,
-            resolution
-        )
-
-    def _generate_open_buy_orders_kWh(self, resolution: Duration) -> Dict:
-        """Generate time series for all bids."""
-        total_bade_energy = sum([bid["energy"] for bid in self.device_stats.open_bids])
-        return self._generate_resampled_profile(
-            total_bade_energy,
-            resolution
-        )
-
-    def _generate_all_buy_orders_kWh(self, resolution: Duration) -> Dict:
-        """Generate time series for all (bids + buy trades)."""
-        total_bade_energy = sum([bid["energy"] for bid in self.device_stats.open_bids])
-        all_buy_orders_kWh = self.device_stats.total_energy_bought + total_bade_energy
-        return self._generate_resampled_profile(
-            all_buy_orders_kWh,
-            resolution
-        )
-
-    def _generate_all_sell_orders(self, resolution):
-        """Generate time series for all (offers + sell trades)."""
-        total_offered_energy = sum([offer["energy"] for offer in self.device_stats.open_offers])
-        all_sell_orders_kWh = self.device_stats.total_energy_sold + total_offered_energy
-        return self._generate_resampled_profile(
-            all_sell_orders_kWh,
-            resolution
-        )
+    def _get_profile(self, energy_kWh: float) -> Dict[DateTime, float]:
+        if energy_kWh not in self._profiles:
+            self._profiles[energy_kWh] = ForwardTradeProfileGenerator(
+                peak_kWh=energy_kWh
+            ).generate_trade_profile(
+                energy_kWh=energy_kWh,
+                market_slot=self.device_stats.time_slot,
+                product_type=self.product_type
+            )
+        return self._profiles[energy_kWh]
+
+
+class LazyForwardDeviceTimeSeries:
+    """Time series of a device in multiple resolutions, generated on the first access.
+
+    Each resolution is generated only when it is accessed and memoized afterwards. Resolutions
+    that can be aggregated from a finer one of the requested resolutions are derived from it,
+    therefore the trade profiles of the device are resampled only once.
+    """
+
+    def __init__(self, device_time_series: ForwardDeviceTimeSeries,
+                 resolutions: Iterable[AggregationResolution]):
+        self.resolutions = tuple(resolutions)
+        self._device_time_series = device_time_series
+        self._raw_time_series: Dict[AggregationResolution, Dict[str, Dict[DateTime, float]]] = {}
+        self._time_series: Dict[AggregationResolution, Dict[str, Dict[str, float]]] = {}
+
+    def get(self, resolution: AggregationResolution) -> Dict[str, Dict[str, float]]:
+        """Return all time series of the resolution, keyed by the formatted time slots."""
+        if resolution not in self._time_series:
+            self._time_series[resolution] = {
+                name: {format_datetime(time_slot): value for time_slot, value in series.items()}
+                for name, series in self._get_raw_time_series(resolution).items()}
+        return self._time_series[resolution]
+
+    def _get_raw_time_series(
+            self, resolution: AggregationResolution) -> Dict[str, Dict[DateTime, float]]:
+        if resolution not in self._raw_time_series:
+            finer_resolution = FINER_RESOLUTIONS.get(resolution)
+            if finer_resolution in self.resolutions:
+                self._raw_time_series[resolution] = {
+                    name: dict(resample_time_series(
+                        series, resolution=resolution.duration(), aggregator_fn=sum))
+                    if series else {}
+                    for name, series in self._get_raw_time_series(finer_resolution).items()}
+            else:
+                self._raw_time_series[resolution] = self._device_time_series.generate_raw(
+                    resolution.duration())
+        return self._raw_time_series[resolution]
@@ -1,5 +1,6 @@
 import abc
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 from pendulum import DateTime
 
@@ -14,14 +15,84 @@ START_OF = {
     AggregationResolution.RES_1_MONTH: "month",
     AggregationResolution.RES_1_YEAR: "year",
 }
+# Maximal number of (asset, year, resolution) time series that are kept in AssetTimeSeriesCache
+DEFAULT_TIME_SERIES_CACHE_SIZE = 512
+
+
+def adapt_time_slot(time_slot: DateTime, resolution: AggregationResolution) -> DateTime:
+    """Return the start of the time slot of the resolution that includes the given time_slot."""
+    if resolution == AggregationResolution.RES_15_MINUTES:
+        return time_slot.set(minute=(time_slot.minute // 15) * 15)
+    return time_slot.start_of(START_OF[resolution])
+
+
+class AssetTimeSeriesCache:
+    """Bounded LRU cache of the yearly time series that were fetched from the DB in advance.
+
+    Entries are keyed by (asset uuid, year, resolution) and are removed when the time series
+    object of the asset takes them over into its buffer. Time series that are not stored in the
+    DB are cached as None. The cache only holds time series that are not used yet, therefore
+    evicting them never affects the buffered (and published) time series; evicted time series
+    are fetched again from the DB if they are needed later.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_TIME_SERIES_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict[
+            Tuple[str, int, AggregationResolution], Optional[Dict]] = OrderedDict()
+
+    def __contains__(self, key: Tuple[str, int, AggregationResolution]) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def pop(self, asset_uuid: str, year: int,
+            resolution: AggregationResolution) -> Tuple[bool, Optional[Dict]]:
+        """Remove the time series from the cache.
+
+        Return whether the time series was cached, together with the cached time series.
+        """
+        key = (asset_uuid, year, resolution)
+        if key not in self._entries:
+            return False, None
+        return True, self._entries.pop(key)
+
+    def set(self, asset_uuid: str, year: int, resolution: AggregationResolution,
+            time_series: Optional[Dict]):
+        """Cache the time series, marking it as the most recently used."""
+        key = (asset_uuid, year, resolution)
+        self._entries[key] = time_series
+        self._entries.move_to_end(key)
+
+    def evict(self, keep: FrozenSet[Tuple[str, int, AggregationResolution]] = frozenset()
+              ) -> List[Tuple[str, int, AggregationResolution]]:
+        """Remove the least recently used entries that exceed the size of the cache.
+
+        Entries in keep are never removed. Return the removed keys.
+        """
+        evicted = []
+        candidates = iter(list(self._entries.keys()))
+        while len(self._entries) > self.max_size:
+            key = next(candidates, None)
+            if key is None:
+                break
+            if key in keep:
+                continue
+            del self._entries[key]
+            evicted.append(key)
+        return evicted
 
 
 class AssetTimeSeriesBase(abc.ABC):
     """Base class for calculating different timeseries for forward markets."""
-    def __init__(self, asset_uuid: str, resolution: AggregationResolution):
+    def __init__(self, asset_uuid: str, resolution: AggregationResolution,
+                 time_series_cache: Optional[AssetTimeSeriesCache] = None):
         self.asset_uuid = asset_uuid
         self.resolution = resolution
         self.asset_time_series_buffer: Dict[int, Dict] = {}
+        # Shared cache of the time series that were fetched from the DB in advance, optional
+        self.time_series_cache = time_series_cache
 
     @abc.abstractmethod
     def update_time_series(
@@ -40,18 +111,20 @@ class AssetTimeSeriesBase(abc.ABC):
 
     def _adapt_time_slot(self, time_slot: DateTime) -> DateTime:
         """Adapt given time_slot with time series resolution."""
-        if self.resolution == AggregationResolution.RES_15_MINUTES:
-            return time_slot.set(minute=(time_slot.minute // 15) * 15)
-        return time_slot.start_of(START_OF[self.resolution])
+        return adapt_time_slot(time_slot, self.resolution)
 
     def _get_asset_time_series(self, year: DateTime) -> Dict[str, Dict]:
         """Return asset volume time series for the required year.
         If not found in the buffer, it tries fetching it from DB.
         If not found in the DB, it will generate a new one for the whole year."""
         if year.year in self.asset_time_series_buffer:
-            time_series = self.asset_time_series_buffer[year.year]
-        else:
+            return self.asset_time_series_buffer[year.year]
+        is_cached, time_series = False, None
+        if self.time_series_cache is not None:
+            is_cached, time_series = self.time_series_cache.pop(
+                self.asset_uuid, year.year, self.resolution)
+        if not is_cached:
             time_series = self._fetch_asset_time_series_from_db(year.year)
-            if time_series is None:
-                time_series = self._generate_time_series(year)
+        if time_series is None:
+            time_series = self._generate_time_series(year)
         return time_series
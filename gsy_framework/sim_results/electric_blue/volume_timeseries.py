@@ -5,11 +5,11 @@ from pendulum import DateTime
 from gsy_framework.enums import AggregationResolution, AvailableMarketTypes
 from gsy_framework.forward_markets.aggregated_ssp import get_aggregated_SSP
 from gsy_framework.forward_markets.forward_profile import (
-    ForwardTradeProfileGenerator)
+    PRODUCT_TYPE_PERIODS, ForwardTradeProfileGenerator)
 from gsy_framework.sim_results.electric_blue.aggregate_results import (
     ForwardDeviceStats)
 from gsy_framework.sim_results.electric_blue.timeseries_base import (
-    AssetTimeSeriesBase)
+    AssetTimeSeriesBase, AssetTimeSeriesCache, adapt_time_slot)
 from gsy_framework.utils import round_floats_for_ui, round_prices_to_cents
 
 FORWARD_PRODUCT_TYPES = [
@@ -19,6 +19,22 @@ FORWARD_PRODUCT_TYPES = [
 ]
 
 
+def get_required_time_series_years(
+        asset_stats: ForwardDeviceStats, product_type: AvailableMarketTypes,
+        resolution: AggregationResolution) -> range:
+    """Return the years of the volume time series of the resolution that are updated with the
+    asset stats of the product."""
+    if asset_stats.total_energy_bought <= 0 and asset_stats.total_energy_sold <= 0:
+        return range(0)
+    if product_type == AvailableMarketTypes.INTRADAY:
+        first_time_slot = last_time_slot = asset_stats.time_slot
+    else:
+        first_time_slot = asset_stats.time_slot.start_of(PRODUCT_TYPE_PERIODS[product_type])
+        last_time_slot = asset_stats.time_slot.end_of(PRODUCT_TYPE_PERIODS[product_type])
+    return range(adapt_time_slot(first_time_slot, resolution).year,
+                 adapt_time_slot(last_time_slot, resolution).year + 1)
+
+
 class AssetVolumeTimeSeries(AssetTimeSeriesBase):
     """This class generates combined volume time series for the whole year for each asset.
     The result would be like this for a monthly resolution for the year 2020:
@@ -82,8 +98,9 @@ class AssetVolumeTimeSeries(AssetTimeSeriesBase):
     """
     def __init__(
             self, asset_uuid: str, asset_peak_kWh: float,
-            resolution: AggregationResolution, get_asset_volume_time_series_db: Callable):
-        super().__init__(asset_uuid, resolution)
+            resolution: AggregationResolution, get_asset_volume_time_series_db: Callable,
+            time_series_cache: Optional[AssetTimeSeriesCache] = None):
+        super().__init__(asset_uuid, resolution, time_series_cache)
         self.asset_peak_kWh = asset_peak_kWh
         self._trade_profile_generator = ForwardTradeProfileGenerator(self.asset_peak_kWh)
         # the get_asset_volume_time_series_db will be called whenever it's needed to fetch an
@@ -15,17 +15,17 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-from copy import deepcopy
 from typing import Dict, List
 
+from pendulum import DateTime
+
 from gsy_framework.constants_limits import FLOATING_POINT_TOLERANCE
 from gsy_framework.sim_results.results_abc import ResultsBaseClass
 from gsy_framework.utils import (add_or_create_key,
                                  area_name_from_area_or_ma_name,
-                                 convert_pendulum_to_str_in_dict,
-                                 datetime_str_to_ui_formatted_datetime_str,
+                                 format_datetime,
                                  round_floats_for_ui,
-                                 ui_str_to_pendulum_datetime)
+                                 str_to_pendulum_datetime)
 
 traded_energy_profile_example = {
     "area_uuid1": {
@@ -60,65 +60,136 @@ traded_energy_profile_example = {
 }
 
 
+class _SparseEnergySeries(dict):
+    """Energy series that was added to existing sparse global results.
+
+    The dense merge fills such series with zeros for all slots, therefore
+    densify_global_results fills only these series, and not the series of the market results
+    that the global results started from.
+    """
+
+
 class EnergyTradeProfile(ResultsBaseClass):
     """
     Total energy traded for each market and energy asset and their penalty for not trading
     their required energy.
+
+    The time slots of the profiles are stored as integer offsets on the time axis of the
+    simulation, in the order in which the market slots are first updated. They are converted to
+    the UI datetime format only when the results are reported.
     """
+    # The formatted profiles are rebuilt from the restored profiles
+    _checkpoint_excluded_attributes = (
+        *ResultsBaseClass._checkpoint_excluded_attributes, "_formatted_profiles")
+
     def __init__(self, should_export_plots: bool):
-        self.traded_energy_profile: traded_energy_profile_example = {}
-        self.traded_energy_current: traded_energy_profile_example = {}
+        self._traded_energy_profile: Dict = {}
+        self._traded_energy_current: Dict = {}
         self.should_export_plots: bool = should_export_plots
+        # Time axis of the profiles, indexed by the time slot offsets
+        self._time_slots: List[DateTime] = []
+        self._ui_time_slots: List[str] = []
+        self._time_slot_offsets: Dict[str, int] = {}
+        # Profiles keyed by UI formatted time, built once per market slot on the first access
+        self._formatted_profiles: Dict[str, Dict] = {}
+
+    @property
+    def traded_energy_profile(self) -> Dict:
+        """Return the energy trade profile of all market slots, keyed by UI formatted time."""
+        if "profile" not in self._formatted_profiles:
+            self._formatted_profiles["profile"] = self._format_time_slots(
+                self._traded_energy_profile, self._ui_time_slots)
+        return self._formatted_profiles["profile"]
+
+    @property
+    def traded_energy_current(self) -> Dict:
+        """Return the energy trade profile of the current market slot."""
+        if "current" not in self._formatted_profiles:
+            self._formatted_profiles["current"] = self._format_time_slots(
+                self._traded_energy_current, self._ui_time_slots)
+        return self._formatted_profiles["current"]
+
+    def _get_time_slot_offset(self, current_market_slot: str) -> int:
+        time_slot = str_to_pendulum_datetime(current_market_slot)
+        # Time slots are distinguished with the precision of the UI datetime format, that keys
+        # the reported results. The time axis keeps the first full precision time slot.
+        ui_time_slot = format_datetime(time_slot, ui_format=True)
+        if ui_time_slot not in self._time_slot_offsets:
+            self._time_slot_offsets[ui_time_slot] = len(self._time_slots)
+            self._time_slots.append(time_slot)
+            self._ui_time_slots.append(ui_time_slot)
+        return self._time_slot_offsets[ui_time_slot]
+
+    @staticmethod
+    def _format_time_slots(profile: Dict, time_slots: List) -> Dict:
+        """Replace the time slot offsets of the profile with the respective time slots."""
+        return {
+            area: {
+                sold_bought: {
+                    target_area: {
+                        source_area: {
+                            time_slots[offset]: energy for offset, energy in energy_mapping.items()
+                        }
+                        for source_area, energy_mapping in trades_mapping.items()
+                    }
+                    for target_area, trades_mapping in sold_bought_mapping.items()
+                }
+                for sold_bought, sold_bought_mapping in area_energy_mapping.items()
+            }
+            for area, area_energy_mapping in profile.items()
+        }
 
     def update(self, area_result_dict=None, core_stats=None, current_market_slot=None):
         if not self._has_update_parameters(
                 area_result_dict, core_stats, current_market_slot):
             return
-        current_market_slot = datetime_str_to_ui_formatted_datetime_str(current_market_slot)
-        self.traded_energy_current = {}
-        self._populate_area_children_data(area_result_dict, core_stats, current_market_slot)
-
-    def _populate_area_children_data(self, area_result_dict, core_stats, current_market_slot):
-        if area_result_dict.get("children") is not None:
-            for child in area_result_dict["children"]:
-                self._populate_area_children_data(child, core_stats, current_market_slot)
+        time_slot_offset = self._get_time_slot_offset(current_market_slot)
+        self._traded_energy_current = {}
+        self._formatted_profiles = {}
+        self._populate_area_children_data(area_result_dict, core_stats, time_slot_offset)
+
+    def _populate_area_children_data(self, area_result_dict, core_stats, time_slot_offset):
+        area_index = self._get_area_index(area_result_dict)
+        for node in area_index.subtree_bottom_up(area_result_dict["uuid"]):
+            if node.area_dict.get("children") is None:
+                continue
             if self.should_export_plots:
-                self._update_sold_bought_energy(area_result_dict, core_stats, current_market_slot)
+                self._update_sold_bought_energy(node.area_dict, core_stats, time_slot_offset)
             else:
                 self._update_current_energy_trade_profile(
-                    area_result_dict, core_stats, current_market_slot
+                    node.area_dict, core_stats, time_slot_offset
                 )
 
     def _update_current_energy_trade_profile(self, area_result_dict, core_stats,
-                                             current_market_slot):
-        if current_market_slot is not None:
-            self.traded_energy_current[area_result_dict["uuid"]] = {
+                                             time_slot_offset):
+        if time_slot_offset is not None:
+            self._traded_energy_current[area_result_dict["uuid"]] = {
                 "sold_energy": {}, "bought_energy": {}
             }
             self._calculate_devices_sold_bought_energy(
-                self.traded_energy_current[area_result_dict["uuid"]],
+                self._traded_energy_current[area_result_dict["uuid"]],
                 area_result_dict,
                 core_stats,
-                current_market_slot
+                time_slot_offset
             )
-            self._round_energy_trade_profile(self.traded_energy_current)
+            self._round_energy_trade_profile(self._traded_energy_current)
 
-    def _update_sold_bought_energy(self, area_result_dict, core_stats, current_market_slot):
-        if current_market_slot is not None:
+    def _update_sold_bought_energy(self, area_result_dict, core_stats, time_slot_offset):
+        if time_slot_offset is not None:
             area_name = area_result_dict["name"]
-            self.traded_energy_current[area_name] = {"sold_energy": {}, "bought_energy": {}}
+            self._traded_energy_current[area_name] = {"sold_energy": {}, "bought_energy": {}}
             self._calculate_devices_sold_bought_energy(
-                self.traded_energy_current[area_name], area_result_dict,
-                core_stats, current_market_slot)
+                self._traded_energy_current[area_name], area_result_dict,
+                core_stats, time_slot_offset)
 
-            traded_energy_current_name = {area_name: self.traded_energy_current[area_name]}
-            self.traded_energy_profile = self.merge_results_to_global(
-                traded_energy_current_name, self.traded_energy_profile,
-                [current_market_slot])
+            traded_energy_current_name = {area_name: self._traded_energy_current[area_name]}
+            self._traded_energy_profile = self.merge_results_to_global(
+                traded_energy_current_name, self._traded_energy_profile,
+                [time_slot_offset])
 
     @staticmethod
     def _calculate_devices_sold_bought_energy(res_dict, area_result_dict, core_stats,
-                                              current_market_slot):
+                                              time_slot_offset):
         if area_result_dict["uuid"] not in core_stats:
             return
         if core_stats[area_result_dict["uuid"]] == {}:
@@ -136,18 +207,18 @@ class EnergyTradeProfile(ResultsBaseClass):
             trade_energy = trade["energy"]
             if trade_energy > FLOATING_POINT_TOLERANCE:
                 add_or_create_key(res_dict["sold_energy"][trade_seller]["accumulated"],
-                                  current_market_slot, trade_energy)
+                                  time_slot_offset, trade_energy)
                 add_or_create_key(res_dict["sold_energy"][trade_seller][trade_buyer],
-                                  current_market_slot, trade_energy)
+                                  time_slot_offset, trade_energy)
             if trade_buyer not in res_dict["bought_energy"]:
                 res_dict["bought_energy"][trade_buyer] = {"accumulated": {}}
             if trade_seller not in res_dict["bought_energy"][trade_buyer]:
                 res_dict["bought_energy"][trade_buyer][trade_seller] = {}
             if trade_energy > FLOATING_POINT_TOLERANCE:
                 add_or_create_key(res_dict["bought_energy"][trade_buyer]["accumulated"],
-                                  current_market_slot, trade_energy)
+                                  time_slot_offset, trade_energy)
                 add_or_create_key(res_dict["bought_energy"][trade_buyer][trade_seller],
-                                  current_market_slot, trade_energy)
+                                  time_slot_offset, trade_energy)
 
     @staticmethod
     def _round_energy_trade_profile(energy_profile: Dict):
@@ -174,27 +245,14 @@ class EnergyTradeProfile(ResultsBaseClass):
                     trades_mapping[sold_bought + "_lists"][node]["energy"] = (
                         list(trades_mapping[sold_bought][node]["accumulated"].values()))
 
-    @staticmethod
-    def _convert_timestamp_strings_to_datetimes(profile: Dict) -> Dict:
-        out_dict = {}
-        for key in profile.keys():
-            out_dict[key] = {}
-            for sold_bought in ("sold_energy", "bought_energy"):
-                if sold_bought not in profile[key]:
-                    continue
-                out_dict[key][sold_bought] = {}
-                for dev in profile[key][sold_bought].keys():
-                    out_dict[key][sold_bought][dev] = {}
-                    for target in profile[key][sold_bought][dev].keys():
-                        out_dict[key][sold_bought][dev][target] = {}
-                        for timestamp_str in profile[key][sold_bought][dev][target].keys():
-                            datetime_obj = ui_str_to_pendulum_datetime(timestamp_str)
-                            out_dict[key][sold_bought][dev][target][datetime_obj] = (
-                                profile[key][sold_bought][dev][target][timestamp_str])
-        return out_dict
-
     @staticmethod
     def merge_results_to_global(market_results: Dict, global_results: Dict, slot_list: List):
+        """Merge the market results to the global results.
+
+        Newly added energy series are filled with zeros for all slots of slot_list. If slot_list
+        is None, only the traded slots are stored, and the global results can be filled with
+        zeros on export with densify_global_results.
+        """
         if not global_results:
             global_trade = market_results
             return global_trade
@@ -208,35 +266,58 @@ class EnergyTradeProfile(ResultsBaseClass):
                     for source_area in market_results[area_uuid][sold_bought][target_area]:
                         if source_area not in global_results[area_uuid][sold_bought][target_area]:
                             global_results[area_uuid][sold_bought][target_area][source_area] = (
-                                {i: 0 for i in slot_list})
+                                {i: 0 for i in slot_list} if slot_list is not None
+                                else _SparseEnergySeries())
                         global_results[area_uuid][sold_bought][target_area][source_area].update(
                             market_results[area_uuid][sold_bought][target_area][source_area]
                         )
         return global_results
 
+    @staticmethod
+    def densify_global_results(global_results: Dict, slot_list: List) -> Dict:
+        """Return the sparse global results with the energy series filled with zeros for
+        slot_list, as if they were merged with slot_list."""
+        return {
+            area_uuid: {
+                sold_bought: {
+                    target_area: {
+                        source_area: (
+                            {**{i: 0 for i in slot_list}, **energy_mapping}
+                            if isinstance(energy_mapping, _SparseEnergySeries)
+                            else dict(energy_mapping))
+                        for source_area, energy_mapping in trades_mapping.items()
+                    }
+                    for target_area, trades_mapping in sold_bought_mapping.items()
+                }
+                for sold_bought, sold_bought_mapping in area_energy_mapping.items()
+            }
+            for area_uuid, area_energy_mapping in global_results.items()
+        }
+
     def restore_area_results_state(self, area_dict: Dict, last_known_state_data: Dict):
         pass
 
+    def restore_checkpoint_state(self, state: Dict):
+        super().restore_checkpoint_state(state)
+        self._formatted_profiles = {}
+
     @property
     def plot_results(self) -> Dict:
         """Return the energy trade profile data to be plotted."""
-        traded_profile_for_plot = self._convert_timestamp_strings_to_datetimes(
-                deepcopy(self.traded_energy_profile)
-        )
+        traded_profile_for_plot = self._format_time_slots(
+            self._traded_energy_profile, self._time_slots)
         self._add_sold_bought_lists(traded_profile_for_plot)
         return traded_profile_for_plot
 
     @property
     def raw_results(self) -> str:
-        return convert_pendulum_to_str_in_dict(
-            self.traded_energy_profile, {}, ui_format=True)
+        return self.traded_energy_profile
 
     @property
     def ui_formatted_results(self) -> str:
-        return convert_pendulum_to_str_in_dict(
-            self.traded_energy_current, {}, ui_format=True)
+        return self.traded_energy_current
 
     def memory_allocation_size_kb(self) -> float:
         return self._calculate_memory_allocated_by_objects([
-            self.traded_energy_current, self.traded_energy_profile
+            self._traded_energy_current, self._traded_energy_profile
         ])
@@ -1,8 +1,9 @@
+from array import array
 from collections import defaultdict
 from typing import Dict
 
 from gsy_framework.sim_results.results_abc import ResultsBaseClass
-from gsy_framework.utils import add_or_create_key, HomeRepresentationUtils
+from gsy_framework.utils import HomeRepresentationUtils
 
 ENERGY_STAT_FIELDS = {
     "imported_from_community",
@@ -10,6 +11,16 @@ ENERGY_STAT_FIELDS = {
     "exported_to_community",
     "exported_to_grid",
 }
+# Order of the energy stat fields in the energy arrays of the areas
+_ENERGY_STAT_FIELDS_ORDER = (
+    "imported_from_community",
+    "imported_from_grid",
+    "exported_to_community",
+    "exported_to_grid",
+)
+_IMPORTED_FROM_COMMUNITY, _IMPORTED_FROM_GRID, _EXPORTED_TO_COMMUNITY, _EXPORTED_TO_GRID = range(
+    len(_ENERGY_STAT_FIELDS_ORDER)
+)
 
 
 class ImportedExportedEnergyHandler(ResultsBaseClass):
@@ -84,52 +95,37 @@ class ImportedExportedEnergyHandler(ResultsBaseClass):
         self._prepopulate_results_dict_with_zeros(
             {**member_uuid_name_mapping, community_uuid: community_dict["name"]}
         )
-        community_member_uuids = member_uuid_name_mapping.keys()
-        member_key = "name" if self.should_export_plots else "uuid"
-        community_key = community_dict["name"] if self.should_export_plots else community_uuid
+        # The energy of all members and of the community (placed after the members) is
+        # accumulated in one preallocated array, with one entry per area and energy stat field
+        member_positions = {
+            member_uuid: position for position, member_uuid in enumerate(member_uuid_name_mapping)
+        }
+        community_position = len(member_positions)
+        field_count = len(_ENERGY_STAT_FIELDS_ORDER)
+        energy = array("d", bytes(8 * field_count * (community_position + 1)))
         for trade in community_trades:
-            if (
-                trade["buyer"]["uuid"] in community_member_uuids
-                and trade["seller"]["uuid"] in community_member_uuids
-            ):
-                add_or_create_key(
-                    self.imported_exported_energy[trade["buyer"][member_key]][self._market_slot],
-                    "imported_from_community",
-                    trade["energy"],
-                )
-                add_or_create_key(
-                    self.imported_exported_energy[trade["seller"][member_key]][self._market_slot],
-                    "exported_to_community",
-                    trade["energy"],
-                )
-
-            elif (
-                trade["buyer"]["uuid"] in community_member_uuids
-                and trade["seller"]["uuid"] == community_uuid
-            ):
-                add_or_create_key(
-                    self.imported_exported_energy[trade["buyer"][member_key]][self._market_slot],
-                    "imported_from_grid",
-                    trade["energy"],
-                )
+            buyer_position = member_positions.get(trade["buyer"]["uuid"])
+            seller_position = member_positions.get(trade["seller"]["uuid"])
+            if buyer_position is not None and seller_position is not None:
+                energy[buyer_position * field_count + _IMPORTED_FROM_COMMUNITY] += trade["energy"]
+                energy[seller_position * field_count + _EXPORTED_TO_COMMUNITY] += trade["energy"]
+            elif buyer_position is not None and trade["seller"]["uuid"] == community_uuid:
+                energy[buyer_position * field_count + _IMPORTED_FROM_GRID] += trade["energy"]
                 # Track community imported energy from grid
-                add_or_create_key(
-                    self.imported_exported_energy[community_key][self._market_slot],
-                    "imported_from_grid",
-                    trade["energy"],
-                )
-            elif (
-                trade["seller"]["uuid"] in community_member_uuids
-                and trade["buyer"]["uuid"] == community_uuid
-            ):
-                add_or_create_key(
-                    self.imported_exported_energy[trade["seller"][member_key]][self._market_slot],
-                    "exported_to_grid",
-                    trade["energy"],
-                )
+                energy[community_position * field_count + _IMPORTED_FROM_GRID] += trade["energy"]
+            elif seller_position is not None and trade["buyer"]["uuid"] == community_uuid:
+                energy[seller_position * field_count + _EXPORTED_TO_GRID] += trade["energy"]
                 # Track community exported energy to grid
-                add_or_create_key(
-                    self.imported_exported_energy[community_key][self._market_slot],
-                    "exported_to_grid",
-                    trade["energy"],
-                )
+                energy[community_position * field_count + _EXPORTED_TO_GRID] += trade["energy"]
+
+        area_keys = [
+            *(member_uuid_name_mapping.values()
+              if self.should_export_plots else member_uuid_name_mapping.keys()),
+            community_dict["name"] if self.should_export_plots else community_uuid,
+        ]
+        for position, area_key in enumerate(area_keys):
+            area_results = self.imported_exported_energy[area_key][self._market_slot]
+            for field_index, stat_key in enumerate(_ENERGY_STAT_FIELDS_ORDER):
+                area_energy = energy[position * field_count + field_index]
+                if area_energy:
+                    area_results[stat_key] += area_energy
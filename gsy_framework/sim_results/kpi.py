@@ -17,7 +17,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from copy import copy
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from gsy_framework.sim_results import (
     is_infinite_bus_node_type,
@@ -28,7 +28,6 @@ from gsy_framework.sim_results import (
 )
 from gsy_framework.sim_results.kpi_calculation_helper import KPICalculationHelper
 from gsy_framework.sim_results.results_abc import ResultsBaseClass
-from gsy_framework.utils import if_not_in_list_append
 
 
 def _is_trader_origin(trader_details: Dict) -> bool:
@@ -41,49 +40,112 @@ class KPIState:
     # pylint: disable=too-many-instance-attributes
 
     def __init__(self):
-        self.producer_list: List = []
-        self.consumer_list: List = []
-        self.areas_to_trace_list: List = []
-        self.ess_list: List = []
-        self.infinite_bus_list: List = []
+        # Device registries, implemented as ordered sets (dicts with None values). Devices are
+        # only added to the registries, in the order that they are first found in the area tree.
+        self.producer_set: Dict[str, None] = {}
+        self.consumer_set: Dict[str, None] = {}
+        self.areas_to_trace_set: Dict[str, None] = {}
+        self.ess_set: Dict[str, None] = {}
+        self.infinite_bus_set: Dict[str, None] = {}
+        # Devices whose demand is accumulated, in the form (uuid, is load, is heat pump)
+        self._demand_devices: List[Tuple[str, bool, bool]] = []
+        self._topology_version: Optional[str] = None
         self.total_energy_demanded_wh: float = 0.0
         self.infinite_bus_consumption: float = 0.0
         self.total_energy_produced_wh: float = 0.0
         self.total_self_consumption_wh: float = 0.0
         self.self_consumption_ess_wh: float = 0.0
 
-    def get_device_lists(self, area_dict: Dict):
-        """Create list of all device types in the area."""
+    @property
+    def producer_list(self) -> List[str]:
+        """Registered producer uuids, in the order they were registered."""
+        return list(self.producer_set)
+
+    @producer_list.setter
+    def producer_list(self, uuids: List[str]):
+        self.producer_set = dict.fromkeys(uuids)
+
+    @property
+    def consumer_list(self) -> List[str]:
+        """Registered consumer uuids, in the order they were registered."""
+        return list(self.consumer_set)
+
+    @consumer_list.setter
+    def consumer_list(self, uuids: List[str]):
+        self.consumer_set = dict.fromkeys(uuids)
+
+    @property
+    def areas_to_trace_list(self) -> List[str]:
+        """Uuids of the areas whose trades are traced, in the order they were registered."""
+        return list(self.areas_to_trace_set)
+
+    @areas_to_trace_list.setter
+    def areas_to_trace_list(self, uuids: List[str]):
+        self.areas_to_trace_set = dict.fromkeys(uuids)
+
+    @property
+    def ess_list(self) -> List[str]:
+        """Registered storage uuids, in the order they were registered."""
+        return list(self.ess_set)
+
+    @ess_list.setter
+    def ess_list(self, uuids: List[str]):
+        self.ess_set = dict.fromkeys(uuids)
+
+    @property
+    def infinite_bus_list(self) -> List[str]:
+        """Registered infinite bus uuids, in the order they were registered."""
+        return list(self.infinite_bus_set)
+
+    @infinite_bus_list.setter
+    def infinite_bus_list(self, uuids: List[str]):
+        self.infinite_bus_set = dict.fromkeys(uuids)
+
+    def get_device_lists(self, area_dict: Dict, topology_version: Optional[str] = None):
+        """Register all device types in the area.
+
+        If topology_version is provided, the area tree is traversed only once per topology
+        version, and the registries are reused for all market slots with the same topology.
+        """
+        if topology_version is not None and topology_version == self._topology_version:
+            return
+        self._topology_version = topology_version
+        self._demand_devices = []
+        self._register_devices(area_dict)
+
+    def _register_devices(self, area_dict: Dict):
         for child in area_dict["children"]:
             if is_producer_node_type(child):
-                if_not_in_list_append(self.producer_list, child["uuid"])
-                if_not_in_list_append(self.areas_to_trace_list, child["parent_uuid"])
+                self.producer_set.setdefault(child["uuid"])
+                self.areas_to_trace_set.setdefault(child["parent_uuid"])
             elif is_load_node_type(child) or is_heatpump_node_type(child):
-                if_not_in_list_append(self.consumer_list, child["uuid"])
-                if_not_in_list_append(self.areas_to_trace_list, child["parent_uuid"])
+                self.consumer_set.setdefault(child["uuid"])
+                self.areas_to_trace_set.setdefault(child["parent_uuid"])
             elif is_prosumer_node_type(child):
-                if_not_in_list_append(self.ess_list, child["uuid"])
+                self.ess_set.setdefault(child["uuid"])
             elif is_infinite_bus_node_type(child):
-                if_not_in_list_append(self.infinite_bus_list, child["uuid"])
+                self.infinite_bus_set.setdefault(child["uuid"])
+            is_load = is_load_node_type(child)
+            is_heatpump = is_heatpump_node_type(child)
+            if is_load or is_heatpump:
+                self._demand_devices.append((child["uuid"], is_load, is_heatpump))
             if child["children"]:
-                self.get_device_lists(child)
-
-    def _accumulate_total_energy_demanded(self, area_dict: Dict, core_stats: Dict):
-        for child in area_dict["children"]:
-            child_stats = core_stats.get(child["uuid"], {})
-            if is_load_node_type(child):
-                self.total_energy_demanded_wh += child_stats.get("total_energy_demanded_wh", 0)
-            if is_heatpump_node_type(child):
+                self._register_devices(child)
+
+    def _accumulate_total_energy_demanded(self, core_stats: Dict):
+        for device_uuid, is_load, is_heatpump in self._demand_devices:
+            device_stats = core_stats.get(device_uuid, {})
+            if is_load:
+                self.total_energy_demanded_wh += device_stats.get("total_energy_demanded_wh", 0)
+            if is_heatpump:
                 self.total_energy_demanded_wh += (
-                    child_stats.get("total_traded_energy_kWh", 0) * 1000.0
+                    device_stats.get("total_traded_energy_kWh", 0) * 1000.0
                 )
-            if child["children"]:
-                self._accumulate_total_energy_demanded(child, core_stats)
 
     def _accumulate_self_production(self, trade: Dict):
         # Trade seller_id origin should be equal to the trade seller_id in order to
         # not double count trades in higher hierarchies
-        if trade["seller"]["origin_uuid"] in self.producer_list and _is_trader_origin(
+        if trade["seller"]["origin_uuid"] in self.producer_set and _is_trader_origin(
             trade["seller"]
         ):
             self.total_energy_produced_wh += trade["energy"] * 1000
@@ -92,25 +154,25 @@ class KPIState:
         # Trade buyer_id origin should be equal to the trade buyer_id in order to
         # not double count trades in higher hierarchies
         if (
-            trade["seller"]["origin_uuid"] in self.producer_list
-            and trade["buyer"]["origin_uuid"] in self.consumer_list
+            trade["seller"]["origin_uuid"] in self.producer_set
+            and trade["buyer"]["origin_uuid"] in self.consumer_set
             and _is_trader_origin(trade["buyer"])
         ):
             self.total_self_consumption_wh += trade["energy"] * 1000
 
     def _accumulate_self_consumption_ess(self, trade: Dict):
         if (
-            trade["seller"]["origin_uuid"] in self.producer_list
-            and trade["buyer"]["origin_uuid"] in self.ess_list
+            trade["seller"]["origin_uuid"] in self.producer_set
+            and trade["buyer"]["origin_uuid"] in self.ess_set
         ):
             self.self_consumption_ess_wh += trade["energy"] * 1000
 
     def _dissipate_self_consumption_ess(self, trade: Dict):
-        if trade["seller"]["origin_uuid"] in self.ess_list:
+        if trade["seller"]["origin_uuid"] in self.ess_set:
             # self_consumption_ess_wh needs to be exhausted to total_self_consumption
             # if sold to internal consumer
             if (
-                trade["buyer"]["origin_uuid"] in self.consumer_list
+                trade["buyer"]["origin_uuid"] in self.consumer_set
                 and _is_trader_origin(trade["buyer"])
                 and self.self_consumption_ess_wh > 0
             ):
@@ -122,7 +184,8 @@ class KPIState:
                     self.self_consumption_ess_wh = 0
             # self_consumption_ess_wh needs to be exhausted if sold to any external agent
             elif (
-                trade["buyer"]["origin_uuid"] not in [*self.ess_list, *self.consumer_list]
+                trade["buyer"]["origin_uuid"] not in self.ess_set
+                and trade["buyer"]["origin_uuid"] not in self.consumer_set
                 and _is_trader_origin(trade["buyer"])
                 and self.self_consumption_ess_wh > 0
             ):
@@ -139,8 +202,8 @@ class KPIState:
         * total_energy_produced_wh is accumulated accounting of what the InfiniteBus has produced.
         """
         if (
-            trade["seller"]["origin_uuid"] in self.infinite_bus_list
-            and trade["buyer"]["origin_uuid"] in self.consumer_list
+            trade["seller"]["origin_uuid"] in self.infinite_bus_set
+            and trade["buyer"]["origin_uuid"] in self.consumer_set
             and _is_trader_origin(trade["buyer"])
         ):
             self.total_self_consumption_wh += trade["energy"] * 1000
@@ -155,15 +218,15 @@ class KPIState:
         consumed/demanded.
         """
         if (
-            trade["buyer"]["origin_uuid"] in self.infinite_bus_list
-            and trade["seller"]["origin_uuid"] in self.producer_list
+            trade["buyer"]["origin_uuid"] in self.infinite_bus_set
+            and trade["seller"]["origin_uuid"] in self.producer_set
             and _is_trader_origin(trade["seller"])
         ):
             self.total_self_consumption_wh += trade["energy"] * 1000
             self.infinite_bus_consumption += trade["energy"] * 1000
 
     def _accumulate_self_production_consumption(self, core_stats: Dict, p2p: bool):
-        for target_area_uuid in self.areas_to_trace_list:
+        for target_area_uuid in self.areas_to_trace_set:
             target_core_stats = core_stats.get(target_area_uuid, {})
             for trade in target_core_stats.get("trades", []):
                 self._accumulate_self_consumption(trade)
@@ -178,7 +241,7 @@ class KPIState:
         """Update kpi after every market cycle"""
         self.total_energy_demanded_wh = 0
 
-        self._accumulate_total_energy_demanded(area_dict, core_stats)
+        self._accumulate_total_energy_demanded(core_stats)
         self._accumulate_self_production_consumption(
             core_stats, area_dict.get("non_p2p", False) is False
         )
@@ -193,17 +256,28 @@ class SavingsKPI:
         self.fit_revenue = 0.0  # revenue achieved by producing selling energy via FIT scheme
         self.utility_bill = 0.0  # cost of energy purchase from energy supplier
         self.gsy_e_cost = 0.0  # standard cost of a house participating in GSy Exchange
-
-    def calculate_savings_kpi(self, area_dict: Dict, core_stats: Dict, grid_fee_along_path: float):
+        self._topology_version: Optional[str] = None
+
+    def calculate_savings_kpi(
+        self,
+        area_dict: Dict,
+        core_stats: Dict,
+        grid_fee_along_path: float,
+        topology_version: Optional[str] = None,
+    ):
         """Calculates the referenced saving from feed-in tariff based participation vs GSY-E
         Args:
             area_dict: contain nested area info
             core_stats: contain area's raw/key statistics
             grid_fee_along_path: grid_fee_along_the_path -
             cumulative grid fee from root to target area
+            topology_version: version of the area tree topology, if provided the device sets
+            are populated only once per version
 
         """
-        self._populate_consumer_producer_sets(area_dict)
+        if topology_version is None or topology_version != self._topology_version:
+            self._populate_consumer_producer_sets(area_dict)
+            self._topology_version = topology_version
 
         feed_in_tariff = self._get_feed_in_tariff_rate_excluding_path_grid_fees(
             core_stats.get(area_dict["uuid"], {}), grid_fee_along_path
@@ -301,13 +375,15 @@ class KPI(ResultsBaseClass):
             # because the market maker usually resides there. Therefor the calculation is skipped
             self.savings_state[area_dict["uuid"]] = SavingsKPI()
 
-    def _calculate_area_performance_indices(self, area_dict: Dict, core_stats: Dict) -> Dict:
+    def _calculate_area_performance_indices(
+        self, area_dict: Dict, core_stats: Dict, topology_version: Optional[str] = None
+    ) -> Dict:
         """Entrypoint to be triggered after every market cycle to calculate
         respective area's KPIs"""
 
         self._init_states(area_dict)
 
-        self.state[area_dict["uuid"]].get_device_lists(area_dict)
+        self.state[area_dict["uuid"]].get_device_lists(area_dict, topology_version)
 
         self.state[area_dict["uuid"]].update_area_kpi(area_dict, core_stats)
         total_energy_demanded_wh = (
@@ -337,7 +413,10 @@ class KPI(ResultsBaseClass):
 
         if area_dict["uuid"] in self.savings_state:
             self.savings_state[area_dict["uuid"]].calculate_savings_kpi(
-                area_dict, core_stats, self.area_uuid_cum_grid_fee_mapping[area_dict["uuid"]]
+                area_dict,
+                core_stats,
+                self.area_uuid_cum_grid_fee_mapping[area_dict["uuid"]],
+                topology_version,
             )
             kpi_parm_dict.update(self.savings_state[area_dict["uuid"]].to_dict())
 
@@ -368,22 +447,29 @@ class KPI(ResultsBaseClass):
         ) or not area_dict.get("children"):
             return
 
-        self.area_uuid_cum_grid_fee_mapping[area_dict["uuid"]] = (
-            self._accumulate_root_to_target_area_grid_fee(area_dict, core_stats)
-        )
-        self.performance_indices[area_dict["uuid"]] = self._calculate_area_performance_indices(
-            area_dict, core_stats
-        )
-
-        for child in area_dict["children"]:
-            if len(child["children"]) > 0:
-                self.update(child, core_stats, current_market_slot)
+        # Only markets (areas with children) are evaluated. Parents are visited before their
+        # children, because the grid fee along the path is accumulated from the root.
+        # The device registries of the areas are rebuilt only when the topology version of the
+        # area index changes.
+        area_index = self._get_area_index(area_dict)
+        for node in area_index.subtree(area_dict["uuid"]):
+            if node.is_leaf:
+                continue
+            self.area_uuid_cum_grid_fee_mapping[node.uuid] = (
+                self._accumulate_root_to_target_area_grid_fee(node.area_dict, core_stats)
+            )
+            self.performance_indices[node.uuid] = self._calculate_area_performance_indices(
+                node.area_dict, core_stats, area_index.topology_version
+            )
 
-        self._post_process_savings_kpis(area_dict)
+        for node in area_index.subtree_bottom_up(area_dict["uuid"]):
+            if node.is_leaf:
+                continue
+            self._post_process_savings_kpis(node.area_dict)
 
-        self.performance_indices_redis[area_dict["uuid"]] = self._get_ui_formatted_results(
-            area_dict["uuid"]
-        )
+            self.performance_indices_redis[node.uuid] = self._get_ui_formatted_results(
+                node.uuid
+            )
 
     def _post_process_savings_kpis(self, area_dict: Dict) -> None:
         """
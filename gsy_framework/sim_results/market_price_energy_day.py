@@ -15,15 +15,34 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-from collections import OrderedDict
-from typing import Dict
+from typing import Dict, Optional, Union
 from copy import deepcopy
 
-from gsy_framework.utils import round_floats_for_ui, \
-    convert_pendulum_to_str_in_dict, key_in_dict_and_not_none
+from pendulum import DateTime
+
+from gsy_framework.utils import round_floats_for_ui, format_datetime, key_in_dict_and_not_none
 from gsy_framework.sim_results.results_abc import ResultsBaseClass
 
 
+class TradeRateStatistics:
+    """Running statistics of the trade rates of one market, updated in constant time per trade."""
+
+    __slots__ = ("count", "min", "max")
+
+    def __init__(self):
+        self.count: int = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, rate: float):
+        """Add the rate of a trade to the statistics."""
+        self.count += 1
+        if self.min is None or rate < self.min:
+            self.min = rate
+        if self.max is None or rate > self.max:
+            self.max = rate
+
+
 class MarketPriceEnergyDay(ResultsBaseClass):
     def __init__(self, should_export_plots):
         self._price_energy_day = {}
@@ -36,46 +55,34 @@ class MarketPriceEnergyDay(ResultsBaseClass):
             self.csv_output, self.redis_output, self._price_energy_day
         ])
 
-    @classmethod
-    def gather_trade_rates(cls, area_dict, core_stats, current_market_slot, price_lists):
-        if area_dict['children'] == []:
-            return price_lists
-
-        cls.gather_rates_one_market(area_dict, core_stats, current_market_slot, price_lists)
-
-        for child in area_dict['children']:
-            price_lists = cls.gather_trade_rates(child, core_stats, current_market_slot,
-                                                 price_lists)
-
-        return price_lists
-
-    @classmethod
-    def gather_rates_one_market(cls, area_dict, core_stats, current_market_slot, price_lists):
-        if area_dict['uuid'] not in price_lists:
-            price_lists[area_dict['uuid']] = OrderedDict()
-        if current_market_slot not in price_lists[area_dict['uuid']].keys():
-            price_lists[area_dict['uuid']][current_market_slot] = []
-        trade_rates = [
-            # Convert from cents to euro
-            t['energy_rate'] / 100.0
-            for t in cls._get_trades_from_core_stats(core_stats, area_dict["uuid"])
-        ]
-        price_lists[area_dict['uuid']][current_market_slot].extend(trade_rates)
+    def gather_trade_rate_statistics(
+            self, area_dict: Dict, core_stats: Dict) -> Dict[str, TradeRateStatistics]:
+        """Return the statistics of the trade rates of all markets of the area tree."""
+        rate_statistics = {}
+        for node in self._get_area_index(area_dict).subtree(area_dict["uuid"]):
+            if node.is_leaf:
+                continue
+            market_statistics = rate_statistics[node.uuid] = TradeRateStatistics()
+            for trade in self._get_trades_from_core_stats(core_stats, node.uuid):
+                # Convert from cents to euro
+                market_statistics.add(trade["energy_rate"] / 100.0)
+        return rate_statistics
 
     def update(self, area_result_dict=None, core_stats=None, current_market_slot=None):
         if not self._has_update_parameters(
                 area_result_dict, core_stats, current_market_slot):
             return
-        current_price_lists = self.gather_trade_rates(
-            area_result_dict, core_stats, current_market_slot, {}
-        )
-        price_energy_redis_output = {}
-        self._convert_output_format(current_price_lists, price_energy_redis_output,
-                                    core_stats)
+        rate_statistics = self.gather_trade_rate_statistics(area_result_dict, core_stats)
         if self.should_export_plots:
-            self.calculate_csv_output(area_result_dict, price_energy_redis_output)
+            # The CSV output keeps the time slot as it was passed
+            self.calculate_csv_output(area_result_dict, self._convert_output_format(
+                rate_statistics, current_market_slot, core_stats))
         else:
-            self.redis_output = price_energy_redis_output
+            # The time slot is formatted once, so that the output does not need to be converted
+            time_slot = (format_datetime(current_market_slot)
+                         if isinstance(current_market_slot, DateTime) else current_market_slot)
+            self.redis_output = self._convert_output_format(
+                rate_statistics, time_slot, core_stats)
 
     def calculate_csv_output(self, area_dict, price_energy_redis_output):
         if not price_energy_redis_output.get(area_dict['uuid'], {}).get('price-energy-day', []):
@@ -92,27 +99,27 @@ class MarketPriceEnergyDay(ResultsBaseClass):
             self.calculate_csv_output(child, price_energy_redis_output)
 
     @staticmethod
-    def _convert_output_format(price_energy, redis_output, core_stats):
-        for node_uuid, trade_rates in price_energy.items():
-            if node_uuid not in redis_output:
-                redis_output[node_uuid] = {
-                    "price-currency": "Euros",
-                    "load-unit": "kWh",
-                    "price-energy-day": []
-                }
-            redis_output[node_uuid]["price-energy-day"] = [
-                {
-                    "time": time_slot,
-                    "min_price": round_floats_for_ui(min(trades) if len(trades) > 0 else 0),
-                    "max_price": round_floats_for_ui(max(trades) if len(trades) > 0 else 0),
-                } for time_slot, trades in trade_rates.items()
-            ]
-
+    def _convert_output_format(
+            rate_statistics: Dict[str, TradeRateStatistics], time_slot: Union[DateTime, str],
+            core_stats: Dict) -> Dict:
+        redis_output = {}
+        for node_uuid, market_statistics in rate_statistics.items():
             area_core_stats = core_stats.get(node_uuid, {})
             fee = area_core_stats['grid_fee_constant'] / 100 \
                 if key_in_dict_and_not_none(area_core_stats, 'grid_fee_constant') else None
-
-            redis_output[node_uuid]["price-energy-day"][0].update({"grid_fee_constant": fee})
+            redis_output[node_uuid] = {
+                "price-currency": "Euros",
+                "load-unit": "kWh",
+                "price-energy-day": [{
+                    "time": time_slot,
+                    "min_price": round_floats_for_ui(
+                        market_statistics.min if market_statistics.count > 0 else 0),
+                    "max_price": round_floats_for_ui(
+                        market_statistics.max if market_statistics.count > 0 else 0),
+                    "grid_fee_constant": fee,
+                }]
+            }
+        return redis_output
 
     @staticmethod
     def merge_results_to_global(market_pe: Dict, global_pe: Dict, *_):
@@ -136,4 +143,4 @@ class MarketPriceEnergyDay(ResultsBaseClass):
 
     @property
     def ui_formatted_results(self):
-        return convert_pendulum_to_str_in_dict(self.redis_output, {})
+        return self.redis_output
@@ -1,8 +1,54 @@
-from typing import Dict
-from statistics import mean
+from math import isnan, nan
+from typing import Dict, List, Tuple
 from gsy_framework.utils import key_in_dict_and_not_none, limit_float_precision
+from gsy_framework.sim_results.area_index import AreaNode
+from gsy_framework.sim_results.columnar_history import ColumnarHistory
 from gsy_framework.sim_results.results_abc import ResultsBaseClass
-from gsy_framework.sim_results import is_trade_external
+from gsy_framework.sim_results.trade_index import TradeIndex
+
+MARKET_SUMMARY_COLUMNS = ("average_energy_rate", "external_traded_volume", "traded_volume")
+
+
+class MarketSummaryHistory(ColumnarHistory):
+    """Columnar market summary history of areas, that can be used as global market summary results.
+
+    Used as the sparse global results of MarketSummaryInfo.merge_results_to_global, in order to
+    store the summaries in preallocated per-area columns instead of lists of dicts. Like in the
+    dict global results, a summary with the same timestamp as a previous one of the area is
+    appended after it, therefore the rows are keyed by the timestamp and its occurrence.
+    """
+
+    def __init__(self):
+        super().__init__(MARKET_SUMMARY_COLUMNS)
+        self._timestamp_occurrences: Dict[Tuple[str, str], int] = {}
+
+    def add_results(self, area_key: str, area_results: Dict):
+        """Append the market summary of the area."""
+        timestamp = area_results["timestamp"]
+        occurrence = self._timestamp_occurrences.get((area_key, timestamp), 0)
+        self._timestamp_occurrences[(area_key, timestamp)] = occurrence + 1
+        average_energy_rate = area_results["average_energy_rate"]
+        self.set_row(area_key, (timestamp, occurrence), (
+            nan if average_energy_rate is None else average_energy_rate,
+            area_results["external_traded_volume"],
+            area_results["traded_volume"]))
+
+    def area_results(self, area_key: str) -> List[Dict]:
+        """Return the market summaries of the area, in the format of the dict global results."""
+        return [
+            {
+                "average_energy_rate": None if isnan(average_energy_rate) else average_energy_rate,
+                "external_traded_volume": external_traded_volume,
+                "traded_volume": traded_volume,
+                "timestamp": timestamp,
+            }
+            for (timestamp, _), (average_energy_rate, external_traded_volume, traded_volume)
+            in self.area_rows(area_key)
+        ]
+
+    def to_dict(self) -> Dict:
+        """Return the history in the format of the dict global market summary results."""
+        return {area_key: self.area_results(area_key) for area_key in self.area_keys}
 
 
 class MarketSummaryInfo(ResultsBaseClass):
@@ -11,8 +57,23 @@ class MarketSummaryInfo(ResultsBaseClass):
         self._should_export_plots = should_export_plots
         self._market_summary = {}
 
+    @staticmethod
+    def create_sparse_global_results() -> MarketSummaryHistory:
+        return MarketSummaryHistory()
+
+    @staticmethod
+    def densify_global_results(global_results, slot_list: List) -> Dict:
+        if isinstance(global_results, MarketSummaryHistory):
+            return global_results.to_dict()
+        return global_results
+
     @staticmethod
     def merge_results_to_global(market_results: Dict, global_results: Dict, *_):
+        if isinstance(global_results, MarketSummaryHistory):
+            for area_uuid, area_results in market_results.items():
+                if area_results:
+                    global_results.add_results(area_uuid, area_results)
+            return global_results
         if not global_results:
             global_results = {
                 area_uuid: [results]
@@ -37,25 +98,30 @@ class MarketSummaryInfo(ResultsBaseClass):
         self._update_results(area_result_dict, core_stats, current_market_slot)
 
     def _update_results(self, area_dict, core_stats, current_market_slot):
-        if not key_in_dict_and_not_none(area_dict, 'children'):
-            return
-        self._calculate_market_summary_for_area(area_dict, core_stats, current_market_slot)
-        for child in area_dict['children']:
-            self._update_results(child, core_stats, current_market_slot)
+        trade_index = self._get_trade_index(core_stats)
+        for node in self._get_area_index(area_dict).subtree(area_dict["uuid"]):
+            if key_in_dict_and_not_none(node.area_dict, 'children'):
+                self._calculate_market_summary_for_area(node, trade_index, current_market_slot)
 
-    def _calculate_market_summary_for_area(self, area_dict, core_stats, current_market_slot):
-        price_list = []
+    def _calculate_market_summary_for_area(
+            self, node: AreaNode, trade_index: TradeIndex, current_market_slot):
+        trade_count = 0
+        energy_rate_sum = 0.0
         volume_kWh = 0.0
         external_traded_volume_kWh = 0.0
-        child_names = [c["name"] for c in area_dict["children"]]
-        for trade in core_stats.get(area_dict['uuid'], {}).get('trades', []):
-            price_list.append(trade["energy_rate"])
+        for seller_name, buyer_name, trade in trade_index.market(
+                node.uuid).trades_with_area_names:
+            trade_count += 1
+            energy_rate_sum += trade["energy_rate"]
             volume_kWh += trade["energy"]
-            if is_trade_external(trade, area_dict["name"], child_names):
+            # External trades are the trades between the area and one of its children
+            if ((seller_name == node.name and buyer_name in node.child_names) or
+                    (buyer_name == node.name and seller_name in node.child_names)):
                 external_traded_volume_kWh += trade["energy"]
 
-        self._market_summary[area_dict["uuid"]] = {
-            "average_energy_rate": limit_float_precision(mean(price_list)) if price_list else None,
+        self._market_summary[node.uuid] = {
+            "average_energy_rate": (
+                limit_float_precision(energy_rate_sum / trade_count) if trade_count else None),
             "external_traded_volume": external_traded_volume_kWh,
             "traded_volume": volume_kWh,
             "timestamp": current_market_slot
@@ -1,13 +1,90 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
 
 from gsy_framework.constants_limits import ConstSettings
 from gsy_framework.enums import SpotMarketTypeEnum
+from gsy_framework.sim_results.area_index import AreaIndex, AreaTopologyCache
+from gsy_framework.sim_results.trade_index import MarketTrades, TradeIndex
 from gsy_framework.utils import get_json_dict_memory_allocation_size
 
 
 class ResultsBaseClass(ABC):
 
+    _shared_area_index: Optional[AreaIndex] = None
+    _shared_trade_index: Optional[TradeIndex] = None
+    # Used when the result object is updated without a shared area index
+    _area_topology_cache: Optional[AreaTopologyCache] = None
+    # True if the result object reports the parts of ui_formatted_results that its update
+    # changed, see pop_changed_results_paths
+    tracks_changed_results = False
+    # Attributes that are not stored in checkpoints, because they are only valid during one
+    # update or are rebuilt when needed
+    _checkpoint_excluded_attributes: Tuple[str, ...] = (
+        "_shared_area_index", "_shared_trade_index", "_area_topology_cache",
+        "_changed_results_paths")
+
+    def set_area_index(self, area_index: Optional[AreaIndex]):
+        """
+        Share the area index of the current market slot, in order to avoid rebuilding it
+        for every result object. Should be reset to None after the update of the market slot.
+        """
+        self._shared_area_index = area_index
+
+    def _get_area_index(self, area_dict: Dict) -> AreaIndex:
+        """
+        Return the shared area index if it includes the area, otherwise return the index of the
+        area tree from the topology cache of the result object.
+        """
+        if self._shared_area_index is not None and area_dict["uuid"] in self._shared_area_index:
+            return self._shared_area_index
+        if self._area_topology_cache is None:
+            self._area_topology_cache = AreaTopologyCache()
+        return self._area_topology_cache.get_area_index(area_dict)
+
+    def set_trade_index(self, trade_index: Optional[TradeIndex]):
+        """
+        Share the trade index of the current market slot, in order to avoid rebuilding it
+        for every result object. Should be reset to None after the update of the market slot.
+        """
+        self._shared_trade_index = trade_index
+
+    def _get_trade_index(self, core_stats: Dict) -> TradeIndex:
+        """
+        Return the shared trade index if it indexes core_stats, otherwise index core_stats.
+        """
+        if (self._shared_trade_index is not None and
+                self._shared_trade_index.core_stats is core_stats):
+            return self._shared_trade_index
+        return TradeIndex(core_stats)
+
+    def _mark_results_changed(self, *path: str):
+        """
+        Record that the value of ui_formatted_results at path (a sequence of keys) was changed
+        or removed. Should be called by result objects that track their changed results.
+        """
+        self.__dict__.setdefault("_changed_results_paths", set()).add(path)
+
+    def pop_changed_results_paths(self) -> Optional[Set[Tuple[str, ...]]]:
+        """
+        Return the paths of ui_formatted_results that changed since the previous call. Returns
+        None if the result object does not track its changes, in which case all of its results
+        should be considered changed.
+        """
+        if not self.tracks_changed_results:
+            return None
+        return self.__dict__.pop("_changed_results_paths", set())
+
+    def get_checkpoint_state(self) -> Dict:
+        """Return the internal state of the result object, to be stored in a checkpoint."""
+        return {
+            attribute: value for attribute, value in vars(self).items()
+            if attribute not in self._checkpoint_excluded_attributes
+        }
+
+    def restore_checkpoint_state(self, state: Dict):
+        """Restore the internal state of the result object from get_checkpoint_state."""
+        self.__dict__.update(state)
+
     @staticmethod
     def _has_update_parameters(area_result_dict, core_stats, current_market_slot):
         """
@@ -30,6 +107,25 @@ class ResultsBaseClass(ABC):
         """
         pass
 
+    @staticmethod
+    def create_sparse_global_results():
+        """
+        Creates the empty global results that are merged sparsely (with slot_list=None). Result
+        classes can return a more compact container than a dict, that is converted to the dict
+        global results by densify_global_results.
+        """
+        return {}
+
+    @staticmethod
+    def densify_global_results(global_results: Dict, slot_list: List) -> Dict:
+        """
+        Fills the global results that were merged sparsely (with slot_list=None) with the
+        values of the slots of slot_list that have not been traded. Should be used when
+        exporting the global results. Only needed for result classes that store a value
+        for every slot.
+        """
+        return global_results
+
     @abstractmethod
     def update(self, area_result_dict, core_stats, current_market_slot):
         """
@@ -79,3 +175,10 @@ class ResultsBaseClass(ABC):
             return core_stats[area_uuid].get("after_meter_data", {}).get("trades", [])
         else:
             return core_stats[area_uuid].get("trades", [])
+
+    @staticmethod
+    def _get_indexed_trades_from_core_stats(trade_index: TradeIndex, area_uuid) -> MarketTrades:
+        """Return the indexed trades of the area, selected like _get_trades_from_core_stats."""
+        if ConstSettings.MASettings.MARKET_TYPE == SpotMarketTypeEnum.COEFFICIENTS.value:
+            return trade_index.after_meter_market(area_uuid)
+        return trade_index.market(area_uuid)
@@ -0,0 +1,107 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of Grid Singularity Exchange.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import builtins
+import collections
+import datetime
+import pickle
+from array import array
+from io import BytesIO
+from struct import Struct
+from typing import Dict
+from zlib import compress, decompress
+
+from pendulum import Date, DateTime, Duration, Time
+from pendulum.tz.timezone import FixedTimezone, Timezone
+
+from gsy_framework.exceptions import GSySerializationException
+from gsy_framework.sim_results.area_throughput_stats import ThroughputHistory
+from gsy_framework.sim_results.columnar_history import ColumnarHistory, _AreaColumns
+from gsy_framework.sim_results.kpi import KPIState, SavingsKPI
+from gsy_framework.sim_results.market_summary_info import MarketSummaryHistory
+
+RESULTS_CHECKPOINT_MAGIC = b"GSYR"
+# Should be increased whenever the internal state of a result object changes in a way that is
+# not compatible with checkpoints of the previous version.
+RESULTS_CHECKPOINT_VERSION = 1
+_HEADER = Struct(">4sH")
+# The only globals that checkpoints may reference, keyed by module and name: the containers and
+# value types that the state of the results is made of. Functions are never allowed.
+_ALLOWED_CLASSES = {
+    (allowed_class.__module__, allowed_class.__qualname__): allowed_class
+    for allowed_class in (
+        builtins.bool, builtins.bytearray, builtins.bytes, builtins.complex, builtins.dict,
+        builtins.float, builtins.frozenset, builtins.int, builtins.list, builtins.set,
+        builtins.str, builtins.tuple,
+        collections.OrderedDict, collections.defaultdict,
+        datetime.date, datetime.datetime, datetime.time, datetime.timedelta, datetime.timezone,
+        array,
+        Date, DateTime, Duration, Time, FixedTimezone, Timezone,
+        KPIState, SavingsKPI,
+        ColumnarHistory, _AreaColumns, MarketSummaryHistory, ThroughputHistory,
+    )
+}
+
+
+class _ResultsCheckpointPickler(pickle.Pickler):
+    """Pickler that stores time zones and arrays through their constructors, instead of through
+    their (forbidden) reconstruction functions."""
+
+    def reducer_override(self, obj):
+        if isinstance(obj, Timezone):
+            return Timezone, (obj.name,)
+        if isinstance(obj, array):
+            return array, (obj.typecode, obj.tobytes())
+        return NotImplemented
+
+
+class _ResultsCheckpointUnpickler(pickle.Unpickler):
+    """Unpickler that only creates the objects that the state of the results consists of."""
+
+    def find_class(self, module: str, name: str):
+        if (module, name) in _ALLOWED_CLASSES:
+            return _ALLOWED_CLASSES[(module, name)]
+        raise GSySerializationException(
+            f"Results checkpoint references the forbidden global {module}.{name}.")
+
+
+def encode_results_checkpoint(state: Dict) -> bytes:
+    """Convert the state of the results into a compressed binary checkpoint with version header."""
+    state_buffer = BytesIO()
+    _ResultsCheckpointPickler(state_buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(state)
+    return _HEADER.pack(RESULTS_CHECKPOINT_MAGIC, RESULTS_CHECKPOINT_VERSION) + compress(
+        state_buffer.getvalue())
+
+
+def decode_results_checkpoint(checkpoint: bytes) -> Dict:
+    """Return the state of the results from a checkpoint created by encode_results_checkpoint.
+
+    The checkpoint is a pickle, therefore it should only be read from trusted storage. In order
+    to limit the damage of a tampered checkpoint, only the explicitly allowed classes that the
+    state of the results is made of can be created, and no functions can be called.
+    """
+    if len(checkpoint) < _HEADER.size:
+        raise GSySerializationException("Results checkpoint is truncated.")
+    magic, version = _HEADER.unpack_from(checkpoint)
+    if magic != RESULTS_CHECKPOINT_MAGIC:
+        raise GSySerializationException("Data is not a results checkpoint.")
+    if version != RESULTS_CHECKPOINT_VERSION:
+        raise GSySerializationException(
+            f"Results checkpoint version {version} is not supported "
+            f"(supported version: {RESULTS_CHECKPOINT_VERSION}).")
+    return _ResultsCheckpointUnpickler(
+        BytesIO(decompress(checkpoint[_HEADER.size:]))).load()
@@ -0,0 +1,146 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of Grid Singularity Exchange.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from copy import deepcopy
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from gsy_framework.exceptions import GSySerializationException
+
+KEYFRAME_MESSAGE_TYPE = "keyframe"
+DELTA_MESSAGE_TYPE = "delta"
+# Number of published messages after which a full keyframe is sent instead of a delta
+DEFAULT_KEYFRAME_INTERVAL = 96
+
+
+def _get_value_at_path(results: Dict, path: Sequence[str]) -> Tuple[bool, Any]:
+    value = results
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return False, None
+        value = value[key]
+    return True, value
+
+
+def _collect_changed_results(
+        results: Dict, changed_paths: Iterable[Sequence[str]]
+) -> Tuple[List[List], List[List[str]]]:
+    """Return the [path, value] pairs of the changed paths that exist in results, and the
+    paths that were removed from results.
+
+    Paths inside of the sub-tree of another changed path are skipped, because the sub-tree is
+    included as a whole. The values are not copied, they are shared with results.
+    """
+    changed = []
+    removed = []
+    included_paths = set()
+    for path in sorted({tuple(path) for path in changed_paths}, key=len):
+        if not path:
+            raise ValueError("The path of changed results should not be empty.")
+        if any(path[:length] in included_paths for length in range(1, len(path))):
+            continue
+        exists, value = _get_value_at_path(results, path)
+        if exists:
+            included_paths.add(path)
+            changed.append([list(path), value])
+        else:
+            removed.append(list(path))
+    return changed, removed
+
+
+def apply_results_delta(state: Dict, message: Dict) -> Dict:
+    """Apply a delta message of ResultsDeltaEncoder to the full results state, in place.
+
+    Keyframe messages replace the state. Returns the updated state.
+    """
+    if message["type"] == KEYFRAME_MESSAGE_TYPE:
+        state.clear()
+        state.update(deepcopy(message["results"]))
+        return state
+    for path in message["removed"]:
+        parent = state
+        for key in path[:-1]:
+            parent = parent.get(key, {})
+        parent.pop(path[-1], None)
+    for path, value in message["changed"]:
+        parent = state
+        for key in path[:-1]:
+            parent = parent.setdefault(key, {})
+        parent[path[-1]] = deepcopy(value)
+    return state
+
+
+class ResultsDeltaEncoder:
+    """Convert the changes of consecutive results into delta messages, with periodic keyframes.
+
+    The producer of the results reports the paths (sequences of keys) of the results that
+    changed since the previous message, e.g. from the changes that the result objects tracked
+    during their updates. Only the values at these paths are included in the message, therefore
+    the unchanged results of previous market slots are neither compared nor serialized again.
+    Every keyframe_interval messages (and for the first message) the full results are sent as a
+    keyframe, so that consumers can start or resynchronise.
+    Messages share their values with the results, therefore they should be serialized before
+    the results are updated again.
+    """
+
+    def __init__(self, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self._sequence = -1
+        self._last_keyframe_sequence: Optional[int] = None
+
+    def request_keyframe(self):
+        """Send the full results with the next message (e.g. after a consumer restarted)."""
+        self._last_keyframe_sequence = None
+
+    def encode(self, results: Dict, changed_paths: Iterable[Sequence[str]]) -> Dict:
+        """Return the message with the changes of results at changed_paths.
+
+        Paths that do not exist in results are sent as removed.
+        """
+        self._sequence += 1
+        if (self._last_keyframe_sequence is None or
+                self._sequence - self._last_keyframe_sequence >= self.keyframe_interval):
+            self._last_keyframe_sequence = self._sequence
+            return {"type": KEYFRAME_MESSAGE_TYPE, "sequence": self._sequence,
+                    "results": results}
+        changed, removed = _collect_changed_results(results, changed_paths)
+        return {"type": DELTA_MESSAGE_TYPE, "sequence": self._sequence,
+                "changed": changed, "removed": removed}
+
+
+class ResultsDeltaDecoder:
+    """Rebuild the full results on the consumer side from the messages of ResultsDeltaEncoder."""
+
+    def __init__(self):
+        self.results: Dict = {}
+        self._sequence: Optional[int] = None
+
+    def decode(self, message: Dict) -> Dict:
+        """Apply the message and return the full results.
+
+        Raises GSySerializationException if a delta message does not directly follow the
+        previously decoded message, in which case a keyframe is needed to resynchronise.
+        """
+        if message["type"] == DELTA_MESSAGE_TYPE:
+            if self._sequence is None or message["sequence"] != self._sequence + 1:
+                raise GSySerializationException(
+                    f"Results delta {message['sequence']} does not follow the last decoded "
+                    f"results {self._sequence}, a keyframe is required.")
+        elif message["type"] != KEYFRAME_MESSAGE_TYPE:
+            raise GSySerializationException(f"Unknown results message type {message['type']}.")
+        apply_results_delta(self.results, message)
+        self._sequence = message["sequence"]
+        return self.results
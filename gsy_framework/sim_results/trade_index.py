@@ -0,0 +1,82 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of Grid Singularity Exchange.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Dict, List, Tuple
+
+from gsy_framework.utils import area_name_from_area_or_ma_name
+
+
+class MarketTrades:
+    """Trades of one market, grouped by the names of their sellers and buyers."""
+
+    def __init__(self, trades: List[Dict]):
+        self.trades = trades
+        self.sold_by: Dict[str, List[Dict]] = {}
+        self.bought_by: Dict[str, List[Dict]] = {}
+        # Trades together with the seller and buyer area names, stripped of the market agent
+        # prefix. Order: (seller name, buyer name, trade)
+        self.trades_with_area_names: List[Tuple[str, str, Dict]] = []
+        for trade in trades:
+            seller_name = trade["seller"]["name"]
+            buyer_name = trade["buyer"]["name"]
+            self.sold_by.setdefault(seller_name, []).append(trade)
+            self.bought_by.setdefault(buyer_name, []).append(trade)
+            self.trades_with_area_names.append(
+                (
+                    area_name_from_area_or_ma_name(seller_name),
+                    area_name_from_area_or_ma_name(buyer_name),
+                    trade,
+                )
+            )
+
+
+class TradeIndex:
+    """Index of the trades of all markets of one market slot.
+
+    Built once per market slot and shared by all result objects, so that the trades of a trader
+    can be retrieved without scanning all trades of the market. Markets are indexed lazily, on
+    their first query.
+    """
+
+    def __init__(self, core_stats: Dict):
+        self.core_stats = core_stats
+        self._markets: Dict[str, MarketTrades] = {}
+        self._after_meter_markets: Dict[str, MarketTrades] = {}
+
+    def market(self, market_uuid: str) -> MarketTrades:
+        """Return the indexed trades of the market with the given uuid."""
+        if market_uuid not in self._markets:
+            self._markets[market_uuid] = MarketTrades(
+                self.core_stats.get(market_uuid, {}).get("trades", [])
+            )
+        return self._markets[market_uuid]
+
+    def after_meter_market(self, market_uuid: str) -> MarketTrades:
+        """Return the indexed after meter trades of the market with the given uuid."""
+        if market_uuid not in self._after_meter_markets:
+            self._after_meter_markets[market_uuid] = MarketTrades(
+                self.core_stats.get(market_uuid, {}).get("after_meter_data", {}).get("trades", [])
+            )
+        return self._after_meter_markets[market_uuid]
+
+    def sold_by(self, market_uuid: str, seller_name: str) -> List[Dict]:
+        """Return the trades of the market that were sold by the trader with the given name."""
+        return self.market(market_uuid).sold_by.get(seller_name, [])
+
+    def bought_by(self, market_uuid: str, buyer_name: str) -> List[Dict]:
+        """Return the trades of the market that were bought by the trader with the given name."""
+        return self.market(market_uuid).bought_by.get(buyer_name, [])
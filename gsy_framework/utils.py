@@ -22,13 +22,17 @@ import logging
 import pathlib
 import sys
 import time
+from bisect import bisect_left
 from collections import OrderedDict
+from collections.abc import Sequence
 from copy import copy
+from datetime import timedelta
 from functools import lru_cache, wraps
+from itertools import islice
 from pkgutil import walk_packages
 from statistics import mean
 from threading import Timer
-from typing import Callable, Dict, List, Union, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union, Optional
 from uuid import UUID
 
 from pendulum import DateTime, datetime, duration, from_format, instance
@@ -49,6 +53,7 @@ from gsy_framework.constants_limits import (
     GlobalConfig,
     ConstSettings,
 )
+from gsy_framework.forward_markets.utils import MarketSlotRange
 
 
 def execute_function_util(function: callable, function_name: str):
@@ -80,11 +85,61 @@ def convert_datetime_to_str_in_list(in_list: List, ui_format: bool = False):
     return out_list
 
 
+class SimulationSlotRange(Sequence):
+    """Market slots of the simulation, calculated in closed form instead of one by one.
+
+    The candidate slots are start_timestamp + i * slot_length for the slots that fit in
+    sim_duration. Since they are sorted, the candidates that are in the simulation duration (see
+    is_time_slot_in_simulation_duration) are a contiguous part of them, whose bounds are found by
+    bisection. Length, indexing and membership checks do not iterate over the slots.
+    """
+
+    def __init__(self, sim_duration: duration, start_timestamp: DateTime, slot_length: duration,
+                 ignore_duration_check: bool = False):
+        slot_count = (sim_duration + slot_length) // slot_length - 1
+        self._candidates = MarketSlotRange(
+            start_timestamp, start_timestamp + slot_length * (slot_count - 1), slot_length)
+        if ignore_duration_check or GlobalConfig.is_canary_network():
+            self._first_index, self._end_index = 0, len(self._candidates)
+        else:
+            self._first_index = bisect_left(self._candidates, GlobalConfig.start_date)
+            self._end_index = max(self._first_index, bisect_left(
+                self._candidates, GlobalConfig.start_date + GlobalConfig.sim_duration))
+
+    def __len__(self) -> int:
+        return self._end_index - self._first_index
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[DateTime, List[DateTime]]:
+        if isinstance(index, slice):
+            return [self._candidates[self._first_index + i]
+                    for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Simulation slot index out of range.")
+        return self._candidates[self._first_index + index]
+
+    def __iter__(self) -> Iterator[DateTime]:
+        for index in range(self._first_index, self._end_index):
+            yield self._candidates[index]
+
+    def __contains__(self, time_slot) -> bool:
+        if not len(self) or not self[0] <= time_slot <= self[-1]:
+            return False
+        return time_slot in self._candidates
+
+    def __repr__(self) -> str:
+        return (f"SimulationSlotRange(start_time={self[0] if len(self) else None}, "
+                f"end_time={self[-1] if len(self) else None}, "
+                f"slot_length={self._candidates.slot_length})")
+
+
 def generate_market_slot_list_from_config(
     sim_duration: duration,
     start_timestamp: DateTime,
     slot_length: duration,
     ignore_duration_check=False,
+    as_range=False,
 ):
     """
     Returns a list of all slot times in Datetime format.
@@ -96,23 +151,21 @@ def generate_market_slot_list_from_config(
         ignore_duration_check: Ignores the check if each timestamp is in the simulation duration.
                                Useful for calling the method from context where no config has been
                                set
+        as_range: Return a SimulationSlotRange that calculates the slots on access, instead of
+                  a list
 
     Returns: List with market slot datetimes
     """
-    return [
-        start_timestamp + (slot_length * i)
-        for i in range((sim_duration + slot_length) // slot_length - 1)
-        if (
-            ignore_duration_check
-            or is_time_slot_in_simulation_duration(start_timestamp + (slot_length * i))
-        )
-    ]
+    slot_range = SimulationSlotRange(
+        sim_duration, start_timestamp, slot_length, ignore_duration_check)
+    return slot_range if as_range else list(slot_range)
 
 
-def generate_market_slot_list(start_timestamp=None, profile_length_days=None):
+def generate_market_slot_list(start_timestamp=None, profile_length_days=None, as_range=False):
     """
     Creates a list with datetimes that correspond to market slots of the simulation.
     No input arguments, required input is only handled by a preconfigured GlobalConfig
+    If as_range is True, a SimulationSlotRange is returned instead of a list.
     @return: List with market slot datetimes
     """
     if not profile_length_days:
@@ -128,22 +181,93 @@ def generate_market_slot_list(start_timestamp=None, profile_length_days=None):
         sim_duration=time_span,
         start_timestamp=start_timestamp if start_timestamp else GlobalConfig.start_date,
         slot_length=GlobalConfig.slot_length,
+        as_range=as_range,
     )
 
     if not getattr(GlobalConfig, "market_slot_list", []):
-        GlobalConfig.market_slot_list = market_slot_list
+        GlobalConfig.market_slot_list = list(market_slot_list)
     return market_slot_list
 
 
-def _find_first_full_day_in_profile(indict: Dict) -> Optional[DateTime]:
-    for time_slot in indict.keys():
+def _find_first_full_day_in_profile(indict: Iterable[DateTime]) -> Optional[DateTime]:
+    for time_slot in indict:
         if time_slot.hour == 0 and time_slot.minute == 0:
             return time_slot
     return None
 
 
+def _get_same_weekday_and_time_in_first_week(
+    first_full_day: DateTime, time_slot: DateTime
+) -> DateTime:
+    add_days = time_slot.weekday() - first_full_day.weekday()
+    if add_days < 0:
+        add_days += 7
+    return datetime(
+        year=first_full_day.year,
+        month=first_full_day.month,
+        day=first_full_day.day,
+        hour=time_slot.hour,
+        minute=time_slot.minute,
+        tz=TIME_ZONE,
+    ).add(days=add_days)
+
+
+class ProfileWeekdayTimeIndex:
+    """Index of the time slots of a profile by weekday and time of the day.
+
+    Maps (weekday, hour, minute) to the time slot of the profile with the same weekday and time
+    in the week that starts with the first full day of the profile, which is the time slot that
+    get_from_profile_same_weekday_and_time falls back to. Built once per profile, so that the
+    fallback lookups do not scan the profile. Time slots that are added to the profile later
+    are indexed by calling update().
+    """
+
+    def __init__(self, profile: Dict):
+        self.profile = profile
+        self.first_full_day: Optional[DateTime] = None
+        self._week_start: Optional[DateTime] = None
+        self._time_slots: Dict[Tuple[int, int, int], DateTime] = {}
+        self._indexed_count = 0
+        self.update()
+
+    def update(self):
+        """Index the time slots that were added to the profile since the last update."""
+        new_time_slots = list(islice(self.profile.keys(), self._indexed_count, None))
+        self._indexed_count = len(self.profile)
+        if self.first_full_day is None:
+            self.first_full_day = _find_first_full_day_in_profile(new_time_slots)
+            if self.first_full_day is None:
+                return
+            self._week_start = datetime(
+                year=self.first_full_day.year,
+                month=self.first_full_day.month,
+                day=self.first_full_day.day,
+                tz=TIME_ZONE,
+            )
+            # The week of the profile is known only now, therefore all time slots are indexed
+            new_time_slots = list(self.profile.keys())
+        week_end = self._week_start + timedelta(days=7)
+        for time_slot in new_time_slots:
+            if not isinstance(time_slot, DateTime) or time_slot.tzinfo is None:
+                continue
+            if not self._week_start <= time_slot < week_end:
+                continue
+            time_slot_in_week = time_slot.in_timezone(TIME_ZONE)
+            if time_slot_in_week.second or time_slot_in_week.microsecond:
+                continue
+            self._time_slots[(time_slot_in_week.weekday(), time_slot_in_week.hour,
+                              time_slot_in_week.minute)] = time_slot
+
+    def get_time_slot(self, time_slot: DateTime) -> Optional[DateTime]:
+        """Return the time slot of the profile with the same weekday and time as time_slot."""
+        return self._time_slots.get((time_slot.weekday(), time_slot.hour, time_slot.minute))
+
+
 def get_from_profile_same_weekday_and_time(
-    indict: Dict, time_slot: DateTime, ignore_not_found: bool = False
+    indict: Dict,
+    time_slot: DateTime,
+    ignore_not_found: bool = False,
+    profile_index: Optional[ProfileWeekdayTimeIndex] = None,
 ):
     """
     Based on a profile with datetimes that span in one week as keys and some values, finds the
@@ -158,33 +282,33 @@ def get_from_profile_same_weekday_and_time(
     @param time_slot: DateTime value that represents the requested time slot
     @param ignore_not_found: Boolean parameter that controls whether an error log will be reported
                              if the time_slot cannot be found in the original dict
+    @param profile_index: Optional ProfileWeekdayTimeIndex of indict, that replaces the scan of
+                          the profile for repeated lookups
     @return: Profile value for the requested time slot
     """
     if time_slot in indict:
         return indict[time_slot]
 
-    first_full_day = _find_first_full_day_in_profile(indict)
+    if profile_index is not None:
+        first_full_day = profile_index.first_full_day
+    else:
+        first_full_day = _find_first_full_day_in_profile(indict)
     if first_full_day is None:
         logging.error("Could not find the first full day in profile %s", indict)
         return None
-    add_days = time_slot.weekday() - first_full_day.weekday()
-    if add_days < 0:
-        add_days += 7
-    timestamp_key = datetime(
-        year=first_full_day.year,
-        month=first_full_day.month,
-        day=first_full_day.day,
-        hour=time_slot.hour,
-        minute=time_slot.minute,
-        tz=TIME_ZONE,
-    ).add(days=add_days)
 
-    if timestamp_key in indict:
+    if profile_index is not None:
+        timestamp_key = profile_index.get_time_slot(time_slot)
+    else:
+        timestamp_key = _get_same_weekday_and_time_in_first_week(first_full_day, time_slot)
+
+    if timestamp_key is not None and timestamp_key in indict:
         return indict[timestamp_key]
 
     if not ignore_not_found:
         logging.error(
-            "Weekday and time not found in dict for %s (looking for %s)", time_slot, timestamp_key
+            "Weekday and time not found in dict for %s (looking for %s)", time_slot,
+            _get_same_weekday_and_time_in_first_week(first_full_day, time_slot)
         )
 
     return None
@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+import pendulum
+import pytest
+
+from gsy_framework.forward_markets.utils import (
+    MarketSlotRange, _MarketSlotsCache, create_market_slots, get_market_slots)
+
+
+class TestCreateMarketSlots:
+    """Tests for the create_market_slots function."""
+
+    @staticmethod
+    def test_create_market_slots_includes_start_and_end_time():
+        market_slots = create_market_slots(
+            pendulum.datetime(2022, 1, 1), pendulum.datetime(2022, 1, 1, 1),
+            pendulum.duration(minutes=15))
+        assert market_slots == [pendulum.datetime(2022, 1, 1, 0, minute)
+                                for minute in (0, 15, 30, 45)] + [pendulum.datetime(2022, 1, 1, 1)]
+        assert all(isinstance(market_slot, pendulum.DateTime) for market_slot in market_slots)
+
+    @staticmethod
+    def test_create_market_slots_follows_the_calendar_for_months():
+        market_slots = create_market_slots(
+            pendulum.datetime(2020, 1, 31), pendulum.datetime(2020, 4, 30),
+            pendulum.duration(months=1))
+        assert market_slots == [pendulum.datetime(2020, 1, 31), pendulum.datetime(2020, 2, 29),
+                                pendulum.datetime(2020, 3, 31), pendulum.datetime(2020, 4, 30)]
+
+    @staticmethod
+    def test_create_market_slots_distinguishes_months_from_days():
+        start_time = pendulum.datetime(2020, 1, 1)
+        end_time = pendulum.datetime(2020, 3, 1)
+        assert create_market_slots(start_time, end_time, pendulum.duration(months=1)) == [
+            pendulum.datetime(2020, 1, 1), pendulum.datetime(2020, 2, 1),
+            pendulum.datetime(2020, 3, 1)]
+        assert create_market_slots(start_time, end_time, pendulum.duration(days=30)) == [
+            pendulum.datetime(2020, 1, 1), pendulum.datetime(2020, 1, 31),
+            pendulum.datetime(2020, 3, 1)]
+
+    @staticmethod
+    def test_create_market_slots_respects_daylight_saving_time():
+        start_time = pendulum.datetime(2021, 3, 28, tz="Europe/Berlin")
+        market_slots = create_market_slots(
+            start_time, start_time.add(hours=3), pendulum.duration(hours=1))
+        assert [market_slot.hour for market_slot in market_slots] == [0, 1, 3, 4]
+
+    @staticmethod
+    @pytest.mark.parametrize("slot_length, expected_slot_count", [
+        (pendulum.duration(days=1), 32), (pendulum.duration(weeks=1), 5)])
+    def test_create_market_slots_keeps_wall_clock_time_across_daylight_saving_time(
+            slot_length, expected_slot_count):
+        start_time = pendulum.datetime(2023, 3, 20, tz="Europe/Berlin")
+        end_time = pendulum.datetime(2023, 4, 20, tz="Europe/Berlin")
+        expected_slots = []
+        current = start_time
+        while current <= end_time:
+            expected_slots.append(current)
+            current = current + slot_length
+        market_slots = create_market_slots(start_time, end_time, slot_length)
+        assert market_slots == expected_slots
+        assert len(market_slots) == expected_slot_count
+        assert all(market_slot.hour == 0 for market_slot in market_slots)
+        assert list(create_market_slots(
+            start_time, end_time, slot_length, as_range=True)) == expected_slots
+
+    @staticmethod
+    def test_create_market_slots_accepts_plain_timedelta():
+        start_time = pendulum.datetime(2022, 1, 1)
+        assert create_market_slots(
+            start_time, start_time.add(hours=1), timedelta(minutes=30)) == [
+            start_time, start_time.add(minutes=30), start_time.add(hours=1)]
+
+    @staticmethod
+    def test_create_market_slots_returns_a_range_on_request():
+        start_time = pendulum.datetime(2022, 1, 1)
+        end_time = pendulum.datetime(2022, 12, 31, 23, 45)
+        market_slot_range = create_market_slots(
+            start_time, end_time, pendulum.duration(minutes=15), as_range=True)
+        assert isinstance(market_slot_range, MarketSlotRange)
+        assert len(market_slot_range) == 365 * 96
+        assert market_slot_range[0] == start_time
+        assert market_slot_range[-1] == end_time
+        assert market_slot_range[96:98] == [pendulum.datetime(2022, 1, 2),
+                                            pendulum.datetime(2022, 1, 2, 0, 15)]
+        assert pendulum.datetime(2022, 6, 1, 12, 30) in market_slot_range
+        assert pendulum.datetime(2022, 6, 1, 12, 31) not in market_slot_range
+        assert end_time.add(minutes=15) not in market_slot_range
+        with pytest.raises(IndexError):
+            market_slot_range[365 * 96]  # pylint: disable=pointless-statement
+
+    @staticmethod
+    def test_create_market_slots_returns_empty_list_if_end_is_before_start():
+        assert create_market_slots(
+            pendulum.datetime(2022, 1, 2), pendulum.datetime(2022, 1, 1),
+            pendulum.duration(hours=1)) == []
+
+    @staticmethod
+    def test_get_market_slots_returns_the_memoized_market_slots_without_copying():
+        start_time = pendulum.datetime(2022, 1, 1)
+        end_time = pendulum.datetime(2022, 1, 1, 23, 45)
+        market_slots = get_market_slots(start_time, end_time, pendulum.duration(minutes=15))
+        assert isinstance(market_slots, tuple)
+        assert get_market_slots(
+            start_time, end_time, pendulum.duration(minutes=15)) is market_slots
+        created_market_slots = create_market_slots(
+            start_time, end_time, pendulum.duration(minutes=15))
+        assert created_market_slots == list(market_slots)
+        created_market_slots.clear()
+        assert len(get_market_slots(start_time, end_time, pendulum.duration(minutes=15))) == 96
+
+
+class TestMarketSlotsCache:
+    """Tests for the _MarketSlotsCache class."""
+
+    @staticmethod
+    def test_cache_is_bounded_by_the_total_number_of_market_slots():
+        cache = _MarketSlotsCache(max_slots=10)
+        cache.add("a", tuple(range(4)))
+        cache.add("b", tuple(range(4)))
+        assert cache.get("a") is not None
+        cache.add("c", tuple(range(4)))
+        # "b" is the least recently used entry, therefore it is evicted
+        assert cache.get("b") is None
+        assert cache.get("a") == tuple(range(4))
+        assert cache.get("c") == tuple(range(4))
+        assert cache.slot_count == 8
+
+    @staticmethod
+    def test_cache_does_not_memoize_market_slots_that_exceed_the_bound():
+        cache = _MarketSlotsCache(max_slots=10)
+        cache.add("a", tuple(range(4)))
+        cache.add("b", tuple(range(11)))
+        assert cache.get("b") is None
+        assert cache.get("a") == tuple(range(4))
+        assert cache.slot_count == 4
+        cache.clear()
+        assert cache.get("a") is None
+        assert cache.slot_count == 0
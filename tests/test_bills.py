@@ -158,3 +158,33 @@ class TestBills(unittest.TestCase):
         assert results["1234"]["house2"]["sold"] == 0.9876541
         assert results["2345"]["pv"]["sold"] == 0.987
         assert results["6789"]["earned"] == 12
+
+    def test_update_does_not_modify_the_results_of_previous_market_slots(self):
+        grid_uuid = str(uuid4())
+        house_uuid = str(uuid4())
+        pv_uuid = str(uuid4())
+        load_uuid = str(uuid4())
+        area_dict = {"name": "grid", "uuid": grid_uuid, "parent_uuid": "", "type": "Area",
+                     "children": [
+                         {"name": "house", "uuid": house_uuid, "parent_uuid": grid_uuid,
+                          "type": "Area", "children": [
+                              {"name": "pv", "uuid": pv_uuid, "parent_uuid": house_uuid,
+                               "type": "PV", "children": []},
+                              {"name": "load", "uuid": load_uuid, "parent_uuid": house_uuid,
+                               "type": "Load", "children": []}]}]}
+        core_stats = {
+            grid_uuid: {"trades": []},
+            house_uuid: {"trades": [{
+                "seller": {"name": "pv"}, "buyer": {"name": "load"},
+                "energy": 1.0, "price": 30.0, "fee_price": 0.0}]},
+            pv_uuid: {}, load_uuid: {}}
+        self.bills.update(area_dict, core_stats, "2023-01-01T00:00")
+        first_slot_results = self.bills.ui_formatted_results
+        assert first_slot_results[house_uuid]["load"]["bought"] == 1.0
+
+        self.bills.update(area_dict, core_stats, "2023-01-01T00:15")
+        assert first_slot_results[house_uuid]["load"]["bought"] == 1.0
+        assert self.bills.ui_formatted_results[house_uuid]["load"]["bought"] == 2.0
+        # Bills that were not modified in the market slot are shared between market slots
+        assert (self.bills.ui_formatted_results[grid_uuid]["house"] is
+                first_slot_results[grid_uuid]["house"])
@@ -1,6 +1,10 @@
 import unittest
+from copy import deepcopy
 from math import isclose
-from gsy_framework.sim_results.market_summary_info import MarketSummaryInfo
+from gsy_framework.sim_results.aggregate_results import (
+    densify_global_results, merge_last_market_results_to_global)
+from gsy_framework.sim_results.market_summary_info import (
+    MarketSummaryHistory, MarketSummaryInfo)
 from gsy_framework.unit_test_utils import assert_dicts_identical
 
 
@@ -38,6 +42,62 @@ class TestMarketSummaryInfo(unittest.TestCase):
         result = self._market_summary_info.merge_results_to_global(market_results, global_results)
         assert_dicts_identical(result, {"house1_uuid": [existing_result, area_result]})
 
+    def test_merge_to_market_summary_history_matches_dict_merge(self):
+        market_results = [
+            {"house1_uuid": {"average_energy_rate": 0.3, "external_traded_volume": 123,
+                             "traded_volume": 456, "timestamp": "2021-01-02T12:45"},
+             "house2_uuid": {}},
+            {"house1_uuid": {"average_energy_rate": None, "external_traded_volume": 0.0,
+                             "traded_volume": 0.0, "timestamp": "2021-01-02T13:00"},
+             "house2_uuid": {"average_energy_rate": 0.2, "external_traded_volume": 1.0,
+                             "traded_volume": 2.0, "timestamp": "2021-01-02T13:00"}},
+        ]
+        dict_results = {}
+        history = MarketSummaryHistory()
+        for results in market_results:
+            dict_results = self._market_summary_info.merge_results_to_global(
+                results, dict_results)
+            history = self._market_summary_info.merge_results_to_global(results, history)
+        assert_dicts_identical(history.to_dict(), dict_results)
+
+    def test_repeated_timestamps_are_appended_to_market_summary_history(self):
+        market_results = [
+            {"house1_uuid": {"average_energy_rate": 0.3, "external_traded_volume": 1.0,
+                             "traded_volume": 2.0, "timestamp": "2021-01-02T12:45"}},
+            {"house1_uuid": {"average_energy_rate": 0.4, "external_traded_volume": 3.0,
+                             "traded_volume": 4.0, "timestamp": "2021-01-02T12:45"}},
+            {"house1_uuid": {"average_energy_rate": 0.5, "external_traded_volume": 5.0,
+                             "traded_volume": 6.0, "timestamp": "2021-01-02T13:00"}},
+        ]
+        dict_results = {}
+        history = MarketSummaryHistory()
+        for results in market_results:
+            dict_results = self._market_summary_info.merge_results_to_global(
+                deepcopy(results), dict_results)
+            history = self._market_summary_info.merge_results_to_global(results, history)
+        assert len(history.area_results("house1_uuid")) == 3
+        assert_dicts_identical(history.to_dict(), dict_results)
+
+    def test_sparse_global_results_are_stored_in_market_summary_history(self):
+        market_results = [
+            {"house1_uuid": {"average_energy_rate": None, "external_traded_volume": 0.0,
+                             "traded_volume": 0.0, "timestamp": "2021-01-02T12:45"}},
+            {"house1_uuid": {"average_energy_rate": 0.2, "external_traded_volume": 1.0,
+                             "traded_volume": 2.0, "timestamp": "2021-01-02T13:00"}},
+        ]
+        dense_results = {"market_summary": {}}
+        sparse_results = {"market_summary": {}}
+        for results in market_results:
+            dense_results = merge_last_market_results_to_global(
+                {"market_summary": deepcopy(results)}, dense_results, [],
+                requested_fields=["market_summary"])
+            sparse_results = merge_last_market_results_to_global(
+                {"market_summary": results}, sparse_results,
+                requested_fields=["market_summary"], sparse=True)
+        assert isinstance(sparse_results["market_summary"], MarketSummaryHistory)
+        assert_dicts_identical(densify_global_results(
+            sparse_results, [], requested_fields=["market_summary"]), dense_results)
+
     def test_update(self):
         area_result_dict = {
             "name": "house1", "uuid": "house1_uuid", "children": [
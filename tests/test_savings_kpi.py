@@ -2,7 +2,7 @@ from uuid import uuid4
 
 import pytest
 
-from gsy_framework.sim_results.kpi import KPI, SavingsKPI
+from gsy_framework.sim_results.kpi import KPI, KPIState, SavingsKPI
 from gsy_framework.constants_limits import GlobalConfig
 
 
@@ -72,6 +72,29 @@ def test_populate_consumer_producer_sets_are_correct(savings_kpi):
     assert savings_kpi.consumer_ess_set == {load_uuid, ess_uuid}
 
 
+def test_kpi_state_device_registries_are_updated_only_on_topology_change():
+    # pylint: disable=protected-access
+    endpoint_buffer = FakeEndpointBuffer()
+    house1_dict = endpoint_buffer.area_dict["children"][0]
+    kpi_state = KPIState()
+    kpi_state.get_device_lists(house1_dict, topology_version="version1")
+    assert kpi_state.producer_list == [endpoint_buffer.pv_uuid]
+    assert kpi_state.consumer_list == [endpoint_buffer.load_uuid]
+    assert kpi_state.areas_to_trace_list == [endpoint_buffer.house1_uuid]
+
+    storage_uuid = str(uuid4())
+    house1_dict = {**house1_dict, "children": [
+        *house1_dict["children"],
+        {"name": "storage", "type": "StorageStrategy", "uuid": storage_uuid,
+         "parent_uuid": endpoint_buffer.house1_uuid, "children": []}]}
+    kpi_state.get_device_lists(house1_dict, topology_version="version1")
+    assert not kpi_state.ess_set
+
+    kpi_state.get_device_lists(house1_dict, topology_version="version2")
+    assert kpi_state.ess_list == [storage_uuid]
+    assert kpi_state.producer_list == [endpoint_buffer.pv_uuid]
+
+
 def test_root_to_target_area_grid_fee_accumulation(kpi):
     endpoint_buffer = FakeEndpointBuffer()
 
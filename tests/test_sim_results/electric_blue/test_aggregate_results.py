@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 from pendulum import UTC, DateTime
 
@@ -434,6 +436,30 @@ class TestForwardDeviceStats:
         ]
         assert new_global_device_stats.trades == [trade2, trade4]
 
+    @staticmethod
+    def test_merge_accumulates_stats_in_place_without_modifying_other(device_stats):
+        def trade(energy):
+            return {"buyer": {"name": "UUID_1", "uuid": "UUID_1"},
+                    "seller": {"name": "UUID_2", "uuid": "UUID_2"},
+                    "time_slot": "2020-01-01T00:00:00", "energy": energy, "price": 30,
+                    "energy_rate": 30}
+
+        device_stats.add_trade(trade(1))
+        newer_device_stats = ForwardDeviceStats(
+            time_slot=device_stats.time_slot, device_uuid="UUID_1",
+            current_time_slot=DateTime(2020, 1, 1, 0, 15, tzinfo=UTC))
+        newer_device_stats.add_trade(trade(2))
+        newer_device_stats.merge(device_stats)
+        newer_device_stats.add_trade(trade(3))
+        device_stats.add_trade(trade(4))
+
+        assert newer_device_stats.total_buy_trade_count == 3
+        assert newer_device_stats.total_energy_bought == 6
+        assert newer_device_stats.current_time_slot == DateTime(2020, 1, 1, 0, 15, tzinfo=UTC)
+        assert newer_device_stats.trades == [trade(2), trade(1), trade(3)]
+        assert device_stats.trades == [trade(1), trade(4)]
+        assert len(newer_device_stats.trades) == 3
+
     @staticmethod
     def test_invalid_time_slot_raises_error(device_stats):
         trade = {
@@ -456,17 +482,17 @@ class TestForwardDeviceStats:
             "time_slot": "2020-01-02T00:00:00",
         }
         try:
-            device_stats.add_trade(trade)
+            device_stats.add_trade(trade, validate_time_slot=True)
             pytest.fail("Invalid time_slot got accepted.")
         except AssertionError:
             pass
         try:
-            device_stats.add_bid(bid)
+            device_stats.add_bid(bid, validate_time_slot=True)
             pytest.fail("Invalid time_slot got accepted.")
         except AssertionError:
             pass
         try:
-            device_stats.add_offer(offer)
+            device_stats.add_offer(offer, validate_time_slot=True)
             pytest.fail("Invalid time_slot got accepted.")
         except AssertionError:
             pass
@@ -475,6 +501,21 @@ class TestForwardDeviceStats:
         assert device_stats.open_offers == []
         assert device_stats.trades == []
 
+    @staticmethod
+    @patch("gsy_framework.sim_results.electric_blue.aggregate_results.str_to_pendulum_datetime")
+    def test_time_slot_of_orders_is_not_parsed_without_validation(
+            str_to_datetime_mock, device_stats):
+        device_stats.add_trade({
+            "buyer": {"name": "UUID_1", "uuid": "UUID_1"},
+            "seller": {"name": "UUID_2", "uuid": "UUID_2"},
+            "time_slot": "2020-01-01T00:00:00", "energy": 1, "price": 40, "energy_rate": 40})
+        device_stats.add_bid({
+            "buyer": {"name": "UUID_1", "uuid": "UUID_1"},
+            "price": 100, "energy": 2, "time_slot": "2020-01-01T00:00:00"})
+        str_to_datetime_mock.assert_not_called()
+        assert device_stats.total_buy_trade_count == 1
+        assert len(device_stats.open_bids) == 1
+
 
 class TestForwardResultsHandler:
     @staticmethod
@@ -602,3 +643,15 @@ class TestForwardResultsHandler:
             },
         }
         assert result == expected_result
+
+    @staticmethod
+    def test_handle_forward_results_validates_time_slots_on_request():
+        market_stats = {"2020-02-01T00:00": {"bids": [], "offers": [], "trades": [{
+            "buyer": {"name": "UUID_1", "uuid": "UUID_1"},
+            "seller": {"name": "UUID_2", "uuid": "UUID_2"},
+            "time_slot": "2020-03-01T00:00", "energy": 1, "price": 40, "energy_rate": 40}]}}
+        current_time_slot = DateTime(2020, 1, 1, 0, 0, tzinfo=UTC)
+        result = handle_forward_results(current_time_slot, market_stats)
+        assert set(result[DateTime(2020, 2, 1, 0, 0, tzinfo=UTC)]) == {"UUID_1", "UUID_2"}
+        with pytest.raises(AssertionError):
+            handle_forward_results(current_time_slot, market_stats, validate_time_slots=True)
@@ -65,19 +65,20 @@ class TestForwardResultsHandler:
         results_handler.orders = orders
         results_handler.current_asset_stats = current_asset_stats
         results_handler.asset_time_series = time_series
-        expected_results = {"orders": results_handler.orders,
-                            "current_asset_stats": results_handler.current_asset_stats,
-                            "asset_time_series": results_handler.asset_time_series,
-                            "cumulative_net_energy_flow": {},
-                            "cumulative_market_fees": 0.,
-                            "asset_volume_time_series": results_handler.asset_volume_time_series}
+        expected_results = {
+            "orders": results_handler.orders,
+            "current_asset_stats": results_handler.current_asset_stats,
+            "asset_time_series": time_series,
+            "cumulative_net_energy_flow": {},
+            "cumulative_market_fees": 0.,
+            "asset_volume_time_series": results_handler.asset_volume_time_series}
         assert results_handler.all_db_results == expected_results
 
     @staticmethod
     def test_update(results_handler, simulation_raw_data):
         with patch.object(ForwardDeviceStats, "to_dict",
                           return_value="mocked-ForwardDeviceStats_dict"), \
-            patch.object(ForwardDeviceTimeSeries, "generate",
+            patch.object(ForwardDeviceTimeSeries, "generate_raw",
                          return_value={}):
             assert results_handler.orders == {}
             assert results_handler.current_asset_stats == {}
@@ -182,3 +183,85 @@ class TestForwardResultsHandler:
                 {"uuid": "UUID_2", "capacity_kW": 2}]
         }, next(simulation_raw_data), "2020-01-01T01:00")
         assert results_handler.previous_asset_stats == previous_asset_stats
+
+    @staticmethod
+    def test_update_fetches_the_volume_time_series_in_one_batch(simulation_raw_data):
+        area_dict = {"children": [
+            {"uuid": "UUID_1", "capacity_kW": 1},
+            {"uuid": "UUID_2", "capacity_kW": 2}]}
+        raw_data = list(simulation_raw_data)
+        # Without the batch callback, the time series are fetched one by one when needed
+        get_time_series_db = MagicMock(return_value=None)
+        results_handler = ForwardResultsHandler(
+            get_asset_volume_time_series_db=get_time_series_db)
+        results_handler.update(area_dict, raw_data[0], "2020-01-01T00:00")
+        fetched_time_series = [
+            (call.kwargs["asset_uuid"], call.kwargs["year"], call.kwargs["resolution"])
+            for call in get_time_series_db.call_args_list]
+
+        get_time_series_db = MagicMock(return_value=None)
+        get_time_series_db_batch = MagicMock(return_value={})
+        results_handler = ForwardResultsHandler(
+            get_asset_volume_time_series_db=get_time_series_db,
+            get_asset_volume_time_series_db_batch=get_time_series_db_batch)
+        results_handler.update(area_dict, raw_data[0], "2020-01-01T00:00")
+
+        get_time_series_db_batch.assert_called_once()
+        batch_time_series = get_time_series_db_batch.call_args.args[0]
+        assert len(batch_time_series) == len(set(batch_time_series))
+        assert set(batch_time_series) == set(fetched_time_series)
+        get_time_series_db.assert_not_called()
+
+        # Time series that are buffered already are not fetched again
+        results_handler.update(area_dict, raw_data[1], "2020-01-01T01:00")
+        get_time_series_db_batch.assert_called_once()
+
+    @staticmethod
+    def test_evicted_volume_time_series_stay_in_the_results(simulation_raw_data):
+        get_time_series_db_batch = MagicMock(return_value={})
+        results_handler = ForwardResultsHandler(
+            get_asset_volume_time_series_db=lambda *args, **kwargs: None,
+            get_asset_volume_time_series_db_batch=get_time_series_db_batch,
+            time_series_cache_size=0)
+        area_dict = {"children": [
+            {"uuid": "UUID_1", "capacity_kW": 1},
+            {"uuid": "UUID_2", "capacity_kW": 2}]}
+        results_handler.update(area_dict, next(simulation_raw_data), "2020-01-01T00:00")
+        time_series = results_handler.all_db_results["asset_volume_time_series"]["UUID_1"][
+            AggregationResolution.RES_1_HOUR]
+        assert 2020 in time_series.asset_time_series_buffer
+
+        results_handler.update(area_dict, {"uuid_1234": {"forward_market_stats": {
+            4: {"2022-01-03T01:00:00": {"bids": [], "offers": [], "trades": [{
+                "seller": {"name": "UUID_2", "uuid": "UUID_2"},
+                "buyer": {"name": "UUID_1", "uuid": "UUID_1"},
+                "energy_rate": 1, "time_slot": "2022-01-03T01:00:00", "energy": 1,
+                "price": 30}]}}}}}, "2022-01-03T00:00")
+        assert get_time_series_db_batch.call_count == 2
+        assert {2020, 2022} <= set(time_series.asset_time_series_buffer)
+
+    @staticmethod
+    def test_asset_time_series_are_generated_lazily_per_resolution(simulation_raw_data):
+        results_handler = ForwardResultsHandler(
+            get_asset_volume_time_series_db=lambda *args, **kwargs: None)
+        area_dict = {"children": [
+            {"uuid": "UUID_1", "capacity_kW": 1},
+            {"uuid": "UUID_2", "capacity_kW": 2}]}
+        time_slot = DateTime(2020, 1, 1, 1, 0, tzinfo=UTC)
+        with patch.object(ForwardDeviceTimeSeries, "generate_raw", autospec=True,
+                          side_effect=ForwardDeviceTimeSeries.generate_raw) as generate:
+            results_handler.update(area_dict, next(simulation_raw_data), "2020-01-01T00:00")
+            generate.assert_not_called()
+
+            hourly_time_series = results_handler.get_asset_time_series(
+                AggregationResolution.RES_1_HOUR)
+            # The hourly time series are aggregated from the 15 minutes time series
+            assert [call.args[1] for call in generate.call_args_list] == [
+                AggregationResolution.RES_15_MINUTES.duration()] * 2
+            all_time_series = results_handler.all_db_results["asset_time_series"]
+            # The time series are generated only once per market slot
+            assert results_handler.asset_time_series is all_time_series
+            assert generate.call_count == 2
+
+        assert set(hourly_time_series[4][time_slot]) == {"UUID_1", "UUID_2"}
+        assert all_time_series[4][AggregationResolution.RES_1_HOUR.value] == hourly_time_series[4]
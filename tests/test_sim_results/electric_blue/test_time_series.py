@@ -1,13 +1,15 @@
+import pendulum
 import pytest
 from pendulum import UTC, DateTime, duration
 
-from gsy_framework.enums import AvailableMarketTypes
+from gsy_framework.enums import AggregationResolution, AvailableMarketTypes
 from gsy_framework.forward_markets.forward_profile import (
     ForwardTradeProfileGenerator)
 from gsy_framework.sim_results.electric_blue.aggregate_results import (
     ForwardDeviceStats)
 from gsy_framework.sim_results.electric_blue.time_series import (
-    ForwardDeviceTimeSeries, resample_data)
+    ForwardDeviceTimeSeries, LazyForwardDeviceTimeSeries, ResampleIndex, resample_data,
+    resample_time_series)
 
 
 @pytest.fixture(name="device_stats")
@@ -68,6 +70,21 @@ class TestForwardDeviceTimeSeries:
             ("2020-01-01T12:00", 17.73044522659769)
         ]
 
+    @staticmethod
+    def test_lazy_time_series_are_aggregated_from_finer_resolutions(device_stats):
+        time_series = ForwardDeviceTimeSeries(device_stats, AvailableMarketTypes.WEEK_FORWARD)
+        lazy_time_series = LazyForwardDeviceTimeSeries(
+            time_series, [AggregationResolution.RES_1_WEEK, AggregationResolution.RES_1_HOUR,
+                          AggregationResolution.RES_15_MINUTES])
+
+        for resolution in lazy_time_series.resolutions:
+            expected_time_series = time_series.generate(resolution.duration())
+            actual_time_series = lazy_time_series.get(resolution)
+            assert actual_time_series is lazy_time_series.get(resolution)
+            assert actual_time_series.keys() == expected_time_series.keys()
+            for name, series in expected_time_series.items():
+                assert actual_time_series[name] == pytest.approx(dict(series))
+
 
 def test_resampler():
     generator = ForwardTradeProfileGenerator(peak_kWh=2)
@@ -87,3 +104,62 @@ def test_resampler():
     ]
 
     assert list(aggregated_data) == expected_result
+
+
+def test_resample_index_follows_calendar_months():
+    time_slots = [DateTime(2020, 1, 31, tzinfo=UTC), DateTime(2020, 2, 15, tzinfo=UTC),
+                  DateTime(2020, 3, 1, tzinfo=UTC), DateTime(2020, 4, 30, tzinfo=UTC)]
+    resample_index = ResampleIndex(time_slots, duration(months=1))
+    # Buckets start at Jan 31, Feb 29, Mar 31 and Apr 30
+    assert resample_index.labels == [time_slots[0], time_slots[2], time_slots[3]]
+    assert resample_index.offsets == [0, 2, 3, 4]
+    assert resample_index.aggregate([1, 2, 3, 4], "mean") == [1.5, 3, 4]
+    assert resample_index.aggregate([1, 2, 3, 4], "last") == [2, 3, 4]
+
+
+def test_resampler_skips_gaps_in_the_time_axis():
+    timeseries_data = {
+        DateTime(2020, 1, 1, 0, 0, tzinfo=UTC): 1,
+        DateTime(2020, 1, 1, 0, 15, tzinfo=UTC): 2,
+        DateTime(2020, 1, 1, 5, 30, tzinfo=UTC): 3,
+        DateTime(2020, 1, 1, 5, 45, tzinfo=UTC): 4,
+        DateTime(2020, 1, 1, 6, 0, tzinfo=UTC): 5,
+    }
+    assert list(resample_time_series(timeseries_data, duration(hours=1), "sum")) == [
+        (DateTime(2020, 1, 1, 0, 0, tzinfo=UTC), 3),
+        (DateTime(2020, 1, 1, 5, 30, tzinfo=UTC), 7),
+        (DateTime(2020, 1, 1, 6, 0, tzinfo=UTC), 5),
+    ]
+
+
+def _get_dst_crossing_time_series(skipped_days=()):
+    time_slot = pendulum.datetime(2023, 3, 20, tz="Europe/Berlin")
+    end_time = pendulum.datetime(2023, 4, 5, tz="Europe/Berlin")
+    timeseries_data = {}
+    while time_slot < end_time:
+        if time_slot.day not in skipped_days:
+            timeseries_data[time_slot] = 1
+        time_slot = time_slot.add(minutes=15)
+    return timeseries_data
+
+
+@pytest.mark.parametrize("skipped_days", [(), (25, 26, 27, 28)])
+def test_resampler_keeps_daily_buckets_on_the_wall_clock_across_daylight_saving_time(
+        skipped_days):
+    timeseries_data = _get_dst_crossing_time_series(skipped_days)
+    aggregated_data = dict(resample_time_series(timeseries_data, duration(days=1), "sum"))
+    expected_days = [day for day in range(20, 32) if day not in skipped_days] + [1, 2, 3, 4]
+    assert [time_slot.day for time_slot in aggregated_data] == expected_days
+    assert all(time_slot.hour == 0 for time_slot in aggregated_data)
+    # The day of the change to daylight saving time has 23 hours
+    assert aggregated_data.get(pendulum.datetime(2023, 3, 26, tz="Europe/Berlin"), 92) == 92
+    assert sum(aggregated_data.values()) == len(timeseries_data)
+
+
+@pytest.mark.parametrize("skipped_days", [(), (25, 26, 27, 28)])
+def test_resampler_keeps_hourly_buckets_across_daylight_saving_time(skipped_days):
+    timeseries_data = _get_dst_crossing_time_series(skipped_days)
+    aggregated_data = dict(resample_time_series(timeseries_data, duration(hours=1), "sum"))
+    assert list(aggregated_data) == [
+        time_slot for time_slot in timeseries_data if time_slot.minute == 0]
+    assert set(aggregated_data.values()) == {4}
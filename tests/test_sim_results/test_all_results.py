@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from gsy_framework.exceptions import GSySerializationException
+from gsy_framework.sim_results.all_results import ResultsHandler
+from gsy_framework.sim_results.market_summary_info import MarketSummaryHistory
+from gsy_framework.sim_results.results_checkpoint import (
+    decode_results_checkpoint, encode_results_checkpoint)
+from gsy_framework.utils import str_to_pendulum_datetime
+from tests.test_sim_results.constants import TEST_AREA_RESULTS_DICT, TEST_CORE_STATS
+
+CURRENT_MARKET_SLOT = "2023-01-23T15:00"
+
+
+class TestResultsHandler:
+
+    @staticmethod
+    def test_requested_results_instantiate_only_the_requested_result_objects():
+        results_handler = ResultsHandler(requested_results=["bills", "kpi"])
+        assert list(results_handler.results_mapping.keys()) == ["kpi", "bills"]
+        results_handler.update(TEST_AREA_RESULTS_DICT, TEST_CORE_STATS, CURRENT_MARKET_SLOT)
+        assert set(results_handler.all_ui_results.keys()) == {"kpi", "bills"}
+
+    @staticmethod
+    def test_requested_results_raise_on_unknown_result_key():
+        with pytest.raises(ValueError):
+            ResultsHandler(requested_results=["unknown"])
+
+    @staticmethod
+    @pytest.mark.parametrize("should_export_plots", [False, True])
+    def test_restore_from_checkpoint_continues_with_the_same_state(should_export_plots):
+        results_handler = ResultsHandler(should_export_plots=should_export_plots)
+        results_handler.update(TEST_AREA_RESULTS_DICT, TEST_CORE_STATS, CURRENT_MARKET_SLOT)
+
+        restored_handler = ResultsHandler(should_export_plots=should_export_plots)
+        restored_handler.restore_from_checkpoint(results_handler.create_checkpoint())
+        assert restored_handler.all_raw_results == results_handler.all_raw_results
+
+        for handler in (results_handler, restored_handler):
+            handler.update(TEST_AREA_RESULTS_DICT, TEST_CORE_STATS, "2023-01-23T15:15")
+        assert restored_handler.all_ui_results == results_handler.all_ui_results
+        assert restored_handler.all_raw_results == results_handler.all_raw_results
+
+    @staticmethod
+    def test_restore_from_checkpoint_raises_on_unsupported_version():
+        checkpoint = bytearray(ResultsHandler().create_checkpoint())
+        checkpoint[5] += 1
+        with pytest.raises(GSySerializationException):
+            ResultsHandler().restore_from_checkpoint(bytes(checkpoint))
+
+    @staticmethod
+    def test_restore_from_checkpoint_refuses_to_call_functions():
+        class _CallsFunction:
+            def __reduce__(self):
+                return os.getcwd, ()
+
+        checkpoint = encode_results_checkpoint(
+            {"bids_offers_trades": _CallsFunction(), "results": {}})
+        with pytest.raises(GSySerializationException):
+            ResultsHandler().restore_from_checkpoint(checkpoint)
+
+    @staticmethod
+    def test_restore_from_checkpoint_refuses_to_call_package_functions():
+        class _CallsPackageFunction:
+            def __reduce__(self):
+                return str_to_pendulum_datetime, ("2023-01-23T15:00",)
+
+        checkpoint = encode_results_checkpoint(
+            {"bids_offers_trades": _CallsPackageFunction(), "results": {}})
+        with pytest.raises(GSySerializationException):
+            ResultsHandler().restore_from_checkpoint(checkpoint)
+
+    @staticmethod
+    def test_checkpoint_restores_result_histories():
+        history = MarketSummaryHistory()
+        history.add_results("house", {"average_energy_rate": 0.2, "external_traded_volume": 1.0,
+                                      "traded_volume": 2.0, "timestamp": CURRENT_MARKET_SLOT})
+        restored_history = decode_results_checkpoint(encode_results_checkpoint(history))
+        assert restored_history.to_dict() == history.to_dict()
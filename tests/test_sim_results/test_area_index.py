@@ -0,0 +1,75 @@
+from copy import deepcopy
+
+import pytest
+
+from gsy_framework.sim_results.area_index import AreaIndex, AreaTopologyCache
+
+
+@pytest.fixture(name="area_dict")
+def area_dict_fixture():
+    return {
+        "name": "Grid", "uuid": "grid", "type": "Area", "children": [
+            {"name": "House 1", "uuid": "house1", "type": "Area", "children": [
+                {"name": "PV", "uuid": "pv", "type": "PVStrategy", "children": []},
+                {"name": "Load", "uuid": "load", "type": "LoadHoursStrategy", "children": []},
+            ]},
+            {"name": "Market Maker", "uuid": "mm", "type": "MarketMakerStrategy",
+             "children": []},
+        ]}
+
+
+class TestAreaIndex:
+
+    @staticmethod
+    def test_area_index_provides_nodes_parents_and_children(area_dict):
+        area_index = AreaIndex(area_dict)
+        assert len(area_index) == 5
+        assert "pv" in area_index
+        assert area_index.parent("pv").uuid == "house1"
+        assert area_index.parent("grid") is None
+        assert [node.uuid for node in area_index.children("house1")] == ["pv", "load"]
+        assert area_index.node("house1").child_names == {"PV", "Load"}
+        assert area_index.node("house1").child_name_uuid_mapping == {"PV": "pv", "Load": "load"}
+        assert area_index.node("pv").unified_type == "PV"
+        assert area_index.node("pv").is_leaf
+        assert area_index.uuid_name_mapping["mm"] == "Market Maker"
+
+    @staticmethod
+    def test_area_index_traversal_orders(area_dict):
+        area_index = AreaIndex(area_dict)
+        assert [node.uuid for node in area_index.traversal_order] == [
+            "grid", "house1", "pv", "load", "mm"]
+        assert [node.uuid for node in area_index.bottom_up_order] == [
+            "pv", "load", "house1", "mm", "grid"]
+        assert [node.uuid for node in area_index.subtree("house1")] == ["house1", "pv", "load"]
+        assert [node.uuid for node in area_index.subtree_bottom_up("house1")] == [
+            "pv", "load", "house1"]
+
+
+class TestAreaTopologyCache:
+
+    @staticmethod
+    def test_area_index_is_reused_if_the_topology_is_the_same(area_dict):
+        topology_cache = AreaTopologyCache()
+        area_index = topology_cache.get_area_index(area_dict)
+        same_topology_area_dict = deepcopy(area_dict)
+        assert topology_cache.get_area_index(same_topology_area_dict) is area_index
+        assert area_index.node("pv").area_dict is same_topology_area_dict["children"][0][
+            "children"][0]
+
+    @staticmethod
+    def test_area_index_is_rebuilt_if_the_topology_changes(area_dict):
+        topology_cache = AreaTopologyCache()
+        area_index = topology_cache.get_area_index(area_dict)
+        area_dict["children"][0]["children"].append(
+            {"name": "Storage", "uuid": "storage", "type": "StorageStrategy", "children": []})
+        new_area_index = topology_cache.get_area_index(area_dict)
+        assert new_area_index is not area_index
+        assert new_area_index.uuid_name_mapping["storage"] == "Storage"
+
+    @staticmethod
+    def test_invalidate_discards_the_cached_area_index(area_dict):
+        topology_cache = AreaTopologyCache()
+        area_index = topology_cache.get_area_index(area_dict)
+        topology_cache.invalidate()
+        assert topology_cache.get_area_index(area_dict) is not area_index
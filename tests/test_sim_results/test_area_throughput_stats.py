@@ -0,0 +1,101 @@
+from copy import deepcopy
+
+from gsy_framework.sim_results.aggregate_results import (
+    densify_global_results, merge_last_market_results_to_global)
+from gsy_framework.sim_results.area_throughput_stats import (
+    AreaThroughputStats, ThroughputHistory)
+from gsy_framework.sim_results.columnar_history import ColumnarHistory
+
+AREA_DICT = {"name": "grid", "uuid": "grid", "type": "Area", "children": [
+    {"name": "house", "uuid": "house", "type": "Area", "children": [
+        {"name": "pv", "uuid": "pv", "type": "PV", "children": []}]}]}
+
+
+def _core_stats(imported_energy_kWh, exported_energy_kWh):
+    return {
+        "grid": {"area_throughput": {
+            "imported_energy_kWh": imported_energy_kWh, "exported_energy_kWh": 0.0}},
+        "house": {"area_throughput": {
+            "imported_energy_kWh": imported_energy_kWh,
+            "exported_energy_kWh": exported_energy_kWh,
+            "baseline_peak_energy_import_kWh": 2.0, "import_capacity_kWh": 10.0}}}
+
+
+class TestAreaThroughputStats:
+
+    @staticmethod
+    def test_update_reports_throughput_of_areas_by_name_and_uuid():
+        throughput_stats = AreaThroughputStats()
+        throughput_stats.update(AREA_DICT, _core_stats(1.5, 0.5), "2023-01-23T15:00")
+        house_results = {
+            "import": {"peak_energy_trade_kWh": 1.5, "peak_energy_net_kWh": 1.0,
+                       "peak_percentage": 50.0, "baseline_peak_energy_kWh": 2.0,
+                       "capacity_kWh": 10.0},
+            "export": {"peak_energy_trade_kWh": 0.5, "peak_energy_net_kWh": 0.0},
+            "net_energy_flow": {"peak_energy_kWh": 1.0}}
+        assert set(throughput_stats.ui_formatted_results.keys()) == {"grid", "house"}
+        assert throughput_stats.ui_formatted_results["house"] == {
+            "2023-01-23T15:00": house_results}
+        assert throughput_stats.raw_results["house"] == {"2023-01-23T15:00": house_results}
+
+    @staticmethod
+    def test_merge_results_to_throughput_history_matches_dict_merge():
+        throughput_stats = AreaThroughputStats()
+        dict_results = {}
+        throughput_history = ThroughputHistory()
+        for time_slot, (imported, exported) in (
+                ("2023-01-23T15:00", (1.5, 0.5)), ("2023-01-23T15:15", (0.0, 3.0))):
+            throughput_stats.update(AREA_DICT, _core_stats(imported, exported), time_slot)
+            dict_results = AreaThroughputStats.merge_results_to_global(
+                deepcopy(throughput_stats.ui_formatted_results), dict_results)
+            throughput_history = AreaThroughputStats.merge_results_to_global(
+                throughput_stats.ui_formatted_results, throughput_history)
+        assert throughput_history.to_dict() == dict_results
+
+    @staticmethod
+    def test_results_are_created_once_per_market_slot_and_can_be_set():
+        throughput_stats = AreaThroughputStats()
+        throughput_stats.update(AREA_DICT, _core_stats(1.5, 0.5), "2023-01-23T15:00")
+        results = throughput_stats.results
+        assert throughput_stats.raw_results is results
+        assert throughput_stats.ui_formatted_results is throughput_stats.results_redis
+
+        throughput_stats.results_redis = {}
+        assert throughput_stats.ui_formatted_results == {}
+        throughput_stats.update(AREA_DICT, _core_stats(0.0, 3.0), "2023-01-23T15:15")
+        assert throughput_stats.results is not results
+        assert set(throughput_stats.results_redis.keys()) == {"grid", "house"}
+
+    @staticmethod
+    def test_sparse_global_results_are_stored_in_throughput_history():
+        throughput_stats = AreaThroughputStats()
+        dense_results = {"area_throughput": {}}
+        sparse_results = {"area_throughput": {}}
+        for time_slot, (imported, exported) in (
+                ("2023-01-23T15:00", (1.5, 0.5)), ("2023-01-23T15:15", (0.0, 3.0))):
+            throughput_stats.update(AREA_DICT, _core_stats(imported, exported), time_slot)
+            market_results = {"area_throughput": throughput_stats.ui_formatted_results}
+            dense_results = merge_last_market_results_to_global(
+                deepcopy(market_results), dense_results, [],
+                requested_fields=["area_throughput"])
+            sparse_results = merge_last_market_results_to_global(
+                market_results, sparse_results, requested_fields=["area_throughput"],
+                sparse=True)
+        assert isinstance(sparse_results["area_throughput"], ThroughputHistory)
+        assert densify_global_results(
+            sparse_results, [], requested_fields=["area_throughput"]) == dense_results
+
+
+class TestColumnarHistory:
+
+    @staticmethod
+    def test_columns_grow_beyond_the_initial_capacity():
+        history = ColumnarHistory(("a", "b"), initial_capacity=2)
+        for index in range(5):
+            history.set_row("area1", str(index), (index, -index))
+        history.set_row("area2", "3", (1.0, 2.0))
+        assert history.get_row("area1", "4") == (4.0, -4.0)
+        assert history.get_row("area2", "0") is None
+        assert list(history.column("area1", "a")) == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert list(history.column("area2", "b")) == [0.0, 0.0, 0.0, 2.0, 0.0]
+        assert list(history.area_rows("area2")) == [("3", (1.0, 2.0))]
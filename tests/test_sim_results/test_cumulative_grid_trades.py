@@ -0,0 +1,116 @@
+import pytest
+
+from gsy_framework.sim_results.cumulative_grid_trades import CumulativeGridTrades
+
+
+def _area(name, area_type, parent_uuid, children=None):
+    return {"name": name, "uuid": name.lower().replace(" ", "-"), "type": area_type,
+            "parent_uuid": parent_uuid, "children": children or []}
+
+
+def _trade(seller, buyer, energy, energy_rate):
+    return {"seller": {"name": seller}, "buyer": {"name": buyer}, "energy": energy,
+            "energy_rate": energy_rate, "price": energy * energy_rate}
+
+
+AREA_DICT = _area("Grid", "Area", "", [
+    _area("Community", "Area", "grid", [
+        _area("House 1", "Area", "community", [
+            _area("PV", "PVStrategy", "house-1"),
+            _area("Load", "LoadHoursStrategy", "house-1"),
+            _area("Storage", "StorageStrategy", "house-1"),
+        ]),
+        _area("House 2", "Area", "community", [
+            _area("Load 2", "LoadHoursStrategy", "house-2"),
+        ]),
+    ]),
+    _area("Infinite Bus", "InfiniteBusStrategy", "grid"),
+])
+
+CORE_STATS = {
+    "house-1": {"trades": [
+        _trade("PV", "Load", 0.5, 20),
+        _trade("Storage", "Load", 0.25, 24),
+        _trade("PV", "Storage", 0.25, 20),
+        _trade("PV", "MA House 1", 0.5, 20),
+    ]},
+    "house-2": {"trades": [
+        _trade("MA House 2", "Load 2", 0.75, 28),
+    ]},
+    "community": {"trades": [
+        _trade("MA House 1", "MA House 2", 0.5, 22),
+        _trade("MA Community", "MA House 2", 0.25, 32),
+    ]},
+    "grid": {"trades": [
+        _trade("Infinite Bus", "MA Community", 0.25, 30),
+    ]},
+}
+
+
+class TestCumulativeGridTrades:
+
+    @staticmethod
+    @pytest.fixture(name="cumulative_grid_trades")
+    def fixture_cumulative_grid_trades():
+        cumulative_grid_trades = CumulativeGridTrades()
+        for market_slot in ("2023-01-23T15:00", "2023-01-23T15:15"):
+            cumulative_grid_trades.update(AREA_DICT, CORE_STATS, market_slot)
+        return cumulative_grid_trades.raw_results
+
+    @staticmethod
+    def test_device_trades_are_accumulated_over_market_slots(cumulative_grid_trades):
+        assert cumulative_grid_trades["load"]["consumedFrom"] == {"PV": 1.0, "Storage": 0.5}
+        assert cumulative_grid_trades["load"]["spentTo"] == {"PV": 20.0, "Storage": 12.0}
+        assert cumulative_grid_trades["pv"]["produced"] == -2.5
+        assert cumulative_grid_trades["pv"]["earned"] == 50.0
+        assert cumulative_grid_trades["storage"]["consumedFrom"] == {"PV": 0.5}
+        assert cumulative_grid_trades["storage"]["spentTo"] == {"PV": 10.0}
+        assert cumulative_grid_trades["storage"]["produced"] == -0.5
+        assert cumulative_grid_trades["storage"]["earned"] == 12.0
+        assert cumulative_grid_trades["load-2"]["consumedFrom"] == {"House 2": 1.5}
+        assert cumulative_grid_trades["infinite-bus"]["produced"] == -0.5
+        assert cumulative_grid_trades["infinite-bus"]["earned"] == 15.0
+
+    @staticmethod
+    def test_area_trades_are_accumulated_for_nested_areas(cumulative_grid_trades):
+        house_1 = cumulative_grid_trades["house-1"]
+        # Trades between the devices of the house
+        assert house_1["produced"] == -2.0
+        assert house_1["earned"] == 42.0
+        assert house_1["consumedFrom"] == {"House 1": 2.0}
+        # Trades of the devices with the market agent of the house
+        assert house_1["producedForExternal"] == {"PV": 1.0}
+        assert house_1["earnedFromExternal"] == {"PV": 20.0}
+
+        house_2 = cumulative_grid_trades["house-2"]
+        assert house_2["produced"] == 0.0
+        assert house_2["consumedFromExternal"] == {"Load 2": -1.5}
+        assert house_2["spentToExternal"] == {"Load 2": 42.0}
+
+        community = cumulative_grid_trades["community"]
+        assert community["produced"] == -1.0
+        assert community["earned"] == 22.0
+        assert community["consumedFrom"] == {"Community": 1.0}
+        assert community["consumedFromExternal"] == {"House 2": -0.5}
+        assert community["spentToExternal"] == {"House 2": 16.0}
+        assert community["parent_uuid"] == "grid"
+        assert [child["uuid"] for child in community["children"]] == ["house-1", "house-2"]
+
+        grid = cumulative_grid_trades["grid"]
+        assert grid["produced"] == -0.5
+        assert grid["consumedFrom"] == {"Grid": 0.5}
+        assert grid["spentTo"] == {"Grid": 15.0}
+
+    @staticmethod
+    def test_target_area_results_contain_the_bars_of_the_children(cumulative_grid_trades):
+        results = CumulativeGridTrades.generate_cumulative_grid_trades_target_area(
+            "house-1", {"cumulative_grid_trades": cumulative_grid_trades["house-1"]})
+        assert results["house-1"][:3] == [
+            {"areaName": "PV", "bars": [{"energy": -2.5, "targetArea": "PV"}]},
+            {"areaName": "Load", "bars": [{"energy": 1.0, "targetArea": "PV"},
+                                          {"energy": 0.5, "targetArea": "Storage"}]},
+            {"areaName": "Storage", "bars": [{"energy": -0.5, "targetArea": "Storage"},
+                                             {"energy": 0.5, "targetArea": "PV"}]},
+        ]
+        assert results["house-1"][3] == {
+            "areaName": "External Trades", "bars": [{"energy": 1.0, "targetArea": "PV"}]}
@@ -0,0 +1,24 @@
+from gsy_framework.sim_results.cumulative_net_energy_flow import CumulativeNetEnergyFlow
+
+
+def _trade(seller_name, buyer_name, energy):
+    return {"seller": {"name": seller_name}, "buyer": {"name": buyer_name}, "energy": energy}
+
+
+class TestCumulativeNetEnergyFlow:
+
+    @staticmethod
+    def test_update_accumulates_trades_between_areas_and_their_children():
+        area_dict = {"name": "Grid", "uuid": "grid", "children": [
+            {"name": "House", "uuid": "house", "children": [
+                {"name": "PV", "uuid": "pv", "children": []}]}]}
+        core_stats = {
+            "grid": {"trades": [
+                _trade("MA House", "Grid", 2.0), _trade("Grid", "MA House", 0.5),
+                _trade("Market Maker", "Grid", 3.0)]},
+            "house": {"trades": [_trade("PV", "House", 1.0), _trade("PV", "Load", 1.0)]},
+            "pv": {}}
+        net_energy_flow = CumulativeNetEnergyFlow()
+        net_energy_flow.update(area_dict, core_stats, "2023-01-23T15:00")
+        net_energy_flow.update(area_dict, core_stats, "2023-01-23T15:15")
+        assert net_energy_flow.raw_results == {"grid": 3.0, "house": 2.0}
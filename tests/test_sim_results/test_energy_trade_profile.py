@@ -1,4 +1,7 @@
+from copy import deepcopy
+
 import pytest
+from pendulum import datetime
 
 from gsy_framework.sim_results.energy_trade_profile import EnergyTradeProfile
 
@@ -100,3 +103,82 @@ class TestEnergyTradeProfile:
                                 "accumulated": {
                                     "January 04 2022, 12:12 h": test_constants[
                                         "trade_energy"]}}}}})
+
+    @staticmethod
+    def test_plot_results_are_keyed_by_the_time_slots_of_all_updates(
+            area_result_dict, core_stats, test_constants):
+        """Test whether the time axis of the plot results contains all updated time slots."""
+
+        energy_trade_profile = EnergyTradeProfile(should_export_plots=True)
+        energy_trade_profile.update(
+            area_result_dict, core_stats, test_constants["market_slot"])
+        energy_trade_profile.update(area_result_dict, core_stats, "2022-01-04T12:27")
+        sold_energy = energy_trade_profile.plot_results[
+            test_constants["seller_area_name"]]["sold_energy_lists"][
+            test_constants["seller_area_name"]]
+        assert sold_energy["slot"] == [datetime(2022, 1, 4, 12, 12), datetime(2022, 1, 4, 12, 27)]
+        assert sold_energy["energy"] == [10, 10]
+        assert list(energy_trade_profile.raw_results[test_constants["seller_area_name"]][
+            "sold_energy"][test_constants["seller_area_name"]]["accumulated"].keys()) == [
+            "January 04 2022, 12:12 h", "January 04 2022, 12:27 h"]
+
+    @staticmethod
+    @pytest.mark.parametrize("initial_results", [
+        {}, {"house": {"sold_energy": {}, "bought_energy": {}}}])
+    def test_sparse_merge_results_to_global_is_densified_to_the_dense_merge(initial_results):
+        """Test whether the sparse global results are densified to the dense global results."""
+
+        slot_list = ["January 04 2022, 12:00 h", "January 04 2022, 12:15 h",
+                     "January 04 2022, 12:30 h"]
+        market_results = [
+            {"house": {"sold_energy": {"pv": {"accumulated": {slot_list[0]: 1.0}}},
+                       "bought_energy": {}}},
+            {"house": {"sold_energy": {"pv": {"accumulated": {slot_list[1]: 2.0},
+                                              "load": {slot_list[1]: 2.0}}},
+                       "bought_energy": {"load": {"accumulated": {slot_list[1]: 2.0}}}}},
+        ]
+        dense_results = deepcopy(initial_results)
+        sparse_results = deepcopy(initial_results)
+        for results in market_results:
+            dense_results = EnergyTradeProfile.merge_results_to_global(
+                deepcopy(results), dense_results, slot_list)
+            sparse_results = EnergyTradeProfile.merge_results_to_global(
+                deepcopy(results), sparse_results, None)
+        assert sparse_results["house"]["sold_energy"]["pv"]["load"] == {slot_list[1]: 2.0}
+        assert EnergyTradeProfile.densify_global_results(
+            sparse_results, slot_list) == dense_results
+
+    @staticmethod
+    def test_plot_results_keep_the_full_precision_of_the_time_slots(
+            area_result_dict, core_stats, test_constants):
+        """Test whether the plot results keep the seconds of the updated time slots."""
+
+        energy_trade_profile = EnergyTradeProfile(should_export_plots=True)
+        energy_trade_profile.update(area_result_dict, core_stats, "2022-01-04T12:12:30")
+        sold_energy = energy_trade_profile.plot_results[
+            test_constants["seller_area_name"]]["sold_energy_lists"][
+            test_constants["seller_area_name"]]
+        assert sold_energy["slot"] == [datetime(2022, 1, 4, 12, 12, 30)]
+        assert list(energy_trade_profile.raw_results[test_constants["seller_area_name"]][
+            "sold_energy"][test_constants["seller_area_name"]]["accumulated"].keys()) == [
+            "January 04 2022, 12:12 h"]
+
+    @staticmethod
+    def test_formatted_profiles_are_built_once_per_market_slot(
+            area_result_dict, core_stats, test_constants):
+        """Test whether the formatted profiles are reused until the next update."""
+
+        energy_trade_profile = EnergyTradeProfile(should_export_plots=True)
+        energy_trade_profile.update(
+            area_result_dict, core_stats, test_constants["market_slot"])
+        traded_energy_profile = energy_trade_profile.traded_energy_profile
+        assert energy_trade_profile.raw_results is traded_energy_profile
+        assert (energy_trade_profile.ui_formatted_results is
+                energy_trade_profile.traded_energy_current)
+
+        energy_trade_profile.update(area_result_dict, core_stats, "2022-01-04T12:27")
+        assert energy_trade_profile.traded_energy_profile is not traded_energy_profile
+        assert list(energy_trade_profile.traded_energy_profile[
+            test_constants["seller_area_name"]]["sold_energy"][
+            test_constants["seller_area_name"]]["accumulated"].keys()) == [
+            "January 04 2022, 12:12 h", "January 04 2022, 12:27 h"]
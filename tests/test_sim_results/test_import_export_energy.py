@@ -3,7 +3,43 @@ import uuid
 import pytest
 from pendulum import now
 
-from gsy_framework.sim_results.imported_exported_energy import ImportedExportedEnergyHandler
+from gsy_framework.sim_results.imported_exported_energy import (
+    ENERGY_STAT_FIELDS, ImportedExportedEnergyHandler)
+from gsy_framework.utils import add_or_create_key
+
+
+def _accumulate_with_dicts(results, area_dict, core_stats, market_slot, should_export_plots):
+    """Accumulate the imported and exported energy per trade, like the handler did with dicts."""
+    member_key = "name" if should_export_plots else "uuid"
+    for community_dict in area_dict["children"]:
+        if not community_dict.get("children"):
+            continue
+        community_uuid = community_dict["uuid"]
+        members = {child["uuid"]: child[member_key]
+                   for child in community_dict["children"] if child.get("children")}
+        community_key = community_dict[member_key]
+        for area_key in [*members.values(), community_key]:
+            for stat_key in ENERGY_STAT_FIELDS:
+                results.setdefault(area_key, {}).setdefault(market_slot, {}).setdefault(
+                    stat_key, 0)
+        for trade in core_stats.get(community_uuid, {}).get("trades", []):
+            buyer, seller = trade["buyer"], trade["seller"]
+            if buyer["uuid"] in members and seller["uuid"] in members:
+                add_or_create_key(results[buyer[member_key]][market_slot],
+                                  "imported_from_community", trade["energy"])
+                add_or_create_key(results[seller[member_key]][market_slot],
+                                  "exported_to_community", trade["energy"])
+            elif buyer["uuid"] in members and seller["uuid"] == community_uuid:
+                add_or_create_key(results[buyer[member_key]][market_slot],
+                                  "imported_from_grid", trade["energy"])
+                add_or_create_key(results[community_key][market_slot],
+                                  "imported_from_grid", trade["energy"])
+            elif seller["uuid"] in members and buyer["uuid"] == community_uuid:
+                add_or_create_key(results[seller[member_key]][market_slot],
+                                  "exported_to_grid", trade["energy"])
+                add_or_create_key(results[community_key][market_slot],
+                                  "exported_to_grid", trade["energy"])
+    return results
 
 
 class TestImportedExportedEnergyHandler:
@@ -106,3 +142,55 @@ class TestImportedExportedEnergyHandler:
         }
         assert member_1_slot_results == member_1_expected_results
         assert member_2_slot_results == member_2_expected_results
+
+    def _add_second_community(self):
+        community_uuid = str(uuid.uuid4())
+        house3 = {"name": "House 3", "uuid": str(uuid.uuid4()), "type": "Area",
+                  "children": [{"name": "Load 3", "type": "Load", "uuid": str(uuid.uuid4())}]}
+        house4 = {"name": "House 4", "uuid": str(uuid.uuid4()), "type": "Area",
+                  "children": [{"name": "PV 4", "type": "PV", "uuid": str(uuid.uuid4())}]}
+        self.area_dict["children"].append({
+            "name": "Community 2", "type": "Area", "uuid": community_uuid,
+            "children": [house3, house4]})
+
+        def _trader(area):
+            return {"name": area["name"], "uuid": area["uuid"]}
+
+        community = {"name": "Community 2", "uuid": community_uuid}
+        self.core_stats[community_uuid] = {"trades": [
+            {"seller": _trader(house4), "buyer": _trader(house3), "energy": 0.25},
+            {"seller": community, "buyer": _trader(house3), "energy": 0.125},
+            {"seller": _trader(house4), "buyer": community, "energy": 0.5},
+            {"seller": _trader(house4), "buyer": community, "energy": 0.75},
+            # Trades with areas outside of the community are not accounted
+            {"seller": {"name": self.house1_name, "uuid": self.house1_uuid},
+             "buyer": _trader(house3), "energy": 2.0},
+        ]}
+
+    @pytest.mark.parametrize("should_export_plots", [False, True])
+    def test_update_accumulates_trades_across_market_slots_and_communities(
+            self, should_export_plots):
+        # The trade energies are binary fractions, so that the sums do not depend on the order
+        # of the additions
+        for trade in self.core_stats[self.community_uuid]["trades"]:
+            trade["energy"] = {0.3: 0.25, 0.4: 0.5, 0.5: 1.5, 0.6: 0.375}[trade["energy"]]
+        self._add_second_community()
+        energy_handler = ImportedExportedEnergyHandler(should_export_plots=should_export_plots)
+        expected_results = {}
+        market_slots = ["2023-01-23T15:00", "2023-01-23T15:15", "2023-01-23T15:15"]
+        for market_slot in market_slots:
+            energy_handler.update(self.area_dict, self.core_stats, market_slot)
+            if not should_export_plots:
+                expected_results = {}
+            _accumulate_with_dicts(expected_results, self.area_dict, self.core_stats,
+                                   market_slot, should_export_plots)
+
+        assert energy_handler.imported_exported_energy == expected_results
+        community_key = "Community 2" if should_export_plots else self.area_dict[
+            "children"][2]["uuid"]
+        assert energy_handler.imported_exported_energy[community_key][market_slots[-1]] == {
+            "imported_from_community": 0,
+            "exported_to_community": 0,
+            "imported_from_grid": 0.125 * (2 if should_export_plots else 1),
+            "exported_to_grid": 1.25 * (2 if should_export_plots else 1),
+        }
@@ -0,0 +1,41 @@
+from pendulum import datetime
+
+from gsy_framework.sim_results.market_price_energy_day import (
+    MarketPriceEnergyDay, TradeRateStatistics)
+
+
+class TestMarketPriceEnergyDay:
+
+    @staticmethod
+    def test_trade_rate_statistics_are_updated_for_each_trade():
+        statistics = TradeRateStatistics()
+        for rate in (0.2, 0.1, 0.3):
+            statistics.add(rate)
+        assert statistics.count == 3
+        assert statistics.min == 0.1
+        assert statistics.max == 0.3
+
+    @staticmethod
+    def test_update_reports_min_and_max_trade_rates_with_formatted_time_slot():
+        area_dict = {"name": "house", "uuid": "house", "children": [
+            {"name": "pv", "uuid": "pv", "children": []}]}
+        core_stats = {"house": {"grid_fee_constant": 1.0, "trades": [
+            {"energy_rate": 20.0}, {"energy_rate": 10.0}, {"energy_rate": 30.0}]}}
+        price_energy_day = MarketPriceEnergyDay(should_export_plots=False)
+        price_energy_day.update(area_dict, core_stats, datetime(2023, 1, 23, 15))
+        assert price_energy_day.ui_formatted_results == {
+            "house": {"price-currency": "Euros", "load-unit": "kWh", "price-energy-day": [{
+                "time": "2023-01-23T15:00", "min_price": 0.1, "max_price": 0.3,
+                "grid_fee_constant": 0.01}]}}
+
+    @staticmethod
+    def test_csv_output_keeps_the_time_slot_as_passed():
+        area_dict = {"name": "house", "uuid": "house", "children": [
+            {"name": "pv", "uuid": "pv", "children": []}]}
+        core_stats = {"house": {"trades": [{"energy_rate": 20.0}]}}
+        price_energy_day = MarketPriceEnergyDay(should_export_plots=True)
+        price_energy_day.update(area_dict, core_stats, datetime(2023, 1, 23, 15))
+        assert price_energy_day.raw_results == {
+            "house": {"price-currency": "Euros", "load-unit": "kWh", "price-energy-day": [[{
+                "time": datetime(2023, 1, 23, 15), "min_price": 0.2, "max_price": 0.2,
+                "grid_fee_constant": None}]]}}
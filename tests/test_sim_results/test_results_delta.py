@@ -0,0 +1,75 @@
+import pytest
+
+from gsy_framework.exceptions import GSySerializationException
+from gsy_framework.sim_results.all_results import ResultsHandler
+from gsy_framework.sim_results.results_delta import (
+    ResultsDeltaDecoder, ResultsDeltaEncoder, apply_results_delta)
+from tests.test_sim_results.constants import TEST_AREA_RESULTS_DICT, TEST_CORE_STATS
+
+
+class TestResultsDelta:
+
+    @staticmethod
+    def test_delta_includes_only_changed_and_removed_paths():
+        encoder = ResultsDeltaEncoder()
+        results = {"bills": {"house": {"spent": 1, "earned": 2}, "pv": {"spent": 0}},
+                   "kpi": {"house": [1, 2]}}
+        assert encoder.encode(results, [])["type"] == "keyframe"
+        results["bills"]["house"]["spent"] = 3
+        del results["bills"]["pv"]
+        message = encoder.encode(
+            results, [("bills", "house", "spent"), ("bills", "pv")])
+        assert message["type"] == "delta"
+        assert message["changed"] == [[["bills", "house", "spent"], 3]]
+        assert message["removed"] == [["bills", "pv"]]
+
+    @staticmethod
+    def test_delta_skips_paths_inside_of_changed_sub_trees():
+        encoder = ResultsDeltaEncoder()
+        results = {"bills": {"house": {"spent": 1}, "pv": {"spent": 0}}, "kpi": {}}
+        encoder.encode(results, [])
+        message = encoder.encode(results, [("bills", "house", "spent"), ("bills",)])
+        assert message["changed"] == [[["bills"], results["bills"]]]
+        state = {"bills": {"old_house": {"spent": 5}}}
+        apply_results_delta(state, message)
+        assert state == {"bills": results["bills"]}
+
+    @staticmethod
+    def test_keyframe_is_sent_after_keyframe_interval():
+        encoder = ResultsDeltaEncoder(keyframe_interval=2)
+        message_types = [encoder.encode({"a": index}, [("a",)])["type"] for index in range(5)]
+        assert message_types == ["keyframe", "delta", "keyframe", "delta", "keyframe"]
+        encoder.request_keyframe()
+        assert encoder.encode({"a": 5}, [("a",)])["type"] == "keyframe"
+
+    @staticmethod
+    def test_decoder_rebuilds_the_full_results_of_the_results_handler():
+        results_handler = ResultsHandler()
+        decoder = ResultsDeltaDecoder()
+        for market_slot in ("2023-01-23T15:00", "2023-01-23T15:15", "2023-01-23T15:30"):
+            results_handler.update(TEST_AREA_RESULTS_DICT, TEST_CORE_STATS, market_slot)
+            decoded_results = decoder.decode(results_handler.get_db_results_delta())
+            assert decoded_results == results_handler.all_db_results
+
+    @staticmethod
+    def test_delta_includes_only_the_keys_that_the_updates_changed():
+        results_handler = ResultsHandler(requested_results=("cumulative_net_energy_flow",))
+        results_handler.update(TEST_AREA_RESULTS_DICT, TEST_CORE_STATS, "2023-01-23T15:00")
+        assert results_handler.get_db_results_delta()["type"] == "keyframe"
+        assert results_handler.get_db_results_delta()["changed"] == []
+        results_handler.update(TEST_AREA_RESULTS_DICT, TEST_CORE_STATS, "2023-01-23T15:15")
+        message = results_handler.get_db_results_delta()
+        net_energy_flow = results_handler.all_db_results["cumulative_net_energy_flow"]
+        changed_paths = [path for path, _ in message["changed"]]
+        assert sorted(changed_paths) == sorted(
+            [["cumulative_net_energy_flow", area_uuid] for area_uuid in net_energy_flow] +
+            [["bids_offers_trades", area_uuid] for area_uuid in TEST_CORE_STATS])
+
+    @staticmethod
+    def test_decoder_raises_on_missing_delta():
+        encoder = ResultsDeltaEncoder()
+        decoder = ResultsDeltaDecoder()
+        decoder.decode(encoder.encode({"a": 1}, [("a",)]))
+        encoder.encode({"a": 2}, [("a",)])
+        with pytest.raises(GSySerializationException):
+            decoder.decode(encoder.encode({"a": 3}, [("a",)]))
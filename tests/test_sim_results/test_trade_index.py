@@ -0,0 +1,24 @@
+from gsy_framework.sim_results.trade_index import TradeIndex
+
+
+def _trade(seller_name, buyer_name, energy):
+    return {"seller": {"name": seller_name}, "buyer": {"name": buyer_name}, "energy": energy}
+
+
+class TestTradeIndex:
+
+    @staticmethod
+    def test_trade_index_groups_market_trades_by_seller_and_buyer():
+        trades = [
+            _trade("PV", "Load", 1), _trade("PV", "MA House", 2), _trade("Storage", "Load", 3)]
+        trade_index = TradeIndex({"market": {"trades": trades}})
+        assert trade_index.sold_by("market", "PV") == trades[:2]
+        assert trade_index.bought_by("market", "Load") == [trades[0], trades[2]]
+        assert trade_index.bought_by("market", "House") == []
+        assert trade_index.market("market").trades_with_area_names[1] == ("PV", "House", trades[1])
+
+    @staticmethod
+    def test_trade_index_returns_no_trades_for_unknown_markets():
+        trade_index = TradeIndex({})
+        assert trade_index.sold_by("market", "PV") == []
+        assert trade_index.market("market").trades == []
@@ -32,6 +32,9 @@ from gsy_framework.utils import (
     sort_list_of_dicts_by_attribute,
     str_to_pendulum_datetime,
     is_time_slot_in_simulation_duration,
+    generate_market_slot_list_from_config,
+    get_from_profile_same_weekday_and_time,
+    ProfileWeekdayTimeIndex,
 )
 
 
@@ -140,3 +143,66 @@ class TestUtils:
 
         time_slot = GlobalConfig.start_date + GlobalConfig.sim_duration + duration(minutes=1)
         assert is_time_slot_in_simulation_duration(time_slot) is False
+
+    @staticmethod
+    @pytest.mark.parametrize("start_offset", [
+        duration(0), duration(hours=-5), duration(minutes=7), duration(days=3)])
+    @pytest.mark.parametrize("ignore_duration_check", [False, True])
+    def test_generate_market_slot_list_from_config_returns_slots_in_simulation_duration(
+            start_offset, ignore_duration_check):
+        start_timestamp = GlobalConfig.start_date + start_offset
+        sim_duration = duration(days=2)
+        slot_length = duration(minutes=15)
+        expected_slots = [
+            start_timestamp + slot_length * i
+            for i in range((sim_duration + slot_length) // slot_length - 1)
+            if ignore_duration_check or is_time_slot_in_simulation_duration(
+                start_timestamp + slot_length * i)
+        ]
+        slot_range = generate_market_slot_list_from_config(
+            sim_duration, start_timestamp, slot_length, ignore_duration_check, as_range=True)
+        assert generate_market_slot_list_from_config(
+            sim_duration, start_timestamp, slot_length, ignore_duration_check) == expected_slots
+        assert list(slot_range) == expected_slots
+        assert len(slot_range) == len(expected_slots)
+        assert all(slot_range[i] == slot for i, slot in enumerate(expected_slots))
+        assert all(slot in slot_range for slot in expected_slots)
+        assert start_timestamp - slot_length not in slot_range
+        assert start_timestamp + duration(minutes=1) not in slot_range
+
+    @staticmethod
+    @patch("gsy_framework.constants_limits.GlobalConfig.is_canary_network", lambda: True)
+    def test_generate_market_slot_list_from_config_returns_all_slots_for_canary_network():
+        start_timestamp = GlobalConfig.start_date + duration(days=5)
+        slot_range = generate_market_slot_list_from_config(
+            duration(hours=2), start_timestamp, duration(minutes=15), as_range=True)
+        assert list(slot_range) == [start_timestamp + duration(minutes=15) * i for i in range(8)]
+
+    @staticmethod
+    def test_get_from_profile_same_weekday_and_time_uses_profile_index():
+        profile = {datetime(2021, 1, 3, 22) + duration(hours=i): i for i in range(7 * 24)}
+        profile_index = ProfileWeekdayTimeIndex(profile)
+        for time_slot in [datetime(2022, 6, 6, 5), datetime(2022, 6, 12, 23, 0)]:
+            assert get_from_profile_same_weekday_and_time(
+                profile, time_slot, profile_index=profile_index
+            ) == get_from_profile_same_weekday_and_time(profile, time_slot)
+        assert get_from_profile_same_weekday_and_time(
+            profile, datetime(2022, 6, 6, 5, 30), ignore_not_found=True,
+            profile_index=profile_index) is None
+
+    @staticmethod
+    def test_profile_weekday_time_index_indexes_extended_profiles():
+        profile = {datetime(2021, 1, 3, 22): 1}
+        profile_index = ProfileWeekdayTimeIndex(profile)
+        assert profile_index.first_full_day is None
+
+        profile.update({datetime(2021, 1, 4) + duration(hours=i): i for i in range(24)})
+        profile_index.update()
+        assert profile_index.first_full_day == datetime(2021, 1, 4)
+        assert profile_index.get_time_slot(datetime(2022, 6, 6, 5)) == datetime(2021, 1, 4, 5)
+        # The time slot of the previous day lies outside of the week of the profile
+        assert profile_index.get_time_slot(datetime(2022, 6, 5, 22)) is None
+
+        profile[datetime(2021, 1, 10, 22)] = 2
+        profile_index.update()
+        assert profile_index.get_time_slot(datetime(2022, 6, 5, 22)) == datetime(2021, 1, 10, 22)